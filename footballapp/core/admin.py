@@ -1,6 +1,6 @@
 from django.contrib import admin
 # Dodałem NewsArticle do listy importów poniżej:
-from .models import League, Season, Team, Match, MatchStatistic, Player, Country, TeamSquad, StatDefinition, NewsArticle 
+from .models import League, Season, Team, Match, MatchStatistic, Player, Country, TeamSquad, StatDefinition, NewsArticle, MatchPrediction, IngestionState, NewsFeedState, StandingRow, TeamStatAggregate, TeamMatch, HeadToHead
 
 @admin.register(League)
 class LeagueAdmin(admin.ModelAdmin):
@@ -59,4 +59,36 @@ class NewsArticleAdmin(admin.ModelAdmin):
     # Filtrowanie po źródle (gdybyś dodał np. Sky Sports później)
     list_filter = ['source_name']
     # Pasek wyszukiwania po tytule
-    search_fields = ['title', 'description']
\ No newline at end of file
+    search_fields = ['title', 'description']
+
+@admin.register(MatchPrediction)
+class MatchPredictionAdmin(admin.ModelAdmin):
+    list_display = ['match', 'model_version', 'prediction', 'confidence', 'created_at']
+    list_filter = ['model_version', 'prediction']
+
+@admin.register(IngestionState)
+class IngestionStateAdmin(admin.ModelAdmin):
+    list_display = ['country_id', 'league_template_id', 'season', 'last_page', 'last_start_utime', 'last_run_at']
+
+@admin.register(NewsFeedState)
+class NewsFeedStateAdmin(admin.ModelAdmin):
+    list_display = ['url', 'etag', 'last_modified', 'last_fetched_at']
+
+@admin.register(StandingRow)
+class StandingRowAdmin(admin.ModelAdmin):
+    list_display = ['season', 'position', 'team', 'played', 'points', 'goal_difference']
+    list_filter = ['season']
+
+@admin.register(TeamStatAggregate)
+class TeamStatAggregateAdmin(admin.ModelAdmin):
+    list_display = ['team', 'season', 'stat_name', 'window', 'total', 'count']
+    list_filter = ['window', 'stat_name']
+
+@admin.register(TeamMatch)
+class TeamMatchAdmin(admin.ModelAdmin):
+    list_display = ['team', 'match', 'opponent', 'is_home', 'start_time', 'goals_for', 'goals_against', 'points']
+    list_filter = ['is_home', 'event_stage']
+
+@admin.register(HeadToHead)
+class HeadToHeadAdmin(admin.ModelAdmin):
+    list_display = ['team_a', 'team_b', 'played', 'team_a_wins', 'draws', 'team_b_wins']
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.services.snapshot_service import SNAPSHOT_MODELS, export_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Export leagues, teams, matches, statistics and squads to gzip-compressed NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default='football_data.ndjson.gz')
+        parser.add_argument('--models', nargs='+', choices=[spec.name for spec in SNAPSHOT_MODELS],
+                            help='Only export these models (default: all)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"📦 Exporting to {options['output']}...")
+        started = time.monotonic()
+
+        counts = export_snapshot(options['output'], models=options['models'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Exported {sum(counts.values())} rows in {time.monotonic() - started:.1f}s"
+        ))
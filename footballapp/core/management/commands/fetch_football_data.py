@@ -12,9 +12,19 @@ class Command(BaseCommand):
         parser.add_argument('--season', type=str, default='2025-2026')  # Może sezon 2025-2026 jeszcze nie istnieje?
         parser.add_argument('--max-pages', type=int, default=10)
         parser.add_argument('--fetch-squads', action='store_true', help='Fetch team squads too')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Parallel HTTP requests (1 = sequential mode, rate limits: HTTP_HOST_LIMITS)')
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only fetch new or changed matches (uses stored watermarks)')
+        parser.add_argument('--no-cache', action='store_true', help='Do not use the HTTP response cache')
+        parser.add_argument('--offline', action='store_true',
+                            help='Serve responses only from the HTTP cache (no network)')
 
     def handle(self, *args, **options):
-        service = FootballDataService()
+        service = FootballDataService(
+            use_cache=False if options['no_cache'] else None,
+            offline=options['offline'],
+        )
 
         country_id = options['country_id']
         league_id = options['league_id']
@@ -24,18 +34,35 @@ class Command(BaseCommand):
         self.stdout.write(f'Fetching data for {league_id} - {season}...')
         self.stdout.write(f'URL will be: {service.BASE_URL}/football/{country_id}/{league_id}/{season}/results')
 
-        matches = service.fetch_and_save_season(
-            country_id=country_id,
-            league_template_id=league_id,
-            season=season,
-            max_pages=max_pages
-        )
+        if options['incremental']:
+            matches = service.fetch_and_save_season_incremental(
+                country_id=country_id,
+                league_template_id=league_id,
+                season=season,
+                max_pages=max_pages
+            )
+        elif options['workers'] > 1:
+            matches = service.fetch_and_save_season_concurrent(
+                country_id=country_id,
+                league_template_id=league_id,
+                season=season,
+                max_pages=max_pages,
+                workers=options['workers'],
+            )
+        else:
+            matches = service.fetch_and_save_season(
+                country_id=country_id,
+                league_template_id=league_id,
+                season=season,
+                max_pages=max_pages
+            )
 
         self.stdout.write(
             self.style.SUCCESS(f'Successfully fetched {len(matches)} matches')
         )
+        self.stdout.write(service.http.metrics.summary())
 
         if options['fetch_squads']:
             self.stdout.write('Fetching team squads...')
-            service.fetch_all_teams_squads(only_without_details=True)
+            service.fetch_all_teams_squads(only_without_details=True, workers=options['workers'])
             self.stdout.write(self. style.SUCCESS('Squads fetched! '))
\ No newline at end of file
@@ -1,10 +1,10 @@
-import requests
-import time
 from django.core.management.base import BaseCommand
 from django.apps import apps
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware, is_naive
 
+from core.services.http_client import get_http_client
+
 class Command(BaseCommand):
     help = 'Pobiera komplet danych (Liga -> Sezon -> Drużyny -> Mecze).'
 
@@ -22,7 +22,7 @@ class Command(BaseCommand):
 
         API_LEAGUE_ID = '4328'
         SEASON_NAME = '2025-2026'
-        HEADERS = {"User-Agent": "Mozilla/5.0"}
+        client = get_http_client()
 
         self.stdout.write("🚀 Inicjalizacja...")
 
@@ -45,8 +45,7 @@ class Command(BaseCommand):
         self.stdout.write("⏳ Pobieranie drużyn...")
         teams_url = "https://www.thesportsdb.com/api/v1/json/3/search_all_teams.php"
         try:
-            r = requests.get(teams_url, params={'l': 'English Premier League'}, headers=HEADERS)
-            data = r.json()
+            data = client.get_json(teams_url, params={'l': 'English Premier League'})
             if data.get('teams'):
                 count = 0
                 for item in data['teams']:
@@ -70,8 +69,7 @@ class Command(BaseCommand):
         
         for r in range(1, 39):
             try:
-                resp = requests.get(rounds_url, params={'id': API_LEAGUE_ID, 'r': r, 's': SEASON_NAME}, headers=HEADERS)
-                events = resp.json().get('events')
+                events = client.get_json(rounds_url, params={'id': API_LEAGUE_ID, 'r': r, 's': SEASON_NAME}).get('events')
                 if not events: continue
 
                 for event in events:
@@ -105,8 +103,8 @@ class Command(BaseCommand):
                         }
                     )
                     total_matches += 1
-                time.sleep(0.5)
             except Exception:
                 continue
 
-        self.stdout.write(self.style.SUCCESS(f"🎉 Baza gotowa! Mecze: {total_matches}."))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS(f"🎉 Baza gotowa! Mecze: {total_matches}."))
+        self.stdout.write(client.metrics.summary())
\ No newline at end of file
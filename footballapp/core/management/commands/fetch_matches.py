@@ -1,10 +1,10 @@
-import requests
-import time
 from django.core.management.base import BaseCommand
 from django.apps import apps
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware, is_naive
 
+from core.services.http_client import get_http_client
+
 class Command(BaseCommand):
     help = 'Pobiera terminarz 2025-2026 z systemem ponawiania prób (Anti-Ban).'
 
@@ -22,9 +22,7 @@ class Command(BaseCommand):
         ROUNDS = 38
         
         url = "https://www.thesportsdb.com/api/v1/json/3/eventsround.php"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        client = get_http_client()
 
         self.stdout.write(f"⏳ Rozpoczynam pobieranie sezonu {SEASON}...")
         total_saved = 0
@@ -34,34 +32,12 @@ class Command(BaseCommand):
         for r in range(1, ROUNDS + 1):
             self.stdout.write(f"   📥 Sprawdzam kolejkę {r}/{ROUNDS}...")
 
-            # --- MECHANIZM PONAWIANIA PRÓB (RETRY) ---
-            attempts = 0
-            max_attempts = 3
-            success = False
-            data = {}
-
-            while attempts < max_attempts and not success:
-                try:
-                    params = {'id': LEAGUE_ID, 'r': r, 's': SEASON}
-                    response = requests.get(url, params=params, headers=headers)
-                    
-                    # Sprawdź, czy odpowiedź nie jest pusta
-                    if not response.text.strip():
-                        raise ValueError("Pusta odpowiedź API")
-
-                    data = response.json()
-                    success = True  # Udało się, wychodzimy z pętli while
-
-                except Exception as e:
-                    attempts += 1
-                    wait_time = attempts * 10  # Czekamy 10s, potem 20s, potem 30s
-                    self.stdout.write(self.style.WARNING(f"      ⚠️ Błąd sieci (Próba {attempts}/{max_attempts}). Czekam {wait_time}s..."))
-                    time.sleep(wait_time)
-
-            if not success:
-                self.stdout.write(self.style.ERROR(f"      ❌ Nie udało się pobrać kolejki {r}. Pomijam."))
+            # Ponawianie (z opóźnieniem i Retry-After) oraz limit tempa robi klient HTTP
+            try:
+                data = client.get_json(url, params={'id': LEAGUE_ID, 'r': r, 's': SEASON})
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"      ❌ Nie udało się pobrać kolejki {r} ({e}). Pomijam."))
                 continue
-            # ---------------------------------------------
 
             events = data.get('events')
             if not events:
@@ -104,9 +80,7 @@ class Command(BaseCommand):
                     }
                 )
                 total_saved += 1
-            
-            # Standardowa przerwa między kolejkami (2 sekundy)
-            time.sleep(2)
 
         self.stdout.write(self.style.SUCCESS(f"🎉 SUKCES! Pobrano {total_saved} meczów."))
-        self.stdout.write(f"   Dodano {new_teams_created} nowych drużyn.")
\ No newline at end of file
+        self.stdout.write(f"   Dodano {new_teams_created} nowych drużyn.")
+        self.stdout.write(client.metrics.summary())
\ No newline at end of file
@@ -1,12 +1,19 @@
-import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from django.core.management.base import BaseCommand
 from django.apps import apps
+from django.db import DatabaseError, transaction
 from django.utils.text import slugify
 
+from core.services import view_cache
+from core.services.http_client import get_http_client
+
 class Command(BaseCommand):
     help = 'Pobiera piłkarzy używając PEŁNEJ listy aliasów.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Równoległe zapytania do API')
+
     def handle(self, *args, **options):
         try:
             Team = apps.get_model('core', 'Team')
@@ -16,12 +23,11 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR("❌ Błąd: Nie znaleziono modeli."))
             return
 
-        all_teams = Team.objects.all()
-        self.stdout.write(f"Znaleziono {all_teams.count()} drużyn. Start...")
+        all_teams = list(Team.objects.all())
+        team_count = len(all_teams)
+        self.stdout.write(f"Znaleziono {team_count} drużyn. Start...")
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
-        }
+        client = get_http_client()
         url = "https://www.thesportsdb.com/api/v1/json/3/searchplayers.php"
 
         # --- WIELKA LISTA TŁUMACZEŃ (Twoja Baza -> API) ---
@@ -49,69 +55,126 @@ class Command(BaseCommand):
             # Arsenal, Chelsea, Liverpool, Everton, Fulham, Burnley zazwyczaj działają bez zmian
         }
 
+        def fetch(team):
+            return client.get_json(url, params={'t': SEARCH_ALIASES.get(team.name, team.name)})
+
         total_saved_global = 0
 
-        for i, team in enumerate(all_teams, 1):
-            # Tu sprawdzamy, czy mamy tłumaczenie. Jeśli nie, bierzemy oryginalną nazwę.
-            search_name = SEARCH_ALIASES.get(team.name, team.name)
-            
-            self.stdout.write(f"[{i}/{all_teams.count()}] ⏳ Szukam: '{search_name}' (Baza: {team.name})...", ending='')
+        # Pobieranie równoległe (limity tempa pilnuje klient HTTP), zapis w jednym wątku
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {executor.submit(fetch, team): team for team in all_teams}
 
-            try:
-                response = requests.get(url, params={'t': search_name}, headers=headers)
-                data = response.json() if response.status_code == 200 else {}
-            except Exception:
-                self.stdout.write(self.style.ERROR(" ❌ Błąd sieci"))
-                continue
+            for i, future in enumerate(as_completed(futures), 1):
+                team = futures[future]
+                # Tu sprawdzamy, czy mamy tłumaczenie. Jeśli nie, bierzemy oryginalną nazwę.
+                search_name = SEARCH_ALIASES.get(team.name, team.name)
 
-            if not data.get('player'):
-                self.stdout.write(self.style.WARNING(f" ⚠️ Pusto"))
-                continue
+                self.stdout.write(f"[{i}/{team_count}] ⏳ Szukam: '{search_name}' (Baza: {team.name})...", ending='')
 
-            saved_count = 0
-            
-            for item in data['player']:
                 try:
-                    # Logika pobierania (identyczna jak wcześniej)
-                    api_player_id = item.get('idPlayer')
-                    full_name = item.get('strPlayer', 'Unknown')
-                    
-                    raw_pos = item.get('strPosition')
-                    pos = 'Midfielders'
-                    if raw_pos == "Goalkeeper": pos = 'Goalkeepers'
-                    elif raw_pos == "Defender": pos = 'Defenders'
-                    elif raw_pos == "Midfielder": pos = 'Midfielders'
-                    elif raw_pos == "Forward": pos = 'Forwards'
-
-                    parts = full_name.split(' ', 1)
-                    f_name = parts[0]
-                    l_name = parts[1] if len(parts) > 1 else ""
-
-                    player_obj, _ = Player.objects.update_or_create(
-                        player_id=api_player_id,
-                        defaults={
-                            'first_name': f_name, 'last_name': l_name,
-                            'slug': slugify(f"{f_name}-{l_name}-{api_player_id}"),
-                            'position': pos
-                        }
-                    )
-
-                    TeamSquad.objects.update_or_create(
-                        team=team, player=player_obj,
-                        defaults={'jersey_number': item.get('strNumber') or "", 'tournament_id': '4328'}
-                    )
-                    saved_count += 1
-                    total_saved_global += 1
-
+                    data = future.result()
                 except Exception:
+                    self.stdout.write(self.style.ERROR(" ❌ Błąd sieci"))
                     continue
 
-            if saved_count > 0:
-                self.stdout.write(self.style.SUCCESS(f" ✅ Dodano {saved_count}"))
-            else:
-                self.stdout.write(self.style.WARNING(" ⚠️ Pusto (mimo poprawnej odpowiedzi)"))
+                if not data.get('player'):
+                    self.stdout.write(self.style.WARNING(f" ⚠️ Pusto"))
+                    continue
+
+                # Błąd zapisu jednej drużyny (jej transakcja jest wycofana) nie przerywa pozostałych
+                try:
+                    saved_count, skipped = self.save_players(team, data['player'], Player, TeamSquad)
+                except DatabaseError as e:
+                    self.stdout.write(self.style.ERROR(f" ❌ Błąd zapisu: {e}"))
+                    continue
+                total_saved_global += saved_count
+
+                if saved_count > 0:
+                    self.stdout.write(self.style.SUCCESS(f" ✅ Dodano {saved_count}"))
+                else:
+                    self.stdout.write(self.style.WARNING(" ⚠️ Pusto (mimo poprawnej odpowiedzi)"))
+                if skipped:
+                    self.stdout.write(self.style.WARNING(f"   ⚠️ Pominięto {skipped} niepoprawnych rekordów"))
+
+        self.stdout.write(self.style.SUCCESS(f"🎉 KONIEC! Mamy {total_saved_global} piłkarzy w bazie."))
+        self.stdout.write(client.metrics.summary())
+
+    @staticmethod
+    def _fits(model, field_name, value) -> bool:
+        """Czy wartość mieści się w kolumnie modelu (max_length)"""
+        return len(value) <= model._meta.get_field(field_name).max_length
+
+    @transaction.atomic
+    def save_players(self, team, items, Player, TeamSquad):
+        """
+        Zapis zawodników drużyny dwoma upsertami (zawodnicy + składy).
+        Rekordy bez identyfikatora lub nazwy albo z wartościami dłuższymi niż
+        kolumny są pomijane, żeby nie przerwały zapisu całej drużyny.
+        Zwraca (liczba zapisanych, liczba pominiętych)
+        """
+        players = {}
+        skipped = 0
+        for item in items:
+            try:
+                # Logika pobierania (identyczna jak wcześniej)
+                api_player_id = str(item.get('idPlayer') or '').strip()
+                full_name = (item.get('strPlayer') or '').strip()
+                jersey_number = str(item.get('strNumber') or '').strip()
+                if not api_player_id or not full_name:
+                    skipped += 1
+                    continue
 
-            # Zwiększyłem czas, żeby API nie blokowało innych klubów po pobraniu Arsenalu
-            time.sleep(1.2) 
+                raw_pos = item.get('strPosition')
+                pos = 'Midfielders'
+                if raw_pos == "Goalkeeper": pos = 'Goalkeepers'
+                elif raw_pos == "Defender": pos = 'Defenders'
+                elif raw_pos == "Midfielder": pos = 'Midfielders'
+                elif raw_pos == "Forward": pos = 'Forwards'
+
+                parts = full_name.split(' ', 1)
+                f_name = parts[0]
+                l_name = parts[1] if len(parts) > 1 else ""
+
+                if not (
+                    self._fits(Player, 'player_id', api_player_id)
+                    and self._fits(Player, 'first_name', f_name)
+                    and self._fits(Player, 'last_name', l_name)
+                    and self._fits(TeamSquad, 'jersey_number', jersey_number)
+                ):
+                    skipped += 1
+                    continue
+
+                players[api_player_id] = (
+                    Player(
+                        player_id=api_player_id,
+                        first_name=f_name, last_name=l_name,
+                        slug=slugify(f"{f_name}-{l_name}-{api_player_id}")[:Player._meta.get_field('slug').max_length],
+                        position=pos
+                    ),
+                    jersey_number,
+                )
+            except Exception:
+                skipped += 1
+                continue
 
-        self.stdout.write(self.style.SUCCESS(f"🎉 KONIEC! Mamy {total_saved_global} piłkarzy w bazie."))
\ No newline at end of file
+        if not players:
+            return 0, skipped
+
+        Player.objects.bulk_create(
+            [player for player, _ in players.values()],
+            update_conflicts=True,
+            unique_fields=['player_id'],
+            update_fields=['first_name', 'last_name', 'slug', 'position', 'updated_at'],
+        )
+        TeamSquad.objects.bulk_create(
+            [
+                TeamSquad(team=team, player_id=player_id, jersey_number=jersey_number, tournament_id='4328')
+                for player_id, (_, jersey_number) in players.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['team', 'player', 'tournament_id'],
+            update_fields=['jersey_number'],
+        )
+        # Strony drużyn pokazują kadrę (po commicie transakcji)
+        view_cache.bump_data_version('teams')
+        return len(players), skipped
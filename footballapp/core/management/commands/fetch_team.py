@@ -1,7 +1,9 @@
-import requests
 from django.core.management.base import BaseCommand
 from django.apps import apps
 
+from core.services import view_cache
+from core.services.http_client import get_http_client
+
 class Command(BaseCommand):
     help = 'Pobiera WSZYSTKIE drużyny z Premier League (TheSportsDB).'
 
@@ -23,8 +25,7 @@ class Command(BaseCommand):
         self.stdout.write("⏳ Pobieranie całej ligi z TheSportsDB...")
 
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
+            data = get_http_client().get_json(url, params=params)
         except Exception as e:
              self.stdout.write(self.style.ERROR(f"❌ Błąd sieci: {e}"))
              return
@@ -47,7 +48,9 @@ class Command(BaseCommand):
                 action = "Dodano" if created else "Zaktualizowano"
                 self.stdout.write(f"   -> {action}: {team_data['strTeam']}")
                 count += 1
-            
+
+            # Listy i strony drużyn są w cache - unieważnij je po zmianie drużyn
+            view_cache.bump_data_version('teams')
             self.stdout.write(self.style.SUCCESS(f"✅ SUKCES! Przetworzono {count} drużyn."))
         else:
             self.stdout.write(self.style.WARNING(f"⚠️ API nie zwróciło żadnych drużyn (sprawdź nazwę ligi)."))
\ No newline at end of file
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.models import Team
+from core.services import (
+    head_to_head_service, league_service, prediction_cache, standings_service, team_service, view_cache,
+)
+from core.services.snapshot_service import IMPORT_BATCH_SIZE, import_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Import a gzip-compressed NDJSON snapshot created by export_football_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str)
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"📥 Importing {options['path']}...")
+        started = time.monotonic()
+
+        counts = import_snapshot(options['path'], batch_size=options['batch_size'])
+
+        # Import omija zapis meczów przez serwis - tabele liczymy od nowa
+        if counts.get('match'):
+            team_service.rebuild_team_matches()
+            standings_service.rebuild_all()
+            head_to_head_service.rebuild_all()
+            # Podsumowania drużyn (wersje per drużyna) i gotowe przewidywania
+            # zależą od wyników - import podmienia je dla wszystkich drużyn naraz
+            team_service.bump_team_versions(Team.objects.values_list('pk', flat=True))
+            prediction_cache.invalidate_all()
+        if counts.get('match') or counts.get('match_statistic'):
+            team_service.rebuild_stat_aggregates()
+        view_cache.bump_data_version(*view_cache.DATA_SCOPES)
+        league_service.bump_league_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Imported {sum(counts.values())} rows in {time.monotonic() - started:.1f}s"
+        ))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.services import model_store, prediction_cache
+
+
+class Command(BaseCommand):
+    help = 'Liczy i zapisuje przewidywania wszystkich zaplanowanych meczów (tabela MatchPrediction).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-old-versions', action='store_true',
+                            help='Nie usuwaj przewidywań starszych wersji modelu')
+
+    def handle(self, *args, **options):
+        service = model_store.load_service()
+        if service is None:
+            self.stdout.write(self.style.ERROR(
+                "❌ Brak zapisanego modelu. Uruchom najpierw: python manage.py train_prediction_model"
+            ))
+            return
+
+        saved = prediction_cache.precompute_upcoming(
+            service, prune_old_versions=not options['keep_old_versions']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Zapisano {saved} przewidywań (model {service.version})."
+        ))
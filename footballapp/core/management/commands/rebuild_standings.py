@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.models import Season
+from core.services import standings_service, view_cache
+
+
+class Command(BaseCommand):
+    help = 'Recompute league standings (StandingRow) from finished matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, nargs='+', help='Season primary keys (default: all seasons)')
+
+    def handle(self, *args, **options):
+        seasons = Season.objects.all()
+        if options['season']:
+            seasons = seasons.filter(pk__in=options['season'])
+
+        rows = standings_service.rebuild_all(seasons)
+        view_cache.bump_data_version('matches')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt standings: {rows} rows'))
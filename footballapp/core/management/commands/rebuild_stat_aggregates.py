@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from core.services import team_service, view_cache
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-team stat averages (TeamStatAggregate) from match statistics'
+
+    def handle(self, *args, **options):
+        rows = team_service.rebuild_stat_aggregates()
+        view_cache.bump_data_version('stats')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stat aggregates: {rows} rows'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from core.services.footballdata_service import FootballDataService
+
+
+class Command(BaseCommand):
+    help = 'Re-fetch squads of teams without details or with stale data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, default=7,
+                            help='Refresh teams not updated for this many days')
+        parser.add_argument('--workers', type=int, default=8, help='Parallel HTTP requests')
+
+    def handle(self, *args, **options):
+        service = FootballDataService()
+
+        teams = service.refresh_stale_squads(
+            max_age_days=options['max_age_days'],
+            workers=options['workers'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {len(teams)} teams'))
+        self.stdout.write(service.http.metrics.summary())
@@ -0,0 +1,77 @@
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.services import model_store
+
+
+class Command(BaseCommand):
+    help = ('Lokalny scheduler: obserwuje nowe zakończone mecze i trenuje model '
+            'w osobnym procesie (bez zewnętrznego brokera).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=30,
+                            help='Co ile sekund sprawdzać bazę')
+        parser.add_argument('--debounce', type=int, default=120,
+                            help='Ile sekund dane muszą być stabilne przed treningiem')
+        parser.add_argument('--once', action='store_true',
+                            help='Sprawdź raz i zakończ (np. do crona)')
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        debounce = 0 if options['once'] else options['debounce']
+
+        self.stdout.write(f"⏱️  Scheduler uruchomiony (co {interval}s, debounce {debounce}s)")
+
+        pending_fingerprint = None
+        pending_since = None
+        # Odcisk danych, na których trening się nie powiódł (np. za mało meczów) -
+        # kolejna próba dopiero po zmianie danych
+        failed_fingerprint = None
+
+        while True:
+            fingerprint = model_store.training_fingerprint()
+            trained_fingerprint = model_store.latest_fingerprint()
+
+            if fingerprint in (trained_fingerprint, failed_fingerprint):
+                pending_fingerprint = pending_since = None
+            elif fingerprint != pending_fingerprint:
+                # Nowe wyniki - odczekaj, aż ingestia skończy zapisywać
+                pending_fingerprint = fingerprint
+                pending_since = time.monotonic()
+                self.stdout.write("📥 Wykryto nowe zakończone mecze - czekam na koniec zapisu...")
+
+            if pending_fingerprint and time.monotonic() - pending_since >= debounce:
+                if not self._retrain():
+                    failed_fingerprint = pending_fingerprint
+                    self.stdout.write("⏸️  Kolejna próba treningu po zmianie danych.")
+                pending_fingerprint = pending_since = None
+
+            if options['once']:
+                break
+            time.sleep(interval)
+
+    def _retrain(self):
+        """Trening w osobnym procesie - scheduler i workery WWW nie są blokowane"""
+        self.stdout.write("🧠 Trenuję nowy model...")
+        if not self._run_command('train_prediction_model'):
+            return False
+        # Od razu wypełnij tabelę przewidywań dla nowej wersji modelu
+        self._run_command('precompute_predictions')
+        return True
+
+    def _run_command(self, name):
+        manage_py = settings.BASE_DIR / 'manage.py'
+        result = subprocess.run(
+            [sys.executable, str(manage_py), name],
+            capture_output=True, text=True,
+        )
+        output = (result.stdout or '').strip()
+        if result.returncode == 0:
+            self.stdout.write(self.style.SUCCESS(output or f"✅ {name} zakończone."))
+            return True
+        self.stdout.write(self.style.ERROR(f"❌ {name} nie powiodło się:\n{result.stderr.strip()}"))
+        return False
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import model_store
+from core.services.prediction_service import MatchPredictionService
+
+
+class Command(BaseCommand):
+    help = 'Trenuje model przewidywania wyników i zapisuje go na dysk (nowa wersja).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-matches', type=int, default=50)
+        parser.add_argument('--force', action='store_true',
+                            help='Trenuj nawet jeśli dane treningowe się nie zmieniły')
+        parser.add_argument('--keep', type=int, default=3,
+                            help='Ile ostatnich wersji modelu zostawić na dysku')
+
+    def handle(self, *args, **options):
+        fingerprint = model_store.training_fingerprint()
+
+        current = model_store.load_service()
+        if current and current.fingerprint == fingerprint and not options['force']:
+            self.stdout.write(f"✓ Model {current.version} jest aktualny - pomijam trening.")
+            return
+
+        service = MatchPredictionService()
+        success, message = service.train_model(min_matches=options['min_matches'])
+        if not success:
+            # Kod wyjścia != 0 - scheduler nie uruchamia precompute i nie ponawia treningu na tych samych danych
+            raise CommandError(f"❌ {message}")
+
+        version = model_store.save_service(service, fingerprint=fingerprint)
+        removed = model_store.prune_artifacts(keep=options['keep'])
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {message} Zapisano wersję {version}."))
+        if removed:
+            self.stdout.write(f"   Usunięto stare wersje: {', '.join(removed)}")
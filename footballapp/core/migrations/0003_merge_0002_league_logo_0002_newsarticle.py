@@ -0,0 +1,14 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_league_logo'),
+        ('core', '0002_newsarticle'),
+    ]
+
+    operations = [
+    ]
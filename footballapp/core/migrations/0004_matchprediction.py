@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_merge_0002_league_logo_0002_newsarticle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchPrediction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_version', models.CharField(max_length=50)),
+                ('prediction', models.CharField(max_length=1)),
+                ('home_win_probability', models.FloatField()),
+                ('draw_probability', models.FloatField()),
+                ('away_win_probability', models.FloatField()),
+                ('confidence', models.FloatField()),
+                ('home_features', models.JSONField(default=dict)),
+                ('away_features', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='predictions', to='core.match')),
+            ],
+            options={
+                'verbose_name': 'Match Prediction',
+                'verbose_name_plural': 'Match Predictions',
+                'indexes': [models.Index(fields=['model_version', 'match'], name='core_matchp_model_v_c0e4a5_idx')],
+                'unique_together': {('match', 'model_version')},
+            },
+        ),
+    ]
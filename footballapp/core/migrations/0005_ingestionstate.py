@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_matchprediction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country_id', models.CharField(max_length=100)),
+                ('league_template_id', models.CharField(max_length=100)),
+                ('season', models.CharField(max_length=50)),
+                ('last_page', models.IntegerField(default=0)),
+                ('last_start_utime', models.BigIntegerField(default=0)),
+                ('stats_event_ids', models.JSONField(blank=True, default=list)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Ingestion State',
+                'verbose_name_plural': 'Ingestion States',
+                'unique_together': {('country_id', 'league_template_id', 'season')},
+            },
+        ),
+    ]
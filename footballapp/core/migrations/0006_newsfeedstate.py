@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_ingestionstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsFeedState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=100)),
+                ('last_fetched_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'News Feed State',
+                'verbose_name_plural': 'News Feed States',
+            },
+        ),
+    ]
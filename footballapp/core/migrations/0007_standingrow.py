@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_newsfeedstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StandingRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='core.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='core.team')),
+            ],
+            options={
+                'verbose_name': 'Standing Row',
+                'verbose_name_plural': 'Standing Rows',
+                'ordering': ['season', 'position'],
+                'indexes': [models.Index(fields=['season', 'position'], name='core_standi_season__427832_idx')],
+                'unique_together': {('season', 'team')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_standingrow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStatAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stat_name', models.CharField(max_length=100)),
+                ('window', models.PositiveSmallIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stat_aggregates', to='core.season')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stat_aggregates', to='core.team')),
+            ],
+            options={
+                'verbose_name': 'Team Stat Aggregate',
+                'verbose_name_plural': 'Team Stat Aggregates',
+                'indexes': [models.Index(fields=['team', 'window', 'season'], name='core_teamst_team_id_f2e300_idx')],
+                'constraints': [models.UniqueConstraint(fields=('team', 'season', 'stat_name', 'window'), name='unique_team_season_stat_window'), models.UniqueConstraint(condition=models.Q(('season__isnull', True)), fields=('team', 'stat_name', 'window'), name='unique_team_stat_window_all_seasons')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_teamstataggregate'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['start_time', 'event_id'], name='core_match_start_t_3bdfac_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['season', 'start_time', 'event_id'], name='core_match_season__8ad356_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['home_team', 'start_time'], name='core_match_home_te_9204f1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['away_team', 'start_time'], name='core_match_away_te_adf96f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['event_stage', 'start_time'], name='core_match_event_s_90e7d9_idx'),
+        ),
+    ]
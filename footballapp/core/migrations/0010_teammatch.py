@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_team_matches(apps, schema_editor):
+    """
+    Wiersze TeamMatch dla meczów zapisanych przed dodaniem tabeli - strumieniowo,
+    paczkami po BATCH_SIZE wierszy (stała pamięć niezależnie od liczby meczów)
+    """
+    Match = apps.get_model('core', 'Match')
+    TeamMatch = apps.get_model('core', 'TeamMatch')
+
+    rows = []
+    matches = Match.objects.order_by().values_list(
+        'event_id', 'home_team_id', 'away_team_id', 'start_time', 'event_stage', 'home_score', 'away_score',
+    )
+    for event_id, home_id, away_id, start_time, stage, home_score, away_score in matches.iterator(chunk_size=BATCH_SIZE):
+        for team_id, opponent_id, is_home, goals_for, goals_against in (
+            (home_id, away_id, True, home_score, away_score),
+            (away_id, home_id, False, away_score, home_score),
+        ):
+            points = None
+            if stage == '3':
+                scored, conceded = goals_for or 0, goals_against or 0
+                points = 3 if scored > conceded else 1 if scored == conceded else 0
+            rows.append(TeamMatch(
+                team_id=team_id, match_id=event_id, opponent_id=opponent_id, is_home=is_home,
+                start_time=start_time, event_stage=stage,
+                goals_for=goals_for, goals_against=goals_against, points=points,
+            ))
+        if len(rows) >= BATCH_SIZE:
+            TeamMatch.objects.bulk_create(rows)
+            rows = []
+    TeamMatch.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_match_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_home', models.BooleanField()),
+                ('start_time', models.DateTimeField()),
+                ('event_stage', models.CharField(choices=[('1', 'Scheduled'), ('2', 'Live'), ('3', 'Finished'), ('4', 'Postponed'), ('5', 'Cancelled')], max_length=20)),
+                ('goals_for', models.IntegerField(blank=True, null=True)),
+                ('goals_against', models.IntegerField(blank=True, null=True)),
+                ('points', models.IntegerField(blank=True, null=True)),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='core.match')),
+                ('opponent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='core.team')),
+            ],
+            options={
+                'verbose_name': 'Team Match',
+                'verbose_name_plural': 'Team Matches',
+                'indexes': [models.Index(fields=['team', 'start_time', 'match'], name='core_teamma_team_id_a101fb_idx'), models.Index(fields=['team', 'event_stage', 'start_time', 'match'], name='core_teamma_team_id_9ac7c6_idx'), models.Index(fields=['team', 'opponent', 'start_time', 'match'], name='core_teamma_team_id_ae45c9_idx')],
+                'unique_together': {('team', 'match')},
+            },
+        ),
+        migrations.RunPython(backfill_team_matches, migrations.RunPython.noop),
+    ]
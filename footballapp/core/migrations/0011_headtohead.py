@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_teammatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HeadToHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('team_a_wins', models.IntegerField(default=0)),
+                ('team_b_wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('team_a_goals', models.IntegerField(default=0)),
+                ('team_b_goals', models.IntegerField(default=0)),
+                ('recent_match_ids', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('team_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+                ('team_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+            ],
+            options={
+                'verbose_name': 'Head To Head',
+                'verbose_name_plural': 'Head To Head',
+                'unique_together': {('team_a', 'team_b')},
+            },
+        ),
+    ]
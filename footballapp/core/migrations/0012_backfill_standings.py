@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def backfill_standings(apps, schema_editor):
+    """
+    Wiersze StandingRow dla sezonów, których tabela nie była jeszcze liczona
+    (wyniki zapisane przed dodaniem tabeli) - strona tabeli tylko czyta
+    """
+    Match = apps.get_model('core', 'Match')
+    StandingRow = apps.get_model('core', 'StandingRow')
+    Team = apps.get_model('core', 'Team')
+
+    computed = set(StandingRow.objects.values_list('season_id', flat=True).distinct())
+    totals = defaultdict(lambda: [0] * 7)  # played, wins, draws, losses, goals_for, goals_against, points
+    matches = (
+        Match.objects.filter(event_stage='3')
+        .exclude(season_id__in=computed)
+        .values_list('season_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score')
+    )
+    for season_id, home_id, away_id, home_score, away_score in matches.iterator(chunk_size=2000):
+        for team_id, scored, conceded in ((home_id, home_score, away_score), (away_id, away_score, home_score)):
+            scored, conceded = scored or 0, conceded or 0
+            row = totals[(season_id, team_id)]
+            row[0] += 1
+            row[1 if scored > conceded else 2 if scored == conceded else 3] += 1
+            row[4] += scored
+            row[5] += conceded
+            row[6] += 3 if scored > conceded else 1 if scored == conceded else 0
+
+    names = dict(Team.objects.filter(participant_id__in={team_id for _, team_id in totals}).values_list('participant_id', 'name'))
+    by_season = defaultdict(list)
+    for (season_id, team_id), row in totals.items():
+        by_season[season_id].append((team_id, row))
+
+    rows = []
+    for season_id, teams in by_season.items():
+        # Kolejność jak standings_service.TABLE_ORDERING
+        teams.sort(key=lambda item: (-item[1][6], -(item[1][4] - item[1][5]), -item[1][4], names.get(item[0], '')))
+        for position, (team_id, (played, wins, draws, losses, goals_for, goals_against, points)) in enumerate(teams, 1):
+            rows.append(StandingRow(
+                season_id=season_id, team_id=team_id, position=position,
+                played=played, wins=wins, draws=draws, losses=losses,
+                goals_for=goals_for, goals_against=goals_against,
+                goal_difference=goals_for - goals_against, points=points,
+            ))
+    StandingRow.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_headtohead'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_standings, migrations.RunPython.noop),
+    ]
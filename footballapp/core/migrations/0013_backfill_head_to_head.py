@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import F
+
+# Jak head_to_head_service.RECENT_MEETINGS (+1 spotkanie zapasowe)
+RECENT_MEETINGS = 10
+
+
+def backfill_head_to_head(apps, schema_editor):
+    """
+    Bilanse HeadToHead par, które nie mają jeszcze wiersza (wyniki zapisane
+    przed dodaniem tabeli) - strona meczu tylko czyta
+    """
+    HeadToHead = apps.get_model('core', 'HeadToHead')
+    TeamMatch = apps.get_model('core', 'TeamMatch')
+
+    existing = set(HeadToHead.objects.values_list('team_a_id', 'team_b_id'))
+    meetings = (
+        TeamMatch.objects.filter(event_stage='3', team_id__lt=F('opponent_id'))
+        .order_by('-start_time', '-match_id')
+        .values_list('team_id', 'opponent_id', 'match_id', 'goals_for', 'goals_against')
+    )
+    records = {}
+    for team_a, team_b, match_id, goals_a, goals_b in meetings.iterator(chunk_size=2000):
+        if (team_a, team_b) in existing:
+            continue
+        record = records.get((team_a, team_b))
+        if record is None:
+            record = records[(team_a, team_b)] = HeadToHead(team_a_id=team_a, team_b_id=team_b, recent_match_ids=[])
+        goals_a, goals_b = goals_a or 0, goals_b or 0
+        record.played += 1
+        record.team_a_goals += goals_a
+        record.team_b_goals += goals_b
+        if goals_a > goals_b:
+            record.team_a_wins += 1
+        elif goals_a < goals_b:
+            record.team_b_wins += 1
+        else:
+            record.draws += 1
+        if len(record.recent_match_ids) <= RECENT_MEETINGS:
+            record.recent_match_ids.append(match_id)
+    HeadToHead.objects.bulk_create(records.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_backfill_standings'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_head_to_head, migrations.RunPython.noop),
+    ]
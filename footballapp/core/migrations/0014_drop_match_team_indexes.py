@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_backfill_head_to_head'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='match',
+            name='core_match_home_te_9204f1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='match',
+            name='core_match_away_te_adf96f_idx',
+        ),
+    ]
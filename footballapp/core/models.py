@@ -190,6 +190,12 @@ class Match(models.Model):
         indexes = [
             models.Index(fields=['season', 'start_time']),
             models.Index(fields=['event_stage']),
+            # Stronicowanie listy meczów po (start_time, event_id) i filtry listy / API
+            models.Index(fields=['start_time', 'event_id']),
+            models.Index(fields=['season', 'start_time', 'event_id']),
+            models.Index(fields=['event_stage', 'start_time']),
+            # Mecze drużyny czytane są z TeamMatch (team, start_time, match) -
+            # home_team / away_team mają tylko indeksy kluczy obcych
         ]
 
     def __str__(self):
@@ -242,6 +248,144 @@ class MatchStatistic(models.Model):
             return None
 
 
+class StandingRow(models.Model):
+    """Wiersz tabeli ligowej - aktualizowany przyrostowo przy zapisie wyników"""
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='standings')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='standings')
+
+    position = models.PositiveIntegerField(default=0)
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Standing Row"
+        verbose_name_plural = "Standing Rows"
+        unique_together = ['season', 'team']
+        ordering = ['season', 'position']
+        indexes = [
+            models.Index(fields=['season', 'position']),
+        ]
+
+    def __str__(self):
+        return f"{self.season} - {self.position}. {self.team.name}"
+
+
+class TeamStatAggregate(models.Model):
+    """
+    Suma i liczba wartości statystyki drużyny w oknie jej ostatnich meczów -
+    przeliczane przy zapisie statystyk (save_matches_statistics).
+    window = 0 oznacza wszystkie mecze; season = NULL - wszystkie sezony
+    """
+    ALL_MATCHES = 0
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='stat_aggregates')
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, null=True, blank=True,
+                               related_name='stat_aggregates')
+    stat_name = models.CharField(max_length=100)
+    window = models.PositiveSmallIntegerField(default=ALL_MATCHES)
+
+    total = models.FloatField(default=0)
+    count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Team Stat Aggregate"
+        verbose_name_plural = "Team Stat Aggregates"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['team', 'season', 'stat_name', 'window'],
+                name='unique_team_season_stat_window',
+            ),
+            # NULL nie jest porównywany w unikalności - osobne ograniczenie dla wszystkich sezonów
+            models.UniqueConstraint(
+                fields=['team', 'stat_name', 'window'],
+                condition=models.Q(season__isnull=True),
+                name='unique_team_stat_window_all_seasons',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['team', 'window', 'season']),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} - {self.stat_name} ({self.window or 'all'})"
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+
+class TeamMatch(models.Model):
+    """
+    Udział drużyny w meczu (dwa wiersze na mecz) - zdenormalizowany indeks
+    zapytań "mecze drużyny X" jako jeden skan po (team, start_time) zamiast
+    OR po home_team / away_team. Synchronizowany przy zapisie meczów
+    """
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='participations')
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='participations')
+    opponent = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    is_home = models.BooleanField()
+
+    start_time = models.DateTimeField()
+    event_stage = models.CharField(max_length=20, choices=Match.EVENT_STAGE_CHOICES)
+
+    # Wynik z perspektywy drużyny (NULL dla meczów bez wyniku)
+    goals_for = models.IntegerField(null=True, blank=True)
+    goals_against = models.IntegerField(null=True, blank=True)
+    points = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Team Match"
+        verbose_name_plural = "Team Matches"
+        unique_together = ['team', 'match']
+        indexes = [
+            # match na końcu - kolejność (start_time, match) bez dodatkowego sortowania
+            models.Index(fields=['team', 'start_time', 'match']),
+            models.Index(fields=['team', 'event_stage', 'start_time', 'match']),
+            models.Index(fields=['team', 'opponent', 'start_time', 'match']),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} - {self.match_id}"
+
+
+class HeadToHead(models.Model):
+    """
+    Bilans bezpośrednich meczów pary drużyn (para nieuporządkowana:
+    team_a ma mniejszy participant_id) - aktualizowany przy zapisie wyników
+    """
+    team_a = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+    team_b = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='+')
+
+    played = models.IntegerField(default=0)
+    team_a_wins = models.IntegerField(default=0)
+    team_b_wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    team_a_goals = models.IntegerField(default=0)
+    team_b_goals = models.IntegerField(default=0)
+    # event_id ostatnich spotkań, od najnowszego
+    recent_match_ids = models.JSONField(default=list, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Head To Head"
+        verbose_name_plural = "Head To Head"
+        unique_together = ['team_a', 'team_b']
+
+    def __str__(self):
+        return f"{self.team_a_id} vs {self.team_b_id} ({self.team_a_wins}-{self.draws}-{self.team_b_wins})"
+
+
 class StatDefinition(models.Model):
     """Definicje statystyk"""
     stat_id = models.CharField(max_length=10, unique=True, primary_key=True)
@@ -258,6 +402,29 @@ class StatDefinition(models.Model):
     
     # ... (twoje inne modele: League, Team itp.)
 
+class IngestionState(models.Model):
+    """Stan pobierania wyników dla (kraj, liga, sezon) - znaczniki dla trybu przyrostowego"""
+    country_id = models.CharField(max_length=100)
+    league_template_id = models.CharField(max_length=100)
+    season = models.CharField(max_length=50)
+
+    # Ostatnia strona sezonu z ostatniego pełnego przejścia (0 = sezon nie został jeszcze przejrzany do końca)
+    last_page = models.IntegerField(default=0)
+    last_start_utime = models.BigIntegerField(default=0)
+    # event_id meczów, dla których zapisano już końcowe statystyki
+    stats_event_ids = models.JSONField(default=list, blank=True)
+
+    last_run_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Ingestion State"
+        verbose_name_plural = "Ingestion States"
+        unique_together = ['country_id', 'league_template_id', 'season']
+
+    def __str__(self):
+        return f"{self.country_id}/{self.league_template_id}/{self.season}"
+
+
 class NewsArticle(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -270,4 +437,67 @@ class NewsArticle(models.Model):
         return self.title
 
     class Meta:
-        ordering = ['-published_date'] # Najnowsze na górze
\ No newline at end of file
+        ordering = ['-published_date'] # Najnowsze na górze
+
+
+class NewsFeedState(models.Model):
+    """Stan kanału RSS - nagłówki do zapytań warunkowych (ETag / Last-Modified)"""
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "News Feed State"
+        verbose_name_plural = "News Feed States"
+
+    def __str__(self):
+        return self.url
+
+
+class MatchPrediction(models.Model):
+    """Zapisane przewidywanie wyniku meczu dla danej wersji modelu"""
+    match = models.ForeignKey(Match, on_delete=models.CASCADE, related_name='predictions')
+    model_version = models.CharField(max_length=50)
+
+    prediction = models.CharField(max_length=1)  # '1', 'X', '2'
+    home_win_probability = models.FloatField()
+    draw_probability = models.FloatField()
+    away_win_probability = models.FloatField()
+    confidence = models.FloatField()
+
+    # Cechy drużyn użyte do przewidywania (jak w MatchPredictionService.predict_match)
+    home_features = models.JSONField(default=dict)
+    away_features = models.JSONField(default=dict)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Match Prediction"
+        verbose_name_plural = "Match Predictions"
+        unique_together = ['match', 'model_version']
+        indexes = [
+            models.Index(fields=['model_version', 'match']),
+        ]
+
+    def __str__(self):
+        return f"{self.match_id} - {self.prediction} ({self.model_version})"
+
+    @property
+    def probabilities(self):
+        return {
+            'X': self.draw_probability,
+            '1': self.home_win_probability,
+            '2': self.away_win_probability,
+        }
+
+    def as_prediction(self):
+        """Słownik w formacie MatchPredictionService.predict_match"""
+        return {
+            'prediction': self.prediction,
+            'probabilities': self.probabilities,
+            'confidence': self.confidence,
+            'home_features': self.home_features,
+            'away_features': self.away_features,
+            'error': None,
+        }
@@ -0,0 +1,270 @@
+"""
+Wsadowe budowanie cech drużyn dla modelu przewidywania wyników
+Ładuje wszystkie zakończone mecze i potrzebne statystyki kilkoma zapytaniami,
+a cechy z ostatnich N meczów (na dzień danego meczu) liczy w pamięci przy użyciu NumPy
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from ..models import Match, MatchStatistic
+
+
+# Statystyki meczu używane jako cechy (nazwa w bazie -> klucz wewnętrzny)
+FEATURE_STATS = {
+    'Ball Possession': 'possession',
+    'Shots on target': 'shots_on_target',
+    'Expected Goals (xG)': 'xg',
+}
+
+TEAM_FEATURE_NAMES = [
+    'avg_goals_scored',
+    'avg_goals_conceded',
+    'win_rate',
+    'draw_rate',
+    'avg_possession',
+    'avg_shots_on_target',
+    'avg_xg',
+    'form',
+]
+
+DEFAULT_TEAM_FEATURES = {
+    'avg_goals_scored': 0.0,
+    'avg_goals_conceded': 0.0,
+    'win_rate': 0.0,
+    'draw_rate': 0.0,
+    'avg_possession': 50.0,
+    'avg_shots_on_target': 0.0,
+    'avg_xg': 0.0,
+    'form': 0.0,
+}
+
+
+def combine_match_features(home_features, away_features):
+    """
+    Łączy wektory cech gospodarzy i gości w wektor (lub macierz) cech meczu.
+    Kolejność kolumn jest taka sama jak w MatchPredictionService.prepare_match_features
+    """
+    home_features = np.asarray(home_features, dtype=float)
+    away_features = np.asarray(away_features, dtype=float)
+    diffs = np.stack([
+        home_features[..., 0] - away_features[..., 0],  # avg_goals_scored
+        home_features[..., 1] - away_features[..., 1],  # avg_goals_conceded
+        home_features[..., 7] - away_features[..., 7],  # form
+    ], axis=-1)
+    return np.concatenate([home_features, away_features, diffs], axis=-1)
+
+
+def match_result_label(home_score, away_score):
+    """1 (wygrana gospodarzy), 0 (remis), 2 (wygrana gości)"""
+    if home_score > away_score:
+        return 1
+    if home_score == away_score:
+        return 0
+    return 2
+
+
+class TeamTimeline:
+    """
+    Chronologiczny indeks występów wszystkich drużyn z sumami prefiksowymi.
+
+    Występy są ułożone kolejno drużyna po drużynie, a w obrębie drużyny
+    według czasu rozpoczęcia meczu. Dzięki sumom prefiksowym cechy drużyny
+    "na dzień" dowolnego meczu (tylko z meczów rozegranych wcześniej) to
+    wyszukiwanie binarne i odejmowanie dwóch wierszy - bez przecieku danych
+    z przyszłości do zbioru treningowego.
+    """
+
+    # Kolumny tablicy występów / sum prefiksowych
+    COLUMNS = [
+        'scored', 'conceded', 'win', 'draw', 'points',
+        'possession_sum', 'possession_count',
+        'shots_sum', 'shots_count',
+        'xg_sum', 'xg_count',
+    ]
+
+    def __init__(self, last_n_matches=5):
+        self.last_n_matches = last_n_matches
+        self.team_index = {}
+        self.matches = []
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.segment_start = np.zeros(0, dtype=np.int64)
+        self.segment_end = np.zeros(0, dtype=np.int64)
+        self.prefix = np.zeros((1, len(self.COLUMNS)))
+        self.is_built = False
+
+    def build(self, team_ids=None):
+        """
+        Ładuje dane z bazy i buduje indeks.
+        team_ids - tylko mecze podanych drużyn (cechy pozostałych drużyn są wtedy niepełne);
+        pozwala policzyć cechy jednej drużyny tym samym kodem co przy treningu
+        """
+        matches = Match.objects.filter(event_stage='3')
+        if team_ids is not None:
+            matches = matches.filter(participations__team_id__in=list(team_ids)).distinct()
+        self.matches = [
+            (event_id, home_id, away_id, home_ft, home_score, away_ft, away_score, int(start_time.timestamp()))
+            for event_id, home_id, away_id, home_ft, home_score, away_ft, away_score, start_time in
+            matches
+            .order_by('start_time', 'event_id')
+            .values_list(
+                'event_id', 'home_team_id', 'away_team_id',
+                'home_full_time_score', 'home_score',
+                'away_full_time_score', 'away_score',
+                'start_time',
+            )
+        ]
+
+        stats = self._load_stats(None if team_ids is None else [m[0] for m in self.matches])
+
+        # Chronologiczna lista występów każdej drużyny
+        appearances = defaultdict(list)
+        times = defaultdict(list)
+        for event_id, home_id, away_id, home_ft, home_score, away_ft, away_score, utime in self.matches:
+            home_goals = home_ft or home_score or 0
+            away_goals = away_ft or away_score or 0
+            match_stats = stats.get(event_id, {})
+            appearances[home_id].append(self._appearance(home_goals, away_goals, match_stats, 0))
+            appearances[away_id].append(self._appearance(away_goals, home_goals, match_stats, 1))
+            times[home_id].append(utime)
+            times[away_id].append(utime)
+
+        self.team_index = {team_id: i for i, team_id in enumerate(appearances)}
+        lengths = np.array([len(appearances[team_id]) for team_id in self.team_index], dtype=np.int64)
+        self.segment_end = np.cumsum(lengths)
+        self.segment_start = self.segment_end - lengths
+
+        rows = [row for team_id in self.team_index for row in appearances[team_id]]
+        values = np.array(rows, dtype=float).reshape(-1, len(self.COLUMNS))
+        self.prefix = np.vstack([np.zeros((1, len(self.COLUMNS))), np.cumsum(values, axis=0)])
+
+        # Klucz wyszukiwania: (indeks drużyny, czas) zakodowany w jednej liczbie
+        self.keys = np.array([
+            self._key(idx, utime)
+            for team_id, idx in self.team_index.items() for utime in times[team_id]
+        ], dtype=np.int64)
+
+        self.is_built = True
+        return self
+
+    @staticmethod
+    def _key(team_idx, utime):
+        return (np.int64(team_idx) << 40) + np.int64(utime)
+
+    def _load_stats(self, event_ids=None):
+        """Zwraca {event_id: {klucz_statystyki: (home, away)}} dla zakończonych (lub podanych) meczów"""
+        rows = MatchStatistic.objects.filter(period='match', stat_name__in=FEATURE_STATS)
+        rows = rows.filter(match_id__in=event_ids) if event_ids is not None else rows.filter(match__event_stage='3')
+        rows = (
+            rows
+            .order_by('id')
+            .values_list('match_id', 'stat_name', 'home_value_numeric', 'away_value_numeric')
+        )
+        stats = defaultdict(dict)
+        for event_id, stat_name, home_value, away_value in rows:
+            key = FEATURE_STATS[stat_name]
+            # Tak jak wcześniej (.first()) - liczy się pierwszy rekord danej statystyki
+            stats[event_id].setdefault(key, (home_value, away_value))
+        return stats
+
+    @staticmethod
+    def _appearance(scored, conceded, match_stats, side):
+        """Wiersz występu drużyny w układzie COLUMNS"""
+        points = 3 if scored > conceded else 1 if scored == conceded else 0
+        possession = match_stats.get('possession')
+        shots = match_stats.get('shots_on_target')
+        xg = match_stats.get('xg')
+        return (
+            scored,
+            conceded,
+            1 if points == 3 else 0,
+            1 if points == 1 else 0,
+            points,
+            (possession[side] or 50.0) if possession else 0.0, 1 if possession else 0,
+            (shots[side] or 0.0) if shots else 0.0, 1 if shots else 0,
+            (xg[side] or 0.0) if xg else 0.0, 1 if xg else 0,
+        )
+
+    def features_as_of(self, team_ids, utimes=None):
+        """
+        Macierz cech drużyn (wiersz na parę drużyna/czas) z ostatnich N meczów
+        rozegranych przed podanym czasem. Brak czasu = stan na teraz.
+        """
+        n = len(team_ids)
+        result = np.tile(
+            np.array([DEFAULT_TEAM_FEATURES[name] for name in TEAM_FEATURE_NAMES]), (n, 1)
+        )
+        idx = np.array([self.team_index.get(team_id, -1) for team_id in team_ids], dtype=np.int64)
+        known = idx >= 0
+        if not known.any():
+            return result
+
+        idx = idx[known]
+        if utimes is None:
+            end = self.segment_end[idx]
+        else:
+            utimes = np.asarray(utimes, dtype=np.int64)[known]
+            end = np.searchsorted(self.keys, self._key(idx, utimes), side='left')
+        start = np.maximum(self.segment_start[idx], end - self.last_n_matches)
+        total = (end - start).astype(float)
+        window = self.prefix[end] - self.prefix[start]
+
+        has_matches = total > 0
+        safe_total = np.where(has_matches, total, 1.0)
+
+        def stat_mean(column, default):
+            count = window[:, column + 1]
+            return np.where(count > 0, window[:, column] / np.where(count > 0, count, 1.0), default)
+
+        features = np.column_stack([
+            window[:, 0] / safe_total,
+            window[:, 1] / safe_total,
+            window[:, 2] / safe_total,
+            window[:, 3] / safe_total,
+            stat_mean(5, 50.0),
+            stat_mean(7, 0.0),
+            stat_mean(9, 0.0),
+            window[:, 4] / (safe_total * 3),
+        ])
+        features[~has_matches] = result[0]
+        result[known] = features
+        return result
+
+    def team_features(self, team_id, utime=None):
+        """Cechy drużyny w postaci słownika (jak extract_team_features)"""
+        vector = self.features_as_of([team_id], None if utime is None else [utime])[0]
+        return {name: float(value) for name, value in zip(TEAM_FEATURE_NAMES, vector)}
+
+    def match_features(self, home_team_id, away_team_id, utime=None):
+        """Zwraca (wektor cech meczu, cechy gospodarzy, cechy gości)"""
+        home_features = self.team_features(home_team_id, utime)
+        away_features = self.team_features(away_team_id, utime)
+        features = combine_match_features(
+            [home_features[name] for name in TEAM_FEATURE_NAMES],
+            [away_features[name] for name in TEAM_FEATURE_NAMES],
+        )
+        return features, home_features, away_features
+
+    def matrix_for(self, home_team_ids, away_team_ids, utimes=None):
+        """Macierz cech dla listy meczów (cechy na dzień rozpoczęcia meczu)"""
+        return combine_match_features(
+            self.features_as_of(home_team_ids, utimes),
+            self.features_as_of(away_team_ids, utimes),
+        )
+
+    def training_matrix(self, limit=500):
+        """
+        Zwraca (X, y) dla ostatnich `limit` zakończonych meczów z pełnym wynikiem.
+        Cechy każdego wiersza pochodzą wyłącznie z meczów rozegranych wcześniej
+        """
+        if not self.is_built:
+            self.build()
+
+        rows = [m for m in self.matches if m[3] is not None and m[5] is not None]
+        rows = rows[-limit:] if limit else rows
+        if not rows:
+            return np.zeros((0, len(TEAM_FEATURE_NAMES) * 2 + 3)), np.zeros(0, dtype=int)
+
+        X = self.matrix_for([m[1] for m in rows], [m[2] for m in rows], [m[7] for m in rows])
+        y = np.array([match_result_label(m[3], m[5]) for m in rows])
+        return X, y
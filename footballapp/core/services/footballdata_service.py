@@ -1,16 +1,22 @@
 import requests
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait
+from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from django.db import transaction
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 from ..models import (
     League, Season, Team, Match, MatchStatistic, StatDefinition,
-    Player, Country, TeamSquad
+    Player, Country, TeamSquad, IngestionState
 )
+from . import league_service, result_service, team_service, view_cache
+from .http_cache import CacheMiss, ResponseCache, make_key
+from .http_client import get_http_client
 
 # Załaduj .env
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -20,26 +26,42 @@ load_dotenv(dotenv_path=BASE_DIR / '.env')
 class FootballDataService:
     BASE_URL = "https://api.sportdb.dev/api/flashscore"
 
-    def __init__(self):
-        self.session = requests.Session()
+    # Czas ważności odpowiedzi w pamięci podręcznej (sekundy, None = nie wygasa)
+    RESULTS_CACHE_TTL = 10 * 60
+    STATS_CACHE_TTL = None
+    EMPTY_STATS_CACHE_TTL = 10 * 60
+    TEAM_CACHE_TTL = 24 * 60 * 60
 
-        # Pobierz API key
+    def __init__(self, use_cache: bool = None, offline: bool = False):
+        # Wspólna pula połączeń z ponawianiem i limitami per host
+        self.http = get_http_client()
+
+        # Pamięć podręczna odpowiedzi; w trybie offline tylko z niej korzystamy
+        if use_cache is None:
+            use_cache = getattr(settings, 'HTTP_CACHE_ENABLED', True)
+        self.offline = offline
+        self.cache = ResponseCache() if (use_cache or offline) else None
+
+        # Pobierz API key (w trybie offline nie wysyłamy zapytań, więc klucz nie jest wymagany)
         self.api_key = os.getenv('SPORTDB_API_KEY') or getattr(settings, 'SPORTDB_API_KEY', None)
 
-        if not self.api_key:
+        if not self.api_key and not offline:
             raise ValueError(
                 "❌ SPORTDB_API_KEY not found!\n"
                 f"Create . env file at:  {BASE_DIR / '.env'}\n"
                 "With:  SPORTDB_API_KEY=your_api_key_here"
             )
 
-        # Ustaw autoryzację
-        self.session.headers.update({
-            'X-API-Key': self.api_key,
+        # Nagłówki autoryzacji (dokładane do każdego zapytania)
+        self.headers = {
+            'X-API-Key': self.api_key or '',
             'Content-Type': 'application/json',
-        })
+        }
 
-        print(f"✓ API initialized with key: {self.api_key[: 10]}...")
+        if self.api_key:
+            print(f"✓ API initialized with key: {self.api_key[: 10]}...")
+        else:
+            print("✓ API initialized in offline mode (cached responses only)")
 
     # ============ METODY DLA MECZY ============
 
@@ -49,166 +71,370 @@ class FootballDataService:
         url = f"{self.BASE_URL}/football/{country_id}/{league_template_id}/{season}/results"
         params = {'page': page}
 
-        try:
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-            return data.get('results', []) if isinstance(data, dict) else data
-
-        except requests.exceptions.HTTPError as e:
-            print(f"❌ HTTP Error {response.status_code}: {e}")
-            print(f"   URL: {url}")
-            print(f"   Response: {response.text[: 500]}")
-            raise
+        data = self._get_json(url, params=params, ttl=self.RESULTS_CACHE_TTL)
+        return data.get('results', []) if isinstance(data, dict) else data
 
     def fetch_match_stats(self, event_id: str) -> List[Dict]:
         """Pobiera statystyki dla konkretnego meczu"""
         url = f"{self.BASE_URL}/match/{event_id}/stats"
 
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
-
+            # Statystyki zakończonego meczu się nie zmieniają; pusta odpowiedź może jeszcze się pojawić
+            return self._get_json(
+                url,
+                ttl=lambda data: self.STATS_CACHE_TTL if data else self.EMPTY_STATS_CACHE_TTL
+            )
         except requests.exceptions.HTTPError as e:
             print(f"❌ Error fetching stats for {event_id}: {e}")
             raise
 
-    @transaction.atomic
-    def save_match(self, match_data: Dict) -> Match:
-        """Zapisuje mecz do bazy danych"""
+    def _get_json(self, url: str, params: Dict = None, ttl=None):
+        """
+        GET z pamięcią podręczną. Świeża odpowiedź jest zwracana bez zapytania,
+        przeterminowana jest odświeżana warunkowo (ETag / Last-Modified).
+        ttl może być funkcją danych odpowiedzi.
+        """
+        key = make_key(url, params)
+        cached = self.cache.get(key) if self.cache else None
 
-        # ✅ LIGA
-        league, _ = League.objects.get_or_create(
-            tournament_id=match_data['tournamentId'],
-            defaults={
-                'tournament_template_id': match_data['tournamentTemplateId'],
-                'name': match_data['tournamentName'],
-                'country': match_data['tournamentName'].split(':  ')[0].strip()
-            }
-        )
+        if self.offline:
+            if cached is None:
+                raise CacheMiss(f"No cached response for {key}")
+            return cached.data
+        if cached is not None and cached.is_fresh:
+            return cached.data
 
-        # ✅ SEZON
-        season, _ = Season.objects.get_or_create(
-            league=league,
-            season_id=match_data['season'],
-            defaults={
-                'name': match_data.get('seasonName', 'Unknown'),
-                'tournament_stage_id': match_data['tournamentStageId']
-            }
-        )
+        headers = {**self.headers, **(cached.conditional_headers() if cached else {})}
+        response = self.http.get(url, params=params, headers=headers)
 
-        # ✅ DRUŻYNA GOSPODARZY
-        home_team, _ = Team.objects.get_or_create(
-            participant_id=match_data['homeParticipantIds'],
-            defaults={
-                'name': match_data['homeName'],
-                'short_name': match_data['homeFirstName'],
-                'three_char_name': match_data['home3CharName'],
-                'logo': f"https://static.flashscore.com/res/image/data/{match_data['homeLogo']}",
-                'slug': match_data['homeParticipantNameUrl'],
-            }
-        )
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(key, ttl=cached.ttl)
+            return cached.data
 
-        # ✅ DRUŻYNA GOŚCI
-        away_team, _ = Team.objects.get_or_create(
-            participant_id=match_data['awayParticipantIds'],
-            defaults={
-                'name': match_data['awayName'],
-                'short_name': match_data['awayFirstName'],
-                'three_char_name': match_data['away3CharName'],
-                'logo': f"https://static.flashscore.com/res/image/data/{match_data['awayLogo']}",
-                'slug': match_data['awayParticipantNameUrl'],
-            }
-        )
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            print(f"❌ HTTP Error {response.status_code}: {e}")
+            print(f"   URL: {url}")
+            print(f"   Response: {response.text[: 500]}")
+            raise
+
+        data = response.json()
+        if self.cache:
+            self.cache.set(
+                key, data,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+                ttl=ttl(data) if callable(ttl) else ttl,
+            )
+        return data
+
+    # Mapowanie eventStage na event_stage_id
+    EVENT_STAGE_MAPPING = {
+        'SCHEDULED': '1',
+        'LIVE': '2',
+        'FINISHED': '3',
+        'POSTPONED': '4',
+        'CANCELLED': '5',
+    }
+
+    # Pola meczu nadpisywane przy ponownym zapisie (upsert)
+    MATCH_UPDATE_FIELDS = [
+        'season', 'round', 'home_team', 'away_team',
+        'home_event_participant_id', 'away_event_participant_id',
+        'start_time', 'start_utime', 'event_stage', 'event_stage_id',
+        'home_score', 'away_score', 'home_full_time_score', 'away_full_time_score',
+        'home_halftime_score', 'away_halftime_score', 'winner', 'ft_winner',
+        'has_live_centre', 'has_lineups', 'home_goal_under_review', 'away_goal_under_review',
+        'updated_at',
+    ]
+
+    @staticmethod
+    def _league_defaults(match_data: Dict) -> Dict:
+        return {
+            'tournament_template_id': match_data['tournamentTemplateId'],
+            'name': match_data['tournamentName'],
+            'country': match_data['tournamentName'].split(':  ')[0].strip()
+        }
+
+    @staticmethod
+    def _season_defaults(match_data: Dict) -> Dict:
+        return {
+            'name': match_data.get('seasonName', 'Unknown'),
+            'tournament_stage_id': match_data['tournamentStageId']
+        }
 
+    @staticmethod
+    def _team_defaults(match_data: Dict, side: str) -> Dict:
+        """side: 'home' albo 'away'"""
+        return {
+            'name': match_data[f'{side}Name'],
+            'short_name': match_data[f'{side}FirstName'],
+            'three_char_name': match_data[f'{side}3CharName'],
+            'logo': f"https://static.flashscore.com/res/image/data/{match_data[f'{side}Logo']}",
+            'slug': match_data[f'{side}ParticipantNameUrl'],
+        }
+
+    def _match_defaults(self, match_data: Dict) -> Dict:
+        """Pola meczu (bez kluczy obcych) na podstawie danych z API"""
         # ✅ KONWERSJA DATY
         start_time = datetime.fromisoformat(
             match_data['startDateTimeUtc'].replace('Z', '+00:00')
         )
 
-        # ✅ MAPOWANIE eventStage na event_stage_id
-        event_stage_mapping = {
-            'SCHEDULED': '1',
-            'LIVE': '2',
-            'FINISHED': '3',
-            'POSTPONED': '4',
-            'CANCELLED': '5',
+        event_stage_raw = match_data.get('eventStage', '')
+        event_stage = self.EVENT_STAGE_MAPPING.get(event_stage_raw, match_data.get('eventStageId', '1'))
+
+        return {
+            'round': match_data['round'],
+            'home_event_participant_id': match_data['homeEventParticipantId'],
+            'away_event_participant_id': match_data['awayEventParticipantId'],
+            'start_time': start_time,
+            'start_utime': int(match_data['startUtime']),
+            'event_stage': event_stage,  # ✅ Teraz poprawnie '3' dla FINISHED
+            'event_stage_id': match_data.get('eventStageId', event_stage),
+            'home_score': int(match_data.get('homeScore', 0) or 0),
+            'away_score': int(match_data.get('awayScore', 0) or 0),
+            'home_full_time_score': int(match_data.get('homeFullTimeScore', 0) or 0),
+            'away_full_time_score': int(match_data.get('awayFullTimeScore', 0) or 0),
+            'home_halftime_score': int(match_data.get('homeResultPeriod2', 0) or 0),
+            'away_halftime_score': int(match_data.get('awayResultPeriod2', 0) or 0),
+            'winner': match_data.get('winner'),
+            'ft_winner': match_data.get('ftWinner'),
+            'has_live_centre': bool(int(match_data.get('hasLiveCentre', 0))),
+            'has_lineups': bool(int(match_data.get('lineps', 0))),
+            'home_goal_under_review': int(match_data.get('homeGoalUnderReview', 0)),
+            'away_goal_under_review': int(match_data.get('awayGoalUnderReview', 0)),
         }
 
-        event_stage_raw = match_data.get('eventStage', '')
-        event_stage = event_stage_mapping.get(event_stage_raw, match_data.get('eventStageId', '1'))
-
-        # ✅ UTWÓRZ LUB ZAKTUALIZUJ MECZ
-        match, created = Match.objects.update_or_create(
-            event_id=match_data['eventId'],
-            defaults={
-                'season': season,
-                'round': match_data['round'],
-                'home_team': home_team,
-                'away_team': away_team,
-                'home_event_participant_id': match_data['homeEventParticipantId'],
-                'away_event_participant_id': match_data['awayEventParticipantId'],
-                'start_time': start_time,
-                'start_utime': int(match_data['startUtime']),
-                'event_stage': event_stage,  # ✅ Teraz poprawnie '3' dla FINISHED
-                'event_stage_id': match_data.get('eventStageId', event_stage),
-                'home_score': int(match_data.get('homeScore', 0) or 0),
-                'away_score': int(match_data.get('awayScore', 0) or 0),
-                'home_full_time_score': int(match_data.get('homeFullTimeScore', 0) or 0),
-                'away_full_time_score': int(match_data.get('awayFullTimeScore', 0) or 0),
-                'home_halftime_score': int(match_data.get('homeResultPeriod2', 0) or 0),
-                'away_halftime_score': int(match_data.get('awayResultPeriod2', 0) or 0),
-                'winner': match_data.get('winner'),
-                'ft_winner': match_data.get('ftWinner'),
-                'has_live_centre': bool(int(match_data.get('hasLiveCentre', 0))),
-                'has_lineups': bool(int(match_data.get('lineps', 0))),
-                'home_goal_under_review': int(match_data.get('homeGoalUnderReview', 0)),
-                'away_goal_under_review': int(match_data.get('awayGoalUnderReview', 0)),
-            }
+    def save_match(self, match_data: Dict) -> Match:
+        """Zapisuje mecz do bazy danych"""
+        return self.save_matches([match_data])[0]
+
+    @transaction.atomic
+    def save_matches(self, matches_data: List[Dict]) -> List[Match]:
+        """
+        Zapisuje całą stronę meczów naraz: ligi, sezony i drużyny są
+        rozwiązywane jednym zapytaniem IN każde, brakujące tworzone przez
+        bulk_create, a mecze (i ich wiersze TeamMatch) zapisywane jednym upsertem
+        """
+        # Ostatnie wystąpienie meczu na stronie wygrywa
+        matches_data = list({data['eventId']: data for data in matches_data}.values())
+        if not matches_data:
+            return []
+
+        # ✅ LIGI
+        leagues = self._resolve_leagues(matches_data)
+
+        # ✅ SEZONY
+        seasons = self._resolve_seasons(matches_data, leagues)
+
+        # ✅ DRUŻYNY
+        teams = self._resolve_teams(matches_data)
+
+        # Poprzedni stan wyników - do wykrycia nowych / zmienionych wyników
+        event_ids = [data['eventId'] for data in matches_data]
+        previous_results = {
+            row[0]: row[1:]
+            for row in Match.objects.filter(event_id__in=event_ids).values_list(
+                'event_id', *result_service.RESULT_FIELDS
+            )
+        }
+
+        # ✅ UTWÓRZ LUB ZAKTUALIZUJ MECZE
+        matches = []
+        for data in matches_data:
+            league = leagues[data['tournamentId']]
+            matches.append(Match(
+                event_id=data['eventId'],
+                season=seasons[(league.pk, int(data['season']))],
+                home_team=teams[data['homeParticipantIds']],
+                away_team=teams[data['awayParticipantIds']],
+                **self._match_defaults(data),
+            ))
+
+        Match.objects.bulk_create(
+            matches,
+            update_conflicts=True,
+            unique_fields=['event_id'],
+            update_fields=self.MATCH_UPDATE_FIELDS,
         )
+        # Indeks meczów drużyn (bulk_create nie wysyła post_save)
+        team_service.sync_team_matches(matches, stale_match_ids=[
+            match.event_id for match in matches
+            if match.event_id in previous_results
+            and previous_results[match.event_id][2:4] != (match.home_team_id, match.away_team_id)
+        ])
+        view_cache.bump_data_version('matches')
+
+        # Nowe lub zmienione wyniki (także mecz, który przestał być zakończony)
+        changed = []
+        for match in matches:
+            previous = previous_results.get(match.event_id)
+            current = result_service.result_key(match)
+            if result_service.is_result_change(previous, current):
+                changed.append((previous, current))
+        result_service.handle_result_changes(changed)
+
+        return matches
+
+    def _resolve_leagues(self, matches_data: List[Dict]) -> Dict[str, League]:
+        """{tournament_id: League} - brakujące ligi tworzone jednym bulk_create"""
+        tournament_ids = {data['tournamentId'] for data in matches_data}
+        leagues = League.objects.in_bulk(tournament_ids, field_name='tournament_id')
+
+        missing = {}
+        for data in matches_data:
+            if data['tournamentId'] not in leagues and data['tournamentId'] not in missing:
+                missing[data['tournamentId']] = League(
+                    tournament_id=data['tournamentId'], **self._league_defaults(data)
+                )
+        if missing:
+            League.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            league_service.bump_league_version()
+            leagues.update(League.objects.in_bulk(missing, field_name='tournament_id'))
+        return leagues
+
+    def _resolve_seasons(self, matches_data: List[Dict], leagues: Dict[str, League]) -> Dict:
+        """{(league_pk, season_id): Season} - brakujące sezony tworzone jednym bulk_create"""
+        wanted = {(leagues[data['tournamentId']].pk, int(data['season'])): data for data in matches_data}
+
+        def load():
+            return {
+                (season.league_id, season.season_id): season
+                for season in Season.objects.filter(
+                    league_id__in={league_pk for league_pk, _ in wanted},
+                    season_id__in={season_id for _, season_id in wanted},
+                )
+            }
 
-        return match
+        seasons = load()
+        missing = [
+            Season(league_id=league_pk, season_id=season_id, **self._season_defaults(data))
+            for (league_pk, season_id), data in wanted.items() if (league_pk, season_id) not in seasons
+        ]
+        if missing:
+            Season.objects.bulk_create(missing, ignore_conflicts=True)
+            seasons = load()
+        return seasons
+
+    def _resolve_teams(self, matches_data: List[Dict]) -> Dict[str, Team]:
+        """{participant_id: Team} - brakujące drużyny tworzone jednym bulk_create"""
+        wanted = {}
+        for data in matches_data:
+            for side in ('home', 'away'):
+                wanted.setdefault(data[f'{side}ParticipantIds'], (data, side))
+
+        teams = Team.objects.in_bulk(wanted)
+        missing = [
+            Team(participant_id=participant_id, **self._team_defaults(data, side))
+            for participant_id, (data, side) in wanted.items() if participant_id not in teams
+        ]
+        if missing:
+            Team.objects.bulk_create(missing, ignore_conflicts=True)
+            teams.update(Team.objects.in_bulk([team.participant_id for team in missing]))
+
+        not_created = set(wanted) - set(teams)
+        if not_created:
+            raise ValueError(f"Could not create teams: {', '.join(sorted(not_created))}")
+        return teams
+
+    PERIOD_MAPPING = {
+        'Match': 'match',
+        '1st Half': '1st_half',
+        '2nd Half': '2nd_half'
+    }
 
-    @transaction.atomic
     def save_match_statistics(self, event_id: str, stats_data: List[Dict]):
         """Zapisuje statystyki meczu do bazy danych"""
-        try:
-            match = Match.objects.get(event_id=event_id)
-        except Match.DoesNotExist:
-            raise ValueError(f"Match with event_id {event_id} does not exist")
-
-        # Usuń stare statystyki (opcjonalnie - jeśli chcesz aktualizować)
-        # match.statistics.all().delete()
+        return self.save_matches_statistics({event_id: stats_data})
 
-        period_mapping = {
-            'Match': 'match',
-            '1st Half': '1st_half',
-            '2nd Half': '2nd_half'
+    @transaction.atomic
+    def save_matches_statistics(self, stats_by_event: Dict[str, List[Dict]]) -> int:
+        """
+        Zapisuje statystyki wielu meczów jednym upsertem.
+        Wartości liczbowe liczone są w Pythonie (bulk_create pomija
+        MatchStatistic.save), a brakujące definicje statystyk dodawane są
+        jednym zapytaniem z pominięciem istniejących.
+        Na koniec przeliczane są średnie statystyk drużyn z tych meczów
+        """
+        teams_by_event = {
+            event_id: (home_team_id, away_team_id)
+            for event_id, home_team_id, away_team_id in Match.objects.filter(
+                event_id__in=list(stats_by_event)
+            ).values_list('event_id', 'home_team_id', 'away_team_id')
         }
+        missing = set(stats_by_event) - set(teams_by_event)
+        if missing:
+            raise ValueError(f"Match with event_id {', '.join(sorted(missing))} does not exist")
+
+        rows = {}
+        definitions = {}
+        for event_id, stats_data in stats_by_event.items():
+            for period_data in stats_data:
+                period = self.PERIOD_MAPPING.get(period_data['period'], 'match')
+
+                for stat in period_data['stats']:
+                    definitions.setdefault(stat['statId'], stat['statName'])
+                    # Ostatnia wartość wygrywa (jak przy update_or_create)
+                    rows[(event_id, period, stat['statId'], stat['statName'])] = MatchStatistic(
+                        match_id=event_id,
+                        period=period,
+                        stat_id=stat['statId'],
+                        stat_name=stat['statName'],
+                        home_value=stat['homeValue'],
+                        away_value=stat['awayValue'],
+                        home_value_numeric=MatchStatistic._extract_numeric(stat['homeValue']),
+                        away_value_numeric=MatchStatistic._extract_numeric(stat['awayValue']),
+                    )
 
-        for period_data in stats_data:
-            period = period_mapping.get(period_data['period'], 'match')
+        self._ensure_stat_definitions(definitions)
 
-            for stat in period_data['stats']:
-                # Zapisz definicję statystyki
-                StatDefinition.objects.get_or_create(
-                    stat_id=stat['statId'],
-                    defaults={'stat_name': stat['statName']}
-                )
+        MatchStatistic.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=['match', 'period', 'stat_id', 'stat_name'],
+            update_fields=['home_value', 'away_value', 'home_value_numeric', 'away_value_numeric'],
+            batch_size=500,
+        )
+        # Średnie statystyk tylko dla drużyn z tych meczów
+        team_service.update_stat_aggregates(
+            team_id for teams in teams_by_event.values() for team_id in teams
+        )
+        view_cache.bump_data_version('stats')
+        return len(rows)
 
-                # ✅ ZMIANA: użyj update_or_create zamiast create
-                MatchStatistic.objects.update_or_create(
-                    match=match,
-                    period=period,
-                    stat_id=stat['statId'],
-                    stat_name=stat['statName'],
-                    defaults={
-                        'home_value': stat['homeValue'],
-                        'away_value': stat['awayValue']
-                    }
-                )
+    def _ensure_stat_definitions(self, definitions: Dict[str, str]):
+        """
+        Tworzy brakujące StatDefinition (bez nadpisywania istniejących nazw).
+        Bez pamięci podręcznej w procesie - zapamiętane stat_id przetrwałyby
+        wycofaną transakcję albo wyczyszczenie bazy, a definicji w jednej
+        paczce jest kilkadziesiąt, więc jeden INSERT ... ON CONFLICT wystarcza
+        """
+        if definitions:
+            StatDefinition.objects.bulk_create(
+                [StatDefinition(stat_id=stat_id, stat_name=name) for stat_id, name in definitions.items()],
+                ignore_conflicts=True,
+            )
+
+    def _save_matches_page(self, matches_data: List[Dict]) -> List[Match]:
+        """
+        Zapisuje stronę wyników jednym upsertem. Jeśli zapis zbiorczy się nie
+        powiedzie, zapisuje mecze pojedynczo, żeby jeden błędny rekord nie
+        blokował całej strony
+        """
+        try:
+            return self.save_matches(matches_data)
+        except Exception as e:
+            print(f"   ⚠️  Bulk save failed ({e}), saving matches one by one...")
+
+        saved = []
+        for match_data in matches_data:
+            try:
+                saved.append(self.save_match(match_data))
+            except Exception as e:
+                print(f"❌ Error saving match:  {e}")
+        return saved
 
     def fetch_and_save_season(self, country_id: str, league_template_id: str,
                               season: str, max_pages: int = 10):
@@ -232,32 +458,201 @@ class FootballDataService:
 
             print(f"   Found {len(matches)} matches")
 
-            for match_data in matches:
-                try:
-                    match = self.save_match(match_data)
-                    all_matches.append(match)
-
-                    # Pobierz statystyki tylko dla zakończonych meczy
-                    if match.event_stage == '3':  # FINISHED
-                        try:
-                            print(f"   📊 Fetching stats for {match.event_id}...")
-                            stats = self.fetch_match_stats(match.event_id)
-                            self.save_match_statistics(match.event_id, stats)
-                        except Exception as e:
-                            print(f"   ⚠️  Error fetching stats:  {e}")
+            for match in self._save_matches_page(matches):
+                all_matches.append(match)
 
-                except Exception as e:
-                    print(f"❌ Error saving match:  {e}")
+                # Pobierz statystyki tylko dla zakończonych meczy
+                if match.event_stage == '3':  # FINISHED
+                    try:
+                        print(f"   📊 Fetching stats for {match.event_id}...")
+                        stats = self.fetch_match_stats(match.event_id)
+                        self.save_match_statistics(match.event_id, stats)
+                    except Exception as e:
+                        print(f"   ⚠️  Error fetching stats:  {e}")
+
+            # Jeśli mniej niż 20 meczy, prawdopodobnie ostatnia strona
+            if len(matches) < 20:
+                print(f"✓ Reached last page (page {page})")
+                break
+
+        print(f"\n✅ Total matches saved: {len(all_matches)}")
+        return all_matches
+
+    def fetch_and_save_season_incremental(self, country_id: str, league_template_id: str,
+                                          season: str, max_pages: int = 10):
+        """
+        Tryb przyrostowy: zapisuje tylko nowe lub zmienione mecze i pobiera
+        statystyki tylko dla zakończonych meczów, które ich jeszcze nie mają.
+        Strony wyników zaczynają się od najnowszych meczów, więc przeglądanie
+        kończy się na pierwszej stronie zawierającej wyłącznie mecze już
+        zamknięte (ze statystykami) i nie nowsze niż zapisany znacznik czasu.
+        Wcześniejsze zatrzymanie dotyczy tylko sezonu przejrzanego kiedyś do
+        końca (state.last_page > 0) - przerwane pierwsze pobieranie (błąd sieci,
+        limit stron) jest przy następnym uruchomieniu kontynuowane do ostatniej strony.
+        """
+        state, _ = IngestionState.objects.get_or_create(
+            country_id=country_id, league_template_id=league_template_id, season=season
+        )
+        final_ids = set(state.stats_event_ids)
+        watermark = state.last_start_utime
+        walked_to_end = state.last_page > 0
+        all_matches = []
+
+        for page in range(1, max_pages + 1):
+            print(f"📄 Fetching page {page}...")
+
+            try:
+                matches = self.fetch_matches(country_id, league_template_id, season, page)
+            except Exception as e:
+                print(f"❌ Error fetching page {page}: {e}")
+                break
+
+            if not matches:
+                print(f"✓ No more matches on page {page}")
+                state.last_page = page - 1
+                break
+
+            # Mecze zakończone ze statystykami nie mogą się już zmienić
+            changed = [m for m in matches if m['eventId'] not in final_ids]
+            print(f"   Found {len(matches)} matches, {len(changed)} new or changed")
+
+            saved = self._save_matches_page(changed) if changed else []
+            all_matches.extend(saved)
+
+            finished = [m for m in saved if m.event_stage == '3']
+            # Statystyki mogły zostać zapisane wcześniej (np. pełnym pobraniem)
+            final_ids.update(
+                MatchStatistic.objects.filter(match_id__in=[m.event_id for m in finished])
+                .values_list('match_id', flat=True).distinct()
+            )
+            for match in finished:
+                watermark = max(watermark, match.start_utime)
+                if match.event_id in final_ids:
                     continue
+                try:
+                    print(f"   📊 Fetching stats for {match.event_id}...")
+                    stats = self.fetch_match_stats(match.event_id)
+                    self.save_match_statistics(match.event_id, stats)
+                    final_ids.add(match.event_id)
+                except Exception as e:
+                    print(f"   ⚠️  Error fetching stats:  {e}")
+
+            if walked_to_end and not changed and all(int(m['startUtime']) <= state.last_start_utime for m in matches):
+                print(f"✓ Page {page} has no new matches - stopping")
+                break
 
             # Jeśli mniej niż 20 meczy, prawdopodobnie ostatnia strona
             if len(matches) < 20:
                 print(f"✓ Reached last page (page {page})")
+                state.last_page = page
                 break
 
+        state.stats_event_ids = sorted(final_ids)
+        state.last_start_utime = watermark
+        state.last_run_at = timezone.now()
+        state.save()
+
+        print(f"\n✅ Total matches saved: {len(all_matches)}")
+        return all_matches
+
+    def fetch_and_save_season_concurrent(self, country_id: str, league_template_id: str,
+                                         season: str, max_pages: int = 10, workers: int = 4):
+        """
+        Jak fetch_and_save_season, ale strony wyników i statystyki meczów
+        pobierane są równolegle (pula wątków). Tempo zapytań ogranicza klient
+        HTTP (HTTP_HOST_LIMITS), wspólny dla wszystkich wątków.
+        Zapis do bazy odbywa się wyłącznie w bieżącym wątku (jeden "writer"),
+        więc SQLite nigdy nie jest zapisywany z kilku wątków naraz.
+        """
+        all_matches = []
+        stats_futures = {}
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            page = 1
+            last_page_reached = False
+
+            while page <= max_pages and not last_page_reached:
+                window = range(page, min(page + workers, max_pages + 1))
+                print(f"📄 Fetching pages {window.start}-{window.stop - 1}...")
+                page_futures = [
+                    (p, pool.submit(self.fetch_matches, country_id, league_template_id, season, p))
+                    for p in window
+                ]
+
+                for p, future in page_futures:
+                    if last_page_reached:
+                        future.cancel()
+                        continue
+
+                    try:
+                        matches = future.result()
+                    except Exception as e:
+                        print(f"❌ Error fetching page {p}: {e}")
+                        last_page_reached = True
+                        continue
+
+                    if not matches:
+                        print(f"✓ No more matches on page {p}")
+                        last_page_reached = True
+                        continue
+
+                    print(f"   Page {p}: found {len(matches)} matches")
+
+                    for match in self._save_matches_page(matches):
+                        all_matches.append(match)
+
+                        # Statystyki tylko dla zakończonych meczy - pobierane w tle
+                        if match.event_stage == '3':  # FINISHED
+                            stats_future = pool.submit(self.fetch_match_stats, match.event_id)
+                            stats_futures[stats_future] = match.event_id
+
+                    # Jeśli mniej niż 20 meczy, prawdopodobnie ostatnia strona
+                    if len(matches) < 20:
+                        print(f"✓ Reached last page (page {p})")
+                        last_page_reached = True
+
+                    # Zapisz statystyki, które już zostały pobrane
+                    self._save_completed_stats(stats_futures, wait=False)
+
+                page = window.stop
+
+            self._save_completed_stats(stats_futures, wait=True)
+
         print(f"\n✅ Total matches saved: {len(all_matches)}")
         return all_matches
 
+    STATS_BATCH_SIZE = 50
+
+    def _save_completed_stats(self, stats_futures: Dict, wait: bool):
+        """
+        Etap zapisu statystyk: zbiera wyniki zakończonych pobrań (opcjonalnie
+        czeka na resztę) i zapisuje je paczkami jednym upsertem
+        """
+        if wait:
+            futures_wait(list(stats_futures))
+        done = [f for f in list(stats_futures) if f.done()]
+
+        batch = {}
+        for future in done:
+            event_id = stats_futures.pop(future)
+            try:
+                batch[event_id] = future.result()
+            except Exception as e:
+                print(f"   ⚠️  Error fetching stats for {event_id}:  {e}")
+
+        event_ids = list(batch)
+        for i in range(0, len(event_ids), self.STATS_BATCH_SIZE):
+            chunk = {event_id: batch[event_id] for event_id in event_ids[i:i + self.STATS_BATCH_SIZE]}
+            try:
+                self.save_matches_statistics(chunk)
+            except Exception as e:
+                print(f"   ⚠️  Bulk stats save failed ({e}), saving one by one...")
+                for event_id, stats in chunk.items():
+                    try:
+                        self.save_match_statistics(event_id, stats)
+                    except Exception as e:
+                        print(f"   ⚠️  Error saving stats for {event_id}:  {e}")
+
     # ============ METODY DLA DRUŻYN I ZAWODNIKÓW ============
 
     def fetch_team_details(self, team_slug: str, team_id: str) -> Dict:
@@ -265,9 +660,7 @@ class FootballDataService:
         url = f"{self.BASE_URL}/team/{team_slug}/{team_id}"
 
         try:
-            response = self.session.get(url)
-            response.raise_for_status()
-            return response.json()
+            return self._get_json(url, ttl=self.TEAM_CACHE_TTL)
         except requests.exceptions.HTTPError as e:
             print(f"❌ Error fetching team {team_slug}:  {e}")
             raise
@@ -278,6 +671,20 @@ class FootballDataService:
         team = Team.objects.get(participant_id=team_data['id'])
 
         # Aktualizuj szczegóły drużyny
+        self._apply_team_details(team, team_data)
+        team.save()
+        view_cache.bump_data_version('teams')
+
+        return team
+
+    # Pola drużyny nadpisywane przy zapisie szczegółów (bulk_update)
+    TEAM_DETAIL_FIELDS = [
+        'slug', 'name', 'logo', 'team_class', 'stadium_name', 'stadium_capacity',
+        'details_fetched', 'last_updated',
+    ]
+
+    @staticmethod
+    def _apply_team_details(team: Team, team_data: Dict):
         team.slug = team_data.get('slug', team.slug)
         team.name = team_data.get('teamName', team.name)
         team.logo = team_data.get('teamLogo', '')
@@ -285,51 +692,120 @@ class FootballDataService:
         team.stadium_name = team_data.get('stadiumName', '')
         team.stadium_capacity = team_data.get('stadiumCapacity')
         team.details_fetched = True
-        team.save()
-
-        return team
+        team.last_updated = timezone.now()
 
     @transaction.atomic
-    def save_team_squad(self, team: Team, squad_data: List[Dict]):
-        """Zapisuje kadrę drużyny do bazy danych"""
-        for tournament_squad in squad_data:
-            tournament_id = tournament_squad.get('tournamentId', '')
-            tournament_type = tournament_squad.get('tournamentType', '')
-
-            for player_data in tournament_squad.get('players', []):
-                # Zapisz kraj
-                country = None
-                if player_data.get('countryId'):
-                    country, _ = Country.objects.get_or_create(
-                        country_id=player_data['countryId'],
-                        defaults={'name': player_data.get('countryName', 'Unknown')}
+    def save_teams_with_squads(self, teams_data: List[Dict]) -> List[Team]:
+        """
+        Zapisuje paczkę pobranych drużyn: szczegóły jednym bulk_update,
+        a kraje, zawodników i składy wsadowo (save_squads)
+        """
+        teams = Team.objects.in_bulk([team_data['id'] for team_data in teams_data])
+        squads = {}
+        for team_data in teams_data:
+            team = teams.get(team_data['id'])
+            if team is None:
+                print(f"✗ Unknown team {team_data['id']} - skipping")
+                continue
+            self._apply_team_details(team, team_data)
+            squads[team] = team_data.get('squad', [])
+
+        Team.objects.bulk_update(list(squads), self.TEAM_DETAIL_FIELDS)
+        view_cache.bump_data_version('teams')
+        self.save_squads(squads)
+        return list(squads)
+
+    SQUAD_BATCH_SIZE = 500
+
+    def save_squads(self, squads: Dict[Team, List[Dict]]) -> int:
+        """
+        Wsadowy zapis kadr {drużyna: squad z API}: kraje, zawodnicy i członkostwa
+        w składach zapisywane są kilkoma upsertami zamiast zapytań per zawodnik.
+        Członkostwa zawodników, których nie ma już w składzie danego turnieju, są usuwane
+        """
+        countries = {}
+        players = {}
+        memberships = {}
+        # Składy obecne w danych: {(drużyna, turniej): {player_id}}
+        rosters = {}
+
+        for team, squad_data in squads.items():
+            for tournament_squad in squad_data:
+                tournament_id = tournament_squad.get('tournamentId', '')
+                tournament_type = tournament_squad.get('tournamentType', '')
+                roster = rosters.setdefault((team.pk, tournament_id), set())
+
+                for player_data in tournament_squad.get('players', []):
+                    country_id = player_data.get('countryId')
+                    if country_id:
+                        country_id = int(country_id)
+                        countries.setdefault(country_id, Country(
+                            country_id=country_id,
+                            name=player_data.get('countryName', 'Unknown')
+                        ))
+
+                    players[player_data['id']] = Player(
+                        player_id=player_data['id'],
+                        slug=player_data['slug'],
+                        first_name=player_data.get('firstName', ''),
+                        last_name=player_data.get('lastName', 'Unknown'),
+                        position=player_data.get('position', 'Unknown'),
+                        country_id=country_id or None,
+                    )
+                    roster.add(player_data['id'])
+                    memberships[(team.pk, player_data['id'], tournament_id)] = TeamSquad(
+                        team=team,
+                        player_id=player_data['id'],
+                        tournament_id=tournament_id,
+                        tournament_type=tournament_type,
+                        jersey_number=player_data.get('jerseyNumber', ''),
                     )
 
-                # Zapisz zawodnika
-                player, created = Player.objects.update_or_create(
-                    player_id=player_data['id'],
-                    defaults={
-                        'slug': player_data['slug'],
-                        'first_name': player_data.get('firstName', ''),
-                        'last_name': player_data.get('lastName', 'Unknown'),
-                        'position': player_data.get('position', 'Unknown'),
-                        'country': country,
-                    }
-                )
+        if not rosters:
+            return 0
 
-                # Dodaj do składu
-                TeamSquad.objects.update_or_create(
-                    team=team,
-                    player=player,
-                    tournament_id=tournament_id,
-                    defaults={
-                        'tournament_type': tournament_type,
-                        'jersey_number': player_data.get('jerseyNumber', ''),
-                    }
-                )
+        with transaction.atomic():
+            # Zawodnicy, którzy odeszli z drużyny w danym turnieju
+            departed = Q()
+            for (team_id, tournament_id), player_ids in rosters.items():
+                departed |= Q(team_id=team_id, tournament_id=tournament_id) & ~Q(player_id__in=player_ids)
+            removed, _ = TeamSquad.objects.filter(departed).delete()
+
+            # Istniejące kraje zostają bez zmian (jak get_or_create)
+            Country.objects.bulk_create(
+                list(countries.values()), ignore_conflicts=True, batch_size=self.SQUAD_BATCH_SIZE
+            )
+
+            existing = set(
+                Player.objects.filter(player_id__in=list(players)).values_list('player_id', flat=True)
+            )
+            Player.objects.bulk_create(
+                list(players.values()),
+                update_conflicts=True,
+                unique_fields=['player_id'],
+                update_fields=['slug', 'first_name', 'last_name', 'position', 'country', 'updated_at'],
+                batch_size=self.SQUAD_BATCH_SIZE,
+            )
+            TeamSquad.objects.bulk_create(
+                list(memberships.values()),
+                update_conflicts=True,
+                unique_fields=['team', 'player', 'tournament_id'],
+                update_fields=['tournament_type', 'jersey_number'],
+                batch_size=self.SQUAD_BATCH_SIZE,
+            )
+
+        view_cache.bump_data_version('teams')
 
-                if created:
-                    print(f"  ✓ Created player:  {player.full_name}")
+        created = len(set(players) - existing)
+        if created:
+            print(f"  ✓ Created {created} players")
+        if removed:
+            print(f"  ✓ Removed {removed} departed squad members")
+        return len(memberships)
+
+    def save_team_squad(self, team: Team, squad_data: List[Dict]):
+        """Zapisuje kadrę drużyny do bazy danych"""
+        return self.save_squads({team: squad_data})
 
     def fetch_and_save_team_with_squad(self, team_slug: str, team_id: str):
         """Pobiera i zapisuje drużynę wraz z pełną kadrą"""
@@ -353,18 +829,85 @@ class FootballDataService:
 
         return team
 
-    def fetch_all_teams_squads(self, only_without_details: bool = True):
-        """Pobiera kadry dla wszystkich drużyn w bazie"""
+    def fetch_all_teams_squads(self, only_without_details: bool = True, workers: int = 1,
+                               stale_after_days: Optional[int] = None):
+        """
+        Pobiera kadry dla drużyn w bazie.
+        stale_after_days - dodatkowo odśwież drużyny, których dane są starsze niż tyle dni
+        """
         teams = Team.objects.all()
 
-        if only_without_details:
+        if stale_after_days is not None:
+            stale_before = timezone.now() - timedelta(days=stale_after_days)
+            teams = teams.filter(Q(details_fetched=False) | Q(last_updated__lt=stale_before))
+        elif only_without_details:
             teams = teams.filter(details_fetched=False)
 
-        print(f"Found {teams.count()} teams to fetch squads for...")
+        teams = list(teams)
+        print(f"Found {len(teams)} teams to fetch squads for...")
+
+        if workers > 1:
+            return self.fetch_teams_squads_concurrent(teams, workers=workers)
 
+        saved = []
         for team in teams:
             try:
-                self.fetch_and_save_team_with_squad(team.slug, team.participant_id)
+                saved.append(self.fetch_and_save_team_with_squad(team.slug, team.participant_id))
             except Exception as e:
                 print(f"✗ Error fetching squad for {team.name}: {e}")
-                continue
\ No newline at end of file
+                continue
+        return saved
+
+    def refresh_stale_squads(self, max_age_days: int = 7, workers: int = 8):
+        """Ponownie pobiera tylko kadry drużyn bez szczegółów lub z nieaktualnymi danymi"""
+        return self.fetch_all_teams_squads(workers=workers, stale_after_days=max_age_days)
+
+    TEAMS_BATCH_SIZE = 20
+
+    def fetch_teams_squads_concurrent(self, teams: List[Team], workers: int = 8) -> List[Team]:
+        """
+        Pobiera szczegóły drużyn równolegle (limity zapytań pilnuje klient HTTP),
+        a zapisuje je w jednym wątku paczkami po TEAMS_BATCH_SIZE
+        """
+        saved = []
+        batch = []
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.fetch_team_details, team.slug, team.participant_id): team
+                for team in teams
+            }
+            for future in as_completed(futures):
+                team = futures[future]
+                try:
+                    batch.append(future.result())
+                except Exception as e:
+                    print(f"✗ Error fetching squad for {team.name}: {e}")
+                    continue
+
+                if len(batch) >= self.TEAMS_BATCH_SIZE:
+                    saved.extend(self._save_teams_batch(batch))
+                    batch = []
+
+        if batch:
+            saved.extend(self._save_teams_batch(batch))
+
+        print(f"✓ Saved {len(saved)}/{len(teams)} teams with squads")
+        return saved
+
+    def _save_teams_batch(self, teams_data: List[Dict]) -> List[Team]:
+        """Zapis paczki drużyn, a w razie błędu (np. konfliktu slugów) drużyna po drużynie"""
+        try:
+            return self.save_teams_with_squads(teams_data)
+        except Exception as e:
+            print(f"   ⚠️  Bulk team save failed ({e}), saving one by one...")
+
+        saved = []
+        for team_data in teams_data:
+            try:
+                team = self.save_team_details(team_data)
+                self.save_team_squad(team, team_data.get('squad', []))
+                saved.append(team)
+            except Exception as e:
+                print(f"✗ Error saving team {team_data.get('id')}: {e}")
+        return saved
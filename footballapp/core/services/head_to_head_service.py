@@ -0,0 +1,143 @@
+"""
+Bilans bezpośrednich meczów par drużyn (HeadToHead)
+Para jest nieuporządkowana - wiersz zapisany jest raz, z drużyną o mniejszym
+participant_id jako team_a. Bilans i lista ostatnich spotkań przeliczane są
+dla par, których wyniki się zmieniły (result_service.handle_result_changes), więc strona
+meczu czyta H2H jednym zapytaniem
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from ..models import HeadToHead, TeamMatch
+
+# Liczba ostatnich spotkań pokazywanych na stronie meczu
+RECENT_MEETINGS = 10
+
+RECORD_FIELDS = [
+    'played', 'team_a_wins', 'team_b_wins', 'draws', 'team_a_goals', 'team_b_goals', 'recent_match_ids',
+]
+
+
+def pair_key(team_id, other_team_id):
+    """Para drużyn w kolejności zapisu (team_a, team_b)"""
+    return tuple(sorted((team_id, other_team_id)))
+
+
+def _meetings(pairs):
+    """Zakończone spotkania par od najnowszego - jeden skan TeamMatch z perspektywy team_a"""
+    return (
+        TeamMatch.objects.filter(
+            reduce(or_, (Q(team_id=team_a, opponent_id=team_b) for team_a, team_b in pairs)),
+            event_stage='3',
+        )
+        .order_by('-start_time', '-match_id')
+        .values_list('team_id', 'opponent_id', 'match_id', 'goals_for', 'goals_against')
+    )
+
+
+def _build_records(meetings) -> dict:
+    """{(team_a, team_b): HeadToHead} (niezapisane) ze spotkań od najnowszego"""
+    records = {}
+    for team_a, team_b, match_id, goals_a, goals_b in meetings:
+        record = records.get((team_a, team_b))
+        if record is None:
+            record = records[(team_a, team_b)] = HeadToHead(team_a_id=team_a, team_b_id=team_b, recent_match_ids=[])
+        goals_a, goals_b = goals_a or 0, goals_b or 0
+        record.played += 1
+        record.team_a_goals += goals_a
+        record.team_b_goals += goals_b
+        if goals_a > goals_b:
+            record.team_a_wins += 1
+        elif goals_a < goals_b:
+            record.team_b_wins += 1
+        else:
+            record.draws += 1
+        # Jedno spotkanie zapasowe - strona meczu pomija bieżący mecz
+        if len(record.recent_match_ids) <= RECENT_MEETINGS:
+            record.recent_match_ids.append(match_id)
+    return records
+
+
+@transaction.atomic
+def update_pairs(pairs) -> int:
+    """
+    Przelicza bilans podanych par drużyn (dowolna kolejność drużyn w parze).
+    Para bez zakończonych spotkań jest usuwana. Zwraca liczbę zapisanych par
+    """
+    pairs = {pair_key(*pair) for pair in pairs if all(pair) and pair[0] != pair[1]}
+    if not pairs:
+        return 0
+
+    records = _build_records(_meetings(pairs))
+    pair_filter = reduce(or_, (Q(team_a_id=team_a, team_b_id=team_b) for team_a, team_b in pairs))
+    existing = {
+        (row.team_a_id, row.team_b_id): row
+        for row in HeadToHead.objects.filter(pair_filter)
+    }
+
+    for key, record in records.items():
+        if key in existing:
+            record.pk = existing[key].pk
+    HeadToHead.objects.bulk_update([record for record in records.values() if record.pk], RECORD_FIELDS)
+    HeadToHead.objects.bulk_create([record for record in records.values() if not record.pk])
+
+    gone = [existing[key].pk for key in existing if key not in records]
+    if gone:
+        HeadToHead.objects.filter(pk__in=gone).delete()
+    return len(records)
+
+
+@transaction.atomic
+def rebuild_all() -> int:
+    """Przelicza bilanse wszystkich par od zera"""
+    HeadToHead.objects.all().delete()
+    meetings = (
+        TeamMatch.objects.filter(event_stage='3', team_id__lt=F('opponent_id'))
+        .order_by('-start_time', '-match_id')
+        .values_list('team_id', 'opponent_id', 'match_id', 'goals_for', 'goals_against')
+    )
+    records = _build_records(meetings.iterator())
+    HeadToHead.objects.bulk_create(records.values(), batch_size=500)
+    return len(records)
+
+
+def get_head_to_head(team_id, other_team_id):
+    """
+    Bilans pary drużyn (jedno zapytanie). Tylko odczyt - bilanse zapisuje
+    handle_result_changes, a starsze bazy uzupełnia migracja 0013. Dla pary
+    bez zapisanego bilansu liczony jest niezapisany bilans z TeamMatch;
+    None gdy drużyny nie grały ze sobą
+    """
+    team_a, team_b = pair_key(team_id, other_team_id)
+    record = HeadToHead.objects.filter(team_a_id=team_a, team_b_id=team_b).first()
+    if record is None:
+        record = _build_records(_meetings([(team_a, team_b)])).get((team_a, team_b))
+    return record
+
+
+def record_for(head_to_head, team_id) -> dict:
+    """Bilans z perspektywy podanej drużyny: wygrane, remisy, porażki i bramki"""
+    if head_to_head is None:
+        return {'played': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'goals_for': 0, 'goals_against': 0}
+    is_a = head_to_head.team_a_id == team_id
+    return {
+        'played': head_to_head.played,
+        'wins': head_to_head.team_a_wins if is_a else head_to_head.team_b_wins,
+        'draws': head_to_head.draws,
+        'losses': head_to_head.team_b_wins if is_a else head_to_head.team_a_wins,
+        'goals_for': head_to_head.team_a_goals if is_a else head_to_head.team_b_goals,
+        'goals_against': head_to_head.team_b_goals if is_a else head_to_head.team_a_goals,
+    }
+
+
+def recent_record(matches, team_id) -> dict:
+    """Wygrane, remisy i porażki drużyny w podanych spotkaniach (np. ostatnich na stronie meczu)"""
+    record = {'wins': 0, 'draws': 0, 'losses': 0}
+    for match in matches:
+        home_score, away_score = match.home_score or 0, match.away_score or 0
+        scored, conceded = (home_score, away_score) if match.home_team_id == team_id else (away_score, home_score)
+        record['wins' if scored > conceded else 'losses' if scored < conceded else 'draws'] += 1
+    return record
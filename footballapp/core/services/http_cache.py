@@ -0,0 +1,104 @@
+"""
+Dyskowa pamięć podręczna odpowiedzi API (SQLite)
+Odpowiedzi są zapisywane pod kluczem (URL + parametry) razem z nagłówkami
+ETag / Last-Modified, żeby po wygaśnięciu TTL można było je tanio odświeżyć
+zapytaniem warunkowym (304 Not Modified)
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.conf import settings
+
+
+class CacheMiss(LookupError):
+    """Brak odpowiedzi w pamięci podręcznej (tryb offline)"""
+
+
+class CachedResponse:
+    def __init__(self, data, etag=None, last_modified=None, stored_at=0.0, ttl=None):
+        self.data = data
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def is_fresh(self) -> bool:
+        """ttl=None oznacza odpowiedź, która nigdy nie wygasa"""
+        return self.ttl is None or time.time() - self.stored_at < self.ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def make_key(url: str, params: dict = None) -> str:
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class ResponseCache:
+    """Magazyn odpowiedzi w jednym pliku SQLite, bezpieczny dla wielu wątków"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or getattr(settings, 'HTTP_CACHE_PATH', settings.BASE_DIR / 'http_cache.sqlite3'))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY,'
+            ' body TEXT NOT NULL,'
+            ' etag TEXT,'
+            ' last_modified TEXT,'
+            ' stored_at REAL NOT NULL,'
+            ' ttl REAL)'
+        )
+        self._conn.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, etag, last_modified, stored_at, ttl FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, stored_at, ttl = row
+        return CachedResponse(json.loads(body), etag, last_modified, stored_at, ttl)
+
+    def set(self, key: str, data, etag=None, last_modified=None, ttl=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, body, etag, last_modified, stored_at, ttl) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, json.dumps(data), etag, last_modified, time.time(), ttl),
+            )
+            self._conn.commit()
+
+    def touch(self, key: str, ttl=None):
+        """Odpowiedź potwierdzona przez serwer (304) - liczymy TTL od nowa"""
+        with self._lock:
+            self._conn.execute(
+                'UPDATE responses SET stored_at = ?, ttl = ? WHERE key = ?', (time.time(), ttl, key)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
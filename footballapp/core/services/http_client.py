@@ -0,0 +1,187 @@
+"""
+Wspólny klient HTTP dla komend pobierających dane
+- jedna sesja z pulą połączeń keep-alive
+- ponawianie z wykładniczym opóźnieniem (jitter), z obsługą 429/5xx i Retry-After
+- limity współbieżności i tempa zapytań osobno dla każdego hosta
+- pomiary czasu zapytań
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .throttling import TokenBucket
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class RequestMetrics:
+    """Liczniki i czasy zapytań per host (bezpieczne dla wielu wątków)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = defaultdict(lambda: {'requests': 0, 'retries': 0, 'errors': 0, 'total': 0.0, 'max': 0.0})
+
+    def record(self, host: str, elapsed: float, error: bool = False):
+        with self._lock:
+            stats = self._hosts[host]
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+
+    def record_retry(self, host: str):
+        with self._lock:
+            self._hosts[host]['retries'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._hosts.items()}
+
+    def summary(self) -> str:
+        lines = []
+        for host, stats in sorted(self.snapshot().items()):
+            avg = stats['total'] / stats['requests'] if stats['requests'] else 0.0
+            lines.append(
+                f"{host}: {stats['requests']} requests, {stats['retries']} retries, "
+                f"{stats['errors']} errors, avg {avg * 1000:.0f} ms, max {stats['max'] * 1000:.0f} ms"
+            )
+        return "\n".join(lines)
+
+
+class HttpClient:
+    """
+    Klient HTTP z ponawianiem i limitami per host.
+    host_limits: {host: {'rate': zapytań/s, 'concurrency': równoległych zapytań}}
+    """
+
+    def __init__(self, headers=None, timeout: float = 20.0, max_retries: int = 4,
+                 backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 pool_size: int = 16, default_concurrency: int = 8, host_limits=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_concurrency = default_concurrency
+        self.host_limits = dict(host_limits or {})
+        self.metrics = RequestMetrics()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({'User-Agent': DEFAULT_USER_AGENT})
+        if headers:
+            self.session.headers.update(headers)
+
+        self._limits_lock = threading.Lock()
+        self._semaphores = {}
+        self._buckets = {}
+
+    # ============ LIMITY PER HOST ============
+
+    def _limits_for(self, host: str):
+        with self._limits_lock:
+            if host not in self._semaphores:
+                limits = self.host_limits.get(host, {})
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    limits.get('concurrency', self.default_concurrency)
+                )
+                rate = limits.get('rate')
+                self._buckets[host] = TokenBucket(rate) if rate else None
+            return self._semaphores[host], self._buckets[host]
+
+    # ============ OPÓŹNIENIA ============
+
+    def _backoff(self, attempt: int) -> float:
+        """Wykładnicze opóźnienie z pełnym jitterem"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, response) -> float:
+        """Czas z nagłówka Retry-After (sekundy albo data HTTP) lub None"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return min(self.backoff_max, max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()))
+
+    # ============ ZAPYTANIA ============
+
+    def request(self, method: str, url: str, retry_if=None, **kwargs) -> requests.Response:
+        """
+        Wysyła zapytanie, ponawiając je przy błędach sieci, 429/5xx
+        oraz gdy retry_if(response) zwróci True. Zwraca ostatnią odpowiedź.
+        """
+        host = urlsplit(url).netloc
+        semaphore, bucket = self._limits_for(host)
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            with semaphore:
+                if bucket:
+                    bucket.acquire()
+                started = time.monotonic()
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                    self.metrics.record(host, time.monotonic() - started, error=True)
+                    if last_attempt:
+                        raise
+                    self.metrics.record_retry(host)
+                    time.sleep(self._backoff(attempt))
+                    continue
+                self.metrics.record(host, time.monotonic() - started,
+                                    error=response.status_code >= 400)
+
+            retryable = response.status_code in RETRY_STATUSES or (
+                retry_if is not None and response.ok and retry_if(response)
+            )
+            if not retryable or last_attempt:
+                return response
+
+            self.metrics.record_retry(host)
+            delay = self._retry_after(response)
+            time.sleep(delay if delay is not None else self._backoff(attempt))
+
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def get_json(self, url: str, **kwargs):
+        """GET zwracający JSON; pusta odpowiedź (częsta przy limitach API) jest ponawiana"""
+        response = self.get(url, retry_if=lambda r: not r.content.strip(), **kwargs)
+        response.raise_for_status()
+        if not response.content.strip():
+            raise ValueError(f"Empty response from {url}")
+        return response.json()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Jeden klient (jedna pula połączeń) na proces, z limitami z HTTP_HOST_LIMITS"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient(host_limits=getattr(settings, 'HTTP_HOST_LIMITS', {}))
+    return _shared_client
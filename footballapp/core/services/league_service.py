@@ -0,0 +1,100 @@
+"""
+Indeks lig: zdeduplikowana lista do list rozwijanych i rozpoznawanie ligi po identyfikatorze
+Ligi zmieniają się rzadko (tylko przy pobieraniu danych), więc indeks jest
+liczony raz i trzymany w cache. Wersja indeksu jest podbijana sygnałami
+post_save/post_delete modelu League oraz jawnie po zapisach wsadowych
+(bulk_create nie wysyła sygnałów). Wersja leży w aliasie cache 'versions'
+(view_cache.get_versions).
+"""
+import re
+
+from django.core.cache import cache
+
+from ..models import League
+from .view_cache import bump_versions, get_versions
+
+LEAGUE_VERSION_KEY = 'data_version:leagues'
+
+
+def canonical_key(league: League) -> str:
+    """Klucz grupujący rekordy tej samej ligi (np. z różnych sezonów)"""
+    # prefer stable identifiers: tournament_template_id, then tournament_id; fallback to normalized name+country
+    if league.tournament_template_id:
+        return f"tpl:{league.tournament_template_id}"
+    if league.tournament_id:
+        return f"tid:{league.tournament_id}"
+    # normalize name: strip year ranges like '2024/25', '(2024/25)', '2024-25', single years
+    raw_name = (league.name or '').strip().lower()
+    raw_name = re.sub(r"\([^)]*\)", "", raw_name)
+    raw_name = re.sub(r"\b\d{4}(/\d{2,4}|-\d{2,4})?\b", "", raw_name)
+    norm_name = ' '.join(raw_name.split()).strip()
+    country = (league.country or '').strip().lower()
+    return f"name:{norm_name}|{country}"
+
+
+def bump_league_version():
+    """Unieważnia indeks lig (po commicie bieżącej transakcji)"""
+    bump_versions([LEAGUE_VERSION_KEY])
+
+
+def _build_index() -> dict:
+    leagues_map = {}
+    by_tournament_id = {}
+    by_template_id = {}
+    by_pk = {}
+
+    # Rosnąco po pk - przy powtórzeniach identyfikatora wygrywa najstarszy rekord (jak .first())
+    for league in League.objects.order_by('pk'):
+        by_pk[str(league.pk)] = league
+        by_tournament_id.setdefault(league.tournament_id, league)
+        if league.tournament_template_id:
+            by_template_id.setdefault(league.tournament_template_id, league)
+
+        # choose representative league for this key; prefer one with logo
+        key = canonical_key(league)
+        existing = leagues_map.get(key)
+        if existing is None or (not existing.logo and league.logo):
+            leagues_map[key] = league
+
+    return {
+        # final list sorted by name
+        'leagues': sorted(leagues_map.values(), key=lambda x: (x.name or '').lower()),
+        'by_tournament_id': by_tournament_id,
+        'by_template_id': by_template_id,
+        'by_pk': by_pk,
+    }
+
+
+def get_league_index() -> dict:
+    version = get_versions([LEAGUE_VERSION_KEY])[LEAGUE_VERSION_KEY]
+    key = f"league_index:{version}"
+    index = cache.get(key)
+    if index is None:
+        index = _build_index()
+        cache.set(key, index, timeout=None)
+    return index
+
+
+def get_unique_leagues():
+    """Zdeduplikowana lista lig posortowana po nazwie (do list rozwijanych)"""
+    return get_league_index()['leagues']
+
+
+def resolve_league(league_id):
+    """Liga po tournament_id, potem tournament_template_id, potem pk; None gdy brak"""
+    if not league_id:
+        return None
+    index = get_league_index()
+    league_id = str(league_id)
+    return (
+        index['by_tournament_id'].get(league_id)
+        or index['by_template_id'].get(league_id)
+        or index['by_pk'].get(league_id)
+    )
+
+
+def selected_league_id(league):
+    """Stabilny identyfikator ligi używany w szablonach do zaznaczenia opcji"""
+    if not league:
+        return None
+    return league.tournament_template_id or league.tournament_id or str(league.pk)
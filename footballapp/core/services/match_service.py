@@ -0,0 +1,141 @@
+"""
+Lista meczów z filtrami i stronicowaniem po kluczu (keyset)
+Strony wyznacza para (start_time, event_id) ostatniego meczu poprzedniej
+strony, więc koszt strony nie zależy od jej numeru ani od liczby meczów w bazie
+(zapytanie idzie po indeksach złożonych modelu Match zamiast OFFSET)
+"""
+import base64
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from ..models import Match, MatchStatistic, Season, Team
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Kolejność listy: od najnowszych; event_id rozstrzyga mecze o tej samej godzinie
+ORDERING = ['-start_time', '-event_id']
+
+
+def league_seasons(league):
+    """Sezony wszystkich rekordów League tej samej ligi (po template_id / tournament_id)"""
+    if getattr(league, 'tournament_template_id', None):
+        return Season.objects.filter(league__tournament_template_id=league.tournament_template_id)
+    if getattr(league, 'tournament_id', None):
+        return Season.objects.filter(league__tournament_id=league.tournament_id)
+    return Season.objects.filter(league=league)
+
+
+def _day_start(day, end=False):
+    moment = datetime.combine(day, time.max if end else time.min)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def filter_matches(league=None, season_id=None, team_id=None, stage=None,
+                   date_from=None, date_to=None):
+    """
+    Mecze spełniające filtry:
+    - league: obiekt League (z league_service.resolve_league)
+    - season_id: Season.season_id (w obrębie ligi, jeśli podana)
+    - team_id: participant_id drużyny (mecze u siebie i na wyjeździe)
+    - stage: event_stage ('1' zaplanowane, '3' zakończone, ...)
+    - date_from / date_to: daty (włącznie)
+    Liga i sezon zamieniane są na listę pk sezonów, żeby filtr szedł po indeksie
+    (season, start_time) zamiast przez JOIN z League
+    """
+    matches = Match.objects.select_related('home_team', 'away_team', 'season')
+
+    if league is not None or season_id is not None:
+        seasons = league_seasons(league) if league is not None else Season.objects.all()
+        if season_id is not None:
+            seasons = seasons.filter(season_id=season_id)
+        matches = matches.filter(season_id__in=list(seasons.values_list('pk', flat=True)))
+
+    if team_id:
+        # Jeden wiersz TeamMatch na mecz drużyny - bez OR po home_team / away_team
+        matches = matches.filter(participations__team_id=team_id)
+    if stage:
+        matches = matches.filter(event_stage=stage)
+    # Porównanie z granicami dnia (nie __date), żeby zapytanie mogło użyć indeksu start_time
+    if date_from:
+        matches = matches.filter(start_time__gte=_day_start(date_from))
+    if date_to:
+        matches = matches.filter(start_time__lte=_day_start(date_to, end=True))
+    return matches
+
+
+def encode_cursor(match) -> str:
+    raw = f"{match.start_time.isoformat()}|{match.event_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(start_time, event_id) z kursora; ValueError dla niepoprawnego kursora"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        start_time, event_id = raw.split('|', 1)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}'") from e
+    parsed = parse_datetime(start_time)
+    if parsed is None or not event_id:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+    return parsed, event_id
+
+
+def get_page(matches, cursor: str = None, limit: int = PAGE_SIZE):
+    """
+    Strona meczów po kursorze: (lista meczów, kursor następnej strony albo None).
+    Pobiera limit + 1 wierszy, żeby wiedzieć, czy istnieje następna strona
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    matches = matches.order_by(*ORDERING)
+    if cursor:
+        start_time, event_id = decode_cursor(cursor)
+        matches = matches.filter(
+            Q(start_time__lt=start_time) | Q(start_time=start_time, event_id__lt=event_id)
+        )
+
+    page = list(matches[:limit + 1])
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    return page[:limit], next_cursor
+
+
+def teams_for_seasons(season_pks):
+    """
+    Drużyny grające w podanych sezonach (do listy rozwijanej).
+    Dwa podzapytania IN zamiast JOIN po meczach gospodarzy i gości z distinct()
+    """
+    return Team.objects.filter(
+        Q(pk__in=Match.objects.filter(season_id__in=season_pks).values('home_team_id'))
+        | Q(pk__in=Match.objects.filter(season_id__in=season_pks).values('away_team_id'))
+    ).order_by('name')
+
+
+def match_as_dict(match) -> dict:
+    """Mecz w formacie JSON API (drużyny i sezon muszą być pobrane z select_related)"""
+    return {
+        'event_id': match.event_id,
+        'start_time': match.start_time.isoformat(),
+        'round': match.round,
+        'stage': match.event_stage,
+        'season': {'pk': match.season_id, 'season_id': match.season.season_id, 'name': match.season.name},
+        'home_team': {'id': match.home_team_id, 'name': match.home_team.name, 'logo': match.home_team.logo},
+        'away_team': {'id': match.away_team_id, 'name': match.away_team.name, 'logo': match.away_team.logo},
+        'home_score': match.home_score,
+        'away_score': match.away_score,
+    }
+
+
+def statistics_by_period(match):
+    """
+    Statystyki meczu jednym zapytaniem, pogrupowane po okresie w kolejności
+    PERIOD_CHOICES (mecz, 1. połowa, 2. połowa): [(etykieta okresu, [statystyki])]
+    """
+    grouped = {period: [] for period, _ in MatchStatistic.PERIOD_CHOICES}
+    for stat in MatchStatistic.objects.filter(match=match).order_by('stat_id'):
+        grouped.setdefault(stat.period, []).append(stat)
+    labels = dict(MatchStatistic.PERIOD_CHOICES)
+    return [(labels.get(period, period), stats) for period, stats in grouped.items() if stats]
@@ -0,0 +1,211 @@
+"""
+Magazyn wytrenowanych modeli przewidywania wyników
+Zapisuje model i dopasowany StandardScaler na dysk (z wersją i odciskiem
+danych treningowych) i udostępnia jeden współdzielony serwis na proces
+"""
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+from django.conf import settings
+
+from ..models import Match, MatchStatistic
+from .prediction_service import MatchPredictionService
+
+ARTIFACT_FORMAT = 1
+ARTIFACT_SUFFIX = '.joblib'
+LATEST_POINTER = 'LATEST'
+
+# Pola meczu czytane przez TeamTimeline przy treningu (feature_service)
+TRAINING_RESULT_FIELDS = [
+    'event_id', 'home_team_id', 'away_team_id', 'start_time',
+    'home_full_time_score', 'home_score', 'away_full_time_score', 'away_score',
+]
+
+_shared_service = None
+_shared_lock = threading.Lock()
+_last_reload_check = 0.0
+
+
+def get_model_dir() -> Path:
+    return Path(getattr(settings, 'PREDICTION_MODEL_DIR', settings.BASE_DIR / 'trained_models'))
+
+
+def training_fingerprint() -> str:
+    """
+    Odcisk danych treningowych - zmienia się po dodaniu zakończonego meczu lub
+    zmianie jego wyniku (ponowny zapis tego samego wyniku go nie zmienia).
+    Skrót liczony jest z każdego meczu osobno, więc zamiana wyników dwóch meczów
+    (przy niezmienionej sumie bramek) też daje nowy odcisk
+    """
+    digest = hashlib.sha1()
+    results = (
+        Match.objects.filter(event_stage='3')
+        .order_by('event_id')
+        .values_list(*TRAINING_RESULT_FIELDS)
+    )
+    for row in results.iterator(chunk_size=5000):
+        digest.update(repr(row).encode())
+    stats_total = MatchStatistic.objects.filter(period='match').count()
+    digest.update(f"|{stats_total}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _atomic_write(path: Path, write):
+    """Zapis do pliku tymczasowego i podmiana - czytelnik nigdy nie widzi połowy pliku"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def save_service(service: MatchPredictionService, fingerprint: str = None) -> str:
+    """Zapisuje wytrenowany serwis jako nową wersję i ustawia ją jako najnowszą"""
+    if not service.is_trained:
+        raise ValueError("Nie można zapisać niewytrenowanego modelu")
+
+    model_dir = get_model_dir()
+    model_dir.mkdir(parents=True, exist_ok=True)
+
+    fingerprint = fingerprint or training_fingerprint()
+    trained_at = datetime.now(timezone.utc)
+    version = f"{trained_at:%Y%m%d-%H%M%S}-{fingerprint[:8]}"
+
+    artifact = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'fingerprint': fingerprint,
+        'trained_at': trained_at.isoformat(),
+        'model': service.model,
+        'scaler': service.scaler,
+    }
+    _atomic_write(model_dir / f"{version}{ARTIFACT_SUFFIX}", lambda p: joblib.dump(artifact, p))
+    _atomic_write(model_dir / LATEST_POINTER, lambda p: p.write_text(f"{version}\n{fingerprint}\n"))
+
+    service.version = version
+    service.fingerprint = fingerprint
+    return version
+
+
+def _read_pointer():
+    """Zawartość pliku LATEST: (wersja, odcisk danych) lub (None, None)"""
+    try:
+        lines = (get_model_dir() / LATEST_POINTER).read_text().split()
+    except FileNotFoundError:
+        return None, None
+    return (lines + [None, None])[:2]
+
+
+def latest_version():
+    """Nazwa najnowszej wersji modelu lub None"""
+    return _read_pointer()[0]
+
+
+def latest_fingerprint():
+    """Odcisk danych, na których wytrenowano najnowszy model (bez wczytywania modelu)"""
+    return _read_pointer()[1]
+
+
+def load_service(version: str = None):
+    """Wczytuje serwis z dysku (domyślnie najnowszą wersję). Zwraca None jeśli brak modelu"""
+    version = version or latest_version()
+    if not version:
+        return None
+
+    try:
+        artifact = joblib.load(get_model_dir() / f"{version}{ARTIFACT_SUFFIX}")
+    except FileNotFoundError:
+        return None
+    if artifact.get('format') != ARTIFACT_FORMAT:
+        return None
+
+    service = MatchPredictionService()
+    service.model = artifact['model']
+    service.scaler = artifact['scaler']
+    service.version = artifact['version']
+    service.fingerprint = artifact['fingerprint']
+    service.is_trained = True
+    return service
+
+
+def prune_artifacts(keep: int = 3):
+    """Usuwa stare wersje modelu, zostawiając `keep` najnowszych (i zawsze aktualną)"""
+    model_dir = get_model_dir()
+    if not model_dir.exists():
+        return []
+
+    current = latest_version()
+    artifacts = sorted(model_dir.glob(f"*{ARTIFACT_SUFFIX}"), reverse=True)
+    removed = []
+    for path in artifacts[keep:]:
+        if path.stem == current:
+            continue
+        path.unlink(missing_ok=True)
+        removed.append(path.stem)
+    return removed
+
+
+def get_prediction_service() -> MatchPredictionService:
+    """
+    Współdzielony serwis przewidywań dla procesu.
+    Model wczytywany jest z dysku raz. Procesy WWW nigdy nie trenują modelu -
+    jeśli nie ma jeszcze żadnego (train_prediction_model / scheduler), zwracany
+    jest niewytrenowany serwis, a kolejne żądanie sprawdza dysk ponownie.
+    Co PREDICTION_MODEL_RELOAD_INTERVAL sekund sprawdzane jest, czy scheduler
+    nie zapisał nowszej wersji - jeśli tak, serwis jest podmieniany w całości.
+    """
+    global _shared_service
+
+    service = _shared_service
+    if service is not None:
+        return _reload_if_outdated(service)
+
+    with _shared_lock:
+        if _shared_service is not None:
+            return _shared_service
+
+        service = load_service()
+        if service is None:
+            return MatchPredictionService()
+        _shared_service = service
+        return service
+
+
+def _reload_if_outdated(service: MatchPredictionService) -> MatchPredictionService:
+    """Podmienia współdzielony serwis, jeśli na dysku jest nowsza wersja modelu"""
+    global _shared_service, _last_reload_check
+
+    interval = getattr(settings, 'PREDICTION_MODEL_RELOAD_INTERVAL', 60)
+    now = time.monotonic()
+    if now - _last_reload_check < interval:
+        return service
+
+    # Tylko jeden wątek sprawdza i wczytuje; pozostałe używają obecnego modelu
+    if not _shared_lock.acquire(blocking=False):
+        return service
+    try:
+        _last_reload_check = now
+        version = latest_version()
+        if version and version != _shared_service.version:
+            fresh = load_service(version)
+            if fresh is not None:
+                # Podmiana referencji jest atomowa - trwające żądania kończą na starym modelu
+                _shared_service = fresh
+        return _shared_service
+    finally:
+        _shared_lock.release()
+
+
+def warm_up():
+    """Wczytuje najnowszy model przy starcie procesu (bez trenowania)"""
+    global _shared_service, _last_reload_check
+
+    service = load_service()
+    if service is not None:
+        with _shared_lock:
+            _shared_service = service
+            _last_reload_check = time.monotonic()
+    return service
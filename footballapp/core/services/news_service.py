@@ -0,0 +1,130 @@
+"""
+Pobieranie newsów z wielu kanałów RSS
+Kanały (settings.NEWS_FEEDS) pobierane są równolegle zapytaniami warunkowymi,
+więc niezmieniony kanał kosztuje jedną odpowiedź 304. Nowe artykuły są
+odfiltrowywane po URL i zapisywane jednym bulk_create.
+"""
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+import feedparser
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import NewsArticle, NewsFeedState
+from . import view_cache
+from .http_client import get_http_client
+
+
+def get_feeds():
+    return getattr(settings, 'NEWS_FEEDS', [])
+
+
+def _fetch_feed(feed, state: NewsFeedState):
+    """Zwraca (odpowiedź HTTP, wpisy kanału); wpisy = None gdy kanał się nie zmienił"""
+    headers = {}
+    if state.etag:
+        headers['If-None-Match'] = state.etag
+    if state.last_modified:
+        headers['If-Modified-Since'] = state.last_modified
+
+    response = get_http_client().get(feed['url'], headers=headers)
+    if response.status_code == 304:
+        return response, None
+    response.raise_for_status()
+    return response, feedparser.parse(response.content).entries
+
+
+def _entry_image(entry) -> str:
+    # Szukanie obrazka (BBC używa media_thumbnail)
+    if 'media_thumbnail' in entry:
+        # BBC często daje kilka rozmiarów, bierzemy pierwszy (zazwyczaj największy)
+        return entry.media_thumbnail[0]['url']
+
+    # Jeśli wciąż pusto, szukamy w linkach
+    for link in entry.get('links', []):
+        if link.get('type', '').startswith('image/'):
+            return link['href']
+    return ''
+
+
+def _entry_to_article(entry, source_name: str) -> NewsArticle:
+    # Data publikacji (feedparser podaje ją w UTC)
+    published = entry.get('published_parsed')
+    if published:
+        pub_date = datetime.fromtimestamp(calendar.timegm(published), tz=dt_timezone.utc)
+    else:
+        pub_date = timezone.now()
+
+    return NewsArticle(
+        title=entry.title[:255],
+        description=entry.get('summary', ''),
+        url=entry.link,
+        image_url=_entry_image(entry),
+        published_date=pub_date,
+        source_name=source_name,
+    )
+
+
+def fetch_news(feeds=None, workers: int = 8) -> dict:
+    """
+    Pobiera wszystkie kanały i zapisuje nowe artykuły.
+    Zwraca {'feeds': ..., 'not_modified': ..., 'failed': ..., 'new': ...}
+    """
+    feeds = feeds if feeds is not None else get_feeds()
+    states = {state.url: state for state in NewsFeedState.objects.filter(url__in=[f['url'] for f in feeds])}
+    for feed in feeds:
+        states.setdefault(feed['url'], NewsFeedState(url=feed['url']))
+
+    summary = {'feeds': len(feeds), 'not_modified': 0, 'failed': 0, 'new': 0}
+    if not feeds:
+        return summary
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(feeds))) as executor:
+        futures = [(feed, executor.submit(_fetch_feed, feed, states[feed['url']])) for feed in feeds]
+
+    articles = {}
+    now = timezone.now()
+    for feed, future in futures:
+        try:
+            response, entries = future.result()
+        except Exception as e:
+            print(f"❌ {feed['name']}: {e}")
+            summary['failed'] += 1
+            continue
+
+        state = states[feed['url']]
+        state.last_fetched_at = now
+        if entries is None:
+            print(f"✓ {feed['name']}: not modified")
+            summary['not_modified'] += 1
+            continue
+
+        state.etag = response.headers.get('ETag', '')
+        state.last_modified = response.headers.get('Last-Modified', '')
+        print(f"✓ {feed['name']}: {len(entries)} entries")
+
+        for entry in entries:
+            try:
+                article = _entry_to_article(entry, feed['name'])
+            except Exception as e:
+                print(f"⚠️ Błąd przy artykule: {e}")
+                continue
+            articles.setdefault(article.url, article)
+
+    # Tylko artykuły, których jeszcze nie ma w bazie
+    existing = set(NewsArticle.objects.filter(url__in=list(articles)).values_list('url', flat=True))
+    new_articles = [article for url, article in articles.items() if url not in existing]
+    NewsArticle.objects.bulk_create(new_articles, ignore_conflicts=True)
+    summary['new'] = len(new_articles)
+    if new_articles:
+        view_cache.bump_data_version('news')
+
+    fetched_states = [state for state in states.values() if state.last_fetched_at == now]
+    NewsFeedState.objects.bulk_update(
+        [state for state in fetched_states if state.pk],
+        ['etag', 'last_modified', 'last_fetched_at'],
+    )
+    NewsFeedState.objects.bulk_create([state for state in fetched_states if not state.pk])
+    return summary
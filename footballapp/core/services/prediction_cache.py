@@ -0,0 +1,111 @@
+"""
+Tabela gotowych przewidywań (MatchPrediction)
+Przewidywania zaplanowanych meczów zmieniają się tylko po nowym wyniku jednej
+z drużyn albo po wytrenowaniu nowego modelu - liczymy je więc raz i zapisujemy
+"""
+from django.db import transaction
+
+from ..models import Match, MatchPrediction
+
+
+def store_predictions(service, matches) -> int:
+    """Liczy przewidywania wsadowo i zapisuje je dla bieżącej wersji modelu"""
+    if not service.is_trained or not service.version:
+        return 0
+
+    rows = []
+    for item in service.predict_matches(matches):
+        prediction = item['prediction']
+        if prediction.get('error'):
+            continue
+        probabilities = prediction['probabilities']
+        rows.append(MatchPrediction(
+            match=item['match'],
+            model_version=service.version,
+            prediction=prediction['prediction'],
+            home_win_probability=probabilities.get('1', 0.0),
+            draw_probability=probabilities.get('X', 0.0),
+            away_win_probability=probabilities.get('2', 0.0),
+            confidence=prediction['confidence'],
+            home_features=prediction['home_features'],
+            away_features=prediction['away_features'],
+        ))
+
+    MatchPrediction.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['match', 'model_version'],
+        update_fields=[
+            'prediction', 'home_win_probability', 'draw_probability',
+            'away_win_probability', 'confidence', 'home_features', 'away_features',
+        ],
+    )
+    return len(rows)
+
+
+def missing_upcoming_matches(version: str):
+    """Zaplanowane mecze bez przewidywania dla danej wersji modelu"""
+    return (
+        Match.objects.filter(event_stage='1')
+        .exclude(predictions__model_version=version)
+        .order_by('start_time')
+    )
+
+
+@transaction.atomic
+def precompute_upcoming(service, prune_old_versions: bool = True) -> int:
+    """Uzupełnia tabelę dla wszystkich zaplanowanych meczów i usuwa stare wersje"""
+    if not service.is_trained or not service.version:
+        return 0
+
+    if prune_old_versions:
+        MatchPrediction.objects.exclude(model_version=service.version).delete()
+    return store_predictions(service, missing_upcoming_matches(service.version))
+
+
+def get_upcoming_predictions(service, limit: int = 20):
+    """
+    Przewidywania nadchodzących meczów w formacie get_upcoming_matches_predictions.
+    Najpierw wybierane jest `limit` najbliższych zaplanowanych meczów, potem ich
+    zapisane przewidywania; mecze bez wiersza (nowe albo unieważnione przez
+    invalidate_for_teams) są liczone i zapisywane. Typowo dwa zapytania
+    """
+    matches = list(
+        Match.objects.filter(event_stage='1')
+        .select_related('home_team', 'away_team')
+        .order_by('start_time', 'event_id')[:limit]
+    )
+
+    def cached(event_ids):
+        return {
+            row.match_id: row
+            for row in MatchPrediction.objects.filter(model_version=service.version, match_id__in=event_ids)
+        }
+
+    rows = cached([match.event_id for match in matches])
+    missing = [match for match in matches if match.event_id not in rows]
+    if missing and store_predictions(service, missing):
+        rows.update(cached([match.event_id for match in missing]))
+
+    return [
+        {'match': match, 'prediction': rows[match.event_id].as_prediction()}
+        for match in matches if match.event_id in rows
+    ]
+
+
+def invalidate_for_teams(team_ids) -> int:
+    """Usuwa przewidywania zaplanowanych meczów, w których gra któraś z drużyn"""
+    team_ids = list(team_ids)
+    if not team_ids:
+        return 0
+    deleted, _ = MatchPrediction.objects.filter(
+        match__participations__team_id__in=team_ids,
+        match__event_stage='1',
+    ).delete()
+    return deleted
+
+
+def invalidate_all() -> int:
+    """Usuwa wszystkie zapisane przewidywania (np. po imporcie całej bazy)"""
+    deleted, _ = MatchPrediction.objects.all().delete()
+    return deleted
@@ -5,11 +5,16 @@ Używa machine learning do przewidywania wyników na podstawie historycznych dan
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
-from django.db.models import Avg, Count, Q
-from ..models import Match, MatchStatistic, Team
+from django.db.models import Avg, Count
+from ..models import Match, Team
+from .feature_service import TEAM_FEATURE_NAMES, TeamTimeline, combine_match_features
 from datetime import timedelta
 
 
+# Komunikat, gdy na dysku nie ma jeszcze modelu (modele trenowane są tylko offline)
+NOT_TRAINED_MESSAGE = 'Model nie został jeszcze wytrenowany - uruchom: python manage.py train_prediction_model'
+
+
 class MatchPredictionService:
     """
     Serwis przewidywania wyników meczów.
@@ -20,99 +25,18 @@ class MatchPredictionService:
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_trained = False
+        # Ustawiane przez model_store przy zapisie / wczytaniu modelu z dysku
+        self.version = None
+        self.fingerprint = None
 
     def extract_team_features(self, team, last_n_matches=5):
         """
-        Ekstraktuje cechy drużyny na podstawie ostatnich meczów
+        Ekstraktuje cechy drużyny na podstawie ostatnich meczów.
+        Liczone tym samym kodem co cechy treningowe (TeamTimeline), zbudowanym
+        tylko z meczów tej drużyny - dwa zapytania, dowolne last_n_matches
         """
-        # Pobierz ostatnie mecze (zakończone)
-        recent_matches = Match.objects.filter(
-            Q(home_team=team) | Q(away_team=team),
-            event_stage='3'  # Finished
-        ).order_by('-start_time')[:last_n_matches]
-
-        if not recent_matches:
-            # Zwróć domyślne wartości jeśli brak danych
-            return {
-                'avg_goals_scored': 0.0,
-                'avg_goals_conceded': 0.0,
-                'win_rate': 0.0,
-                'draw_rate': 0.0,
-                'avg_possession': 50.0,
-                'avg_shots_on_target': 0.0,
-                'avg_xg': 0.0,
-                'form': 0.0  # punkty z ostatnich meczów
-            }
-
-        goals_scored = []
-        goals_conceded = []
-        points = []
-        possessions = []
-        shots_on_target = []
-        xg_values = []
-
-        for match in recent_matches:
-            is_home = match.home_team == team
-
-            if is_home:
-                scored = match.home_full_time_score or match.home_score or 0
-                conceded = match.away_full_time_score or match.away_score or 0
-
-                # Pobierz statystyki
-                stats = MatchStatistic.objects.filter(match=match, period='match')
-                possession = stats.filter(stat_name='Ball Possession').first()
-                shots = stats.filter(stat_name='Shots on target').first()
-                xg = stats.filter(stat_name='Expected Goals (xG)').first()
-
-                if possession:
-                    possessions.append(possession.home_value_numeric or 50.0)
-                if shots:
-                    shots_on_target.append(shots.home_value_numeric or 0.0)
-                if xg:
-                    xg_values.append(xg.home_value_numeric or 0.0)
-            else:
-                scored = match.away_full_time_score or match.away_score or 0
-                conceded = match.home_full_time_score or match.home_score or 0
-
-                # Pobierz statystyki
-                stats = MatchStatistic.objects.filter(match=match, period='match')
-                possession = stats.filter(stat_name='Ball Possession').first()
-                shots = stats.filter(stat_name='Shots on target').first()
-                xg = stats.filter(stat_name='Expected Goals (xG)').first()
-
-                if possession:
-                    possessions.append(possession.away_value_numeric or 50.0)
-                if shots:
-                    shots_on_target.append(shots.away_value_numeric or 0.0)
-                if xg:
-                    xg_values.append(xg.away_value_numeric or 0.0)
-
-            goals_scored.append(scored)
-            goals_conceded.append(conceded)
-
-            # Punkty: 3 za wygraną, 1 za remis, 0 za przegraną
-            if scored > conceded:
-                points.append(3)
-            elif scored == conceded:
-                points.append(1)
-            else:
-                points.append(0)
-
-        # Oblicz statystyki
-        total_matches = len(recent_matches)
-        wins = sum(1 for p in points if p == 3)
-        draws = sum(1 for p in points if p == 1)
-
-        return {
-            'avg_goals_scored': np.mean(goals_scored) if goals_scored else 0.0,
-            'avg_goals_conceded': np.mean(goals_conceded) if goals_conceded else 0.0,
-            'win_rate': (wins / total_matches) if total_matches > 0 else 0.0,
-            'draw_rate': (draws / total_matches) if total_matches > 0 else 0.0,
-            'avg_possession': np.mean(possessions) if possessions else 50.0,
-            'avg_shots_on_target': np.mean(shots_on_target) if shots_on_target else 0.0,
-            'avg_xg': np.mean(xg_values) if xg_values else 0.0,
-            'form': sum(points) / (total_matches * 3) if total_matches > 0 else 0.0
-        }
+        timeline = TeamTimeline(last_n_matches=last_n_matches).build(team_ids=[team.pk])
+        return timeline.team_features(team.pk)
 
     def prepare_match_features(self, home_team, away_team):
         """
@@ -149,40 +73,16 @@ class MatchPredictionService:
 
     def train_model(self, min_matches=50):
         """
-        Trenuje model na podstawie historycznych meczów
+        Trenuje model na podstawie historycznych meczów.
+        Macierz cech budowana jest wsadowo przez TeamTimeline - cechy każdego
+        meczu liczone są tylko z meczów rozegranych przed nim
         """
-        # Pobierz zakończone mecze z wynikami
-        matches = Match.objects.filter(
-            event_stage='3',  # Finished
-            home_full_time_score__isnull=False,
-            away_full_time_score__isnull=False
-        ).order_by('-start_time')[:500]  # Ostatnie 500 meczów
+        # Ostatnie 500 zakończonych meczów z wynikami
+        timeline = TeamTimeline().build()
+        X, y = timeline.training_matrix(limit=500)
 
-        if len(matches) < min_matches:
-            return False, f"Za mało danych treningowych. Znaleziono {len(matches)} meczów, wymagane minimum {min_matches}."
-
-        X = []
-        y = []
-
-        for match in matches:
-            features, _, _ = self.prepare_match_features(match.home_team, match.away_team)
-            X.append(features)
-
-            # Określ wynik: 1 (wygrana gospodarzy), 0 (remis), 2 (wygrana gości)
-            home_score = match.home_full_time_score
-            away_score = match.away_full_time_score
-
-            if home_score > away_score:
-                result = 1  # Wygrana gospodarzy
-            elif home_score == away_score:
-                result = 0  # Remis
-            else:
-                result = 2  # Wygrana gości
-
-            y.append(result)
-
-        X = np.array(X)
-        y = np.array(y)
+        if len(X) < min_matches:
+            return False, f"Za mało danych treningowych. Znaleziono {len(X)} meczów, wymagane minimum {min_matches}."
 
         # Normalizacja cech
         X_scaled = self.scaler.fit_transform(X)
@@ -191,7 +91,7 @@ class MatchPredictionService:
         self.model.fit(X_scaled, y)
         self.is_trained = True
 
-        return True, f"Model wytrenowany na {len(matches)} meczach."
+        return True, f"Model wytrenowany na {len(X)} meczach."
 
     def predict_match(self, home_team, away_team):
         """
@@ -207,24 +107,24 @@ class MatchPredictionService:
             }
         """
         if not self.is_trained:
-            success, message = self.train_model()
-            if not success:
-                return {
-                    'error': message,
-                    'prediction': None
-                }
+            return {
+                'error': NOT_TRAINED_MESSAGE,
+                'prediction': None
+            }
 
         # Przygotuj cechy
         features, home_features, away_features = self.prepare_match_features(home_team, away_team)
         features_scaled = self.scaler.transform([features])
 
         # Przewidywanie
-        prediction = self.model.predict(features_scaled)[0]
         probabilities = self.model.predict_proba(features_scaled)[0]
 
+        return self._format_prediction(probabilities, home_features, away_features)
+
+    def _format_prediction(self, probabilities, home_features, away_features):
+        """Buduje słownik wyniku z wiersza predict_proba"""
         # Mapowanie wyników
         result_map = {1: '1', 0: 'X', 2: '2'}
-        prediction_label = result_map[prediction]
 
         # Prawdopodobieństwa dla każdego wyniku
         # Klasy w modelu: [0 (X), 1 (1), 2 (2)]
@@ -233,6 +133,9 @@ class MatchPredictionService:
         for cls, prob in zip(classes, probabilities):
             prob_dict[result_map[cls]] = round(float(prob) * 100, 2)
 
+        # Przewidywany wynik = klasa o największym prawdopodobieństwie (jak model.predict)
+        prediction_label = result_map[classes[int(np.argmax(probabilities))]]
+
         # Pewność predykcji (max prawdopodobieństwo)
         confidence = round(float(max(probabilities)) * 100, 2)
 
@@ -245,22 +148,56 @@ class MatchPredictionService:
             'error': None
         }
 
+    def predict_matches(self, matches):
+        """
+        Przewiduje wyniki wielu meczów naraz: jedna macierz cech (na dzień
+        rozpoczęcia każdego meczu) i jedno wywołanie predict_proba.
+
+        Args:
+            matches: queryset lub lista obiektów Match
+
+        Returns:
+            list: [{'match': Match, 'prediction': dict jak w predict_match}]
+        """
+        if hasattr(matches, 'select_related'):
+            matches = matches.select_related('home_team', 'away_team')
+        matches = list(matches)
+
+        if not self.is_trained:
+            return [{'match': match, 'prediction': {'error': NOT_TRAINED_MESSAGE, 'prediction': None}} for match in matches]
+
+        if not matches:
+            return []
+
+        timeline = TeamTimeline().build()
+        utimes = [int(match.start_time.timestamp()) for match in matches]
+        home_matrix = timeline.features_as_of([m.home_team_id for m in matches], utimes)
+        away_matrix = timeline.features_as_of([m.away_team_id for m in matches], utimes)
+
+        X = combine_match_features(home_matrix, away_matrix)
+        probabilities = self.model.predict_proba(self.scaler.transform(X))
+
+        results = []
+        for match, proba, home_row, away_row in zip(matches, probabilities, home_matrix, away_matrix):
+            results.append({
+                'match': match,
+                'prediction': self._format_prediction(
+                    proba,
+                    {name: float(value) for name, value in zip(TEAM_FEATURE_NAMES, home_row)},
+                    {name: float(value) for name, value in zip(TEAM_FEATURE_NAMES, away_row)},
+                ),
+            })
+        return results
+
     def get_upcoming_matches_predictions(self, limit=10):
         """
-        Przewiduje wyniki nadchodzących meczów
+        Przewiduje wyniki nadchodzących meczów (wsadowo)
         """
         upcoming = Match.objects.filter(
             event_stage='1'  # Scheduled
         ).order_by('start_time')[:limit]
 
-        predictions = []
-        for match in upcoming:
-            prediction = self.predict_match(match.home_team, match.away_team)
-            if not prediction.get('error'):
-                predictions.append({
-                    'match': match,
-                    'prediction': prediction
-                })
-
-        return predictions
-
+        return [
+            item for item in self.predict_matches(upcoming)
+            if not item['prediction'].get('error')
+        ]
@@ -0,0 +1,62 @@
+"""
+Dane zależne od wyników meczów
+Po zapisaniu nowego lub zmienionego wyniku zakończonego meczu aktualizujemy
+tabele ligowe, bilanse H2H, wersje drużyn i przewidywania. Wspólne dla zapisu
+wsadowego (FootballDataService.save_matches) i pojedynczego zapisu Match
+(sygnały w core/signals.py - admin, update_or_create w komendach)
+"""
+from . import head_to_head_service, prediction_cache, standings_service, team_service
+
+# Pola stanu wyniku meczu (układ krotek result_key)
+RESULT_FIELDS = ['event_stage', 'season_id', 'home_team_id', 'away_team_id', 'home_score', 'away_score']
+
+
+def result_key(match) -> tuple:
+    """Stan wyniku meczu w układzie RESULT_FIELDS"""
+    return tuple(getattr(match, field) for field in RESULT_FIELDS)
+
+
+def is_result_change(previous, current) -> bool:
+    """Czy zmiana stanu dotyczy wyniku zakończonego meczu (także meczu, który przestał być zakończony)"""
+    if previous == current:
+        return False
+    return current[0] == '3' or (previous is not None and previous[0] == '3')
+
+
+def finished_result(state):
+    """(season_id, home_team_id, away_team_id, home_score, away_score) albo None dla niezakończonego"""
+    if state is None or state[0] != '3':
+        return None
+    return state[1:]
+
+
+def handle_result_changes(changes) -> None:
+    """
+    Aktualizuje dane zależne od wyników.
+    changes - lista (poprzedni stan, nowy stan) w układzie result_key
+    (poprzedni = None dla nowego meczu)
+    """
+    if not changes:
+        return
+
+    team_ids = set()
+    for previous, current in changes:
+        for state in (previous, current):
+            if state is not None:
+                team_ids.update(state[2:4])
+
+    # Przewidywania zaplanowanych meczów tych drużyn są już nieaktualne
+    prediction_cache.invalidate_for_teams(team_ids)
+    team_service.bump_team_versions(team_ids)
+
+    # Tabele ligowe: odejmij poprzedni wynik, dodaj nowy
+    standings_service.apply_result_changes([
+        (finished_result(previous), finished_result(current)) for previous, current in changes
+    ])
+
+    # Bilanse H2H par, których zakończony wynik się zmienił
+    head_to_head_service.update_pairs({
+        tuple(state[2:4])
+        for previous, current in changes
+        for state in (previous, current) if finished_result(state)
+    })
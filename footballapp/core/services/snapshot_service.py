@@ -0,0 +1,188 @@
+"""
+Eksport i import bazy meczów jako skompresowany NDJSON (jeden wiersz JSON na rekord)
+Rekordy są zapisywane w kolejności zależności (ligi przed sezonami, drużyny
+przed meczami itd.) i identyfikowane kluczami naturalnymi, więc plik można
+wczytać do dowolnej bazy. Obie strony działają strumieniowo - w stałej pamięci.
+"""
+import gzip
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from ..models import (
+    League, Season, Country, Team, Player, TeamSquad,
+    Match, MatchStatistic, StatDefinition
+)
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 1000
+
+
+class SnapshotModel:
+    """
+    Opis modelu w pliku: nazwa, klucz unikalny (do upsertu) i klucze obce
+    zapisywane jako klucze naturalne: {pole: lookup w values()}
+    """
+
+    def __init__(self, name, model, unique_fields, natural_fks=None):
+        self.name = name
+        self.model = model
+        self.unique_fields = unique_fields
+        self.natural_fks = natural_fks or {}
+
+    @property
+    def fields(self):
+        """Zapisywane pola: bez autonumeracji i znaczników czasu auto_now(_add)"""
+        result = []
+        for field in self.model._meta.concrete_fields:
+            if field.auto_created or getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                continue
+            if field.name in self.natural_fks:
+                continue
+            result.append(field)
+        return result
+
+
+SNAPSHOT_MODELS = [
+    SnapshotModel('league', League, ['tournament_id']),
+    SnapshotModel('season', Season, ['league', 'season_id'], {'league': ['league__tournament_id']}),
+    SnapshotModel('country', Country, ['country_id']),
+    SnapshotModel('team', Team, ['participant_id']),
+    SnapshotModel('player', Player, ['player_id']),
+    SnapshotModel('stat_definition', StatDefinition, ['stat_id']),
+    SnapshotModel('match', Match, ['event_id'], {
+        'season': ['season__league__tournament_id', 'season__season_id'],
+    }),
+    SnapshotModel('match_statistic', MatchStatistic, ['match', 'period', 'stat_id', 'stat_name']),
+    SnapshotModel('team_squad', TeamSquad, ['team', 'player', 'tournament_id']),
+]
+
+SNAPSHOT_MODELS_BY_NAME = {spec.name: spec for spec in SNAPSHOT_MODELS}
+
+
+# ============ EKSPORT ============
+
+def export_snapshot(path, models=None) -> dict:
+    """Zapisuje wybrane modele (domyślnie wszystkie) do pliku .ndjson.gz. Zwraca liczniki"""
+    counts = {}
+    with gzip.open(path, 'wt', encoding='utf-8') as output:
+        for spec in SNAPSHOT_MODELS:
+            if models and spec.name not in models:
+                continue
+
+            columns = [field.attname for field in spec.fields]
+            lookups = [lookup for path in spec.natural_fks.values() for lookup in path]
+            rows = spec.model.objects.order_by().values_list(*columns, *lookups)
+
+            count = 0
+            for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+                record = dict(zip(columns, row[:len(columns)]))
+                values = iter(row[len(columns):])
+                for name, path in spec.natural_fks.items():
+                    record[name] = [next(values) for _ in path]
+                output.write(json.dumps({'model': spec.name, 'fields': record}, cls=DjangoJSONEncoder))
+                output.write('\n')
+                count += 1
+
+            counts[spec.name] = count
+            print(f"   ✓ Exported {count} {spec.name} rows")
+    return counts
+
+
+# ============ IMPORT ============
+
+class _NaturalKeyResolver:
+    """Zamienia klucze naturalne lig i sezonów na id w docelowej bazie"""
+
+    def __init__(self):
+        self._leagues = None
+        self._seasons = None
+
+    def reset(self):
+        self._leagues = None
+        self._seasons = None
+
+    def league_id(self, key):
+        if self._leagues is None:
+            self._leagues = dict(League.objects.values_list('tournament_id', 'id'))
+        return self._leagues[key[0]]
+
+    def season_id(self, key):
+        if self._seasons is None:
+            self._seasons = {
+                (tournament_id, season_id): pk
+                for pk, tournament_id, season_id in
+                Season.objects.values_list('id', 'league__tournament_id', 'season_id')
+            }
+        return self._seasons[tuple(key)]
+
+
+def _build_instance(spec: SnapshotModel, fields: dict, resolver: _NaturalKeyResolver):
+    values = {}
+    for field in spec.fields:
+        if field.attname in fields:
+            values[field.attname] = field.to_python(fields[field.attname])
+    if 'league' in spec.natural_fks:
+        values['league_id'] = resolver.league_id(fields['league'])
+    if 'season' in spec.natural_fks:
+        values['season_id'] = resolver.season_id(fields['season'])
+    return spec.model(**values)
+
+
+def _write_batch(spec: SnapshotModel, instances: list):
+    unique = set(spec.unique_fields)
+    update_fields = [field.name for field in spec.fields if field.name not in unique]
+    spec.model.objects.bulk_create(
+        instances,
+        update_conflicts=bool(update_fields),
+        ignore_conflicts=not update_fields,
+        unique_fields=spec.unique_fields if update_fields else None,
+        update_fields=update_fields or None,
+    )
+
+
+@transaction.atomic
+def import_snapshot(path, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+    """
+    Wczytuje plik .ndjson.gz paczkami upsertów (istniejące rekordy są nadpisywane).
+    Zwraca liczniki zapisanych rekordów per model
+    """
+    counts = defaultdict(int)
+    resolver = _NaturalKeyResolver()
+    current = None
+    batch = []
+
+    def flush():
+        if batch:
+            _write_batch(current, batch)
+            counts[current.name] += len(batch)
+            batch.clear()
+
+    with gzip.open(path, 'rt', encoding='utf-8') as source:
+        for line_number, line in enumerate(source, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            spec = SNAPSHOT_MODELS_BY_NAME.get(record['model'])
+            if spec is None:
+                raise ValueError(f"Unknown model '{record['model']}' in line {line_number}")
+
+            if spec is not current:
+                flush()
+                if current is not None:
+                    print(f"   ✓ Imported {counts[current.name]} {current.name} rows")
+                # Nowe ligi / sezony muszą być widoczne dla kolejnych modeli
+                resolver.reset()
+                current = spec
+
+            batch.append(_build_instance(spec, record['fields'], resolver))
+            if len(batch) >= batch_size:
+                flush()
+
+        flush()
+        if current is not None:
+            print(f"   ✓ Imported {counts[current.name]} {current.name} rows")
+
+    return dict(counts)
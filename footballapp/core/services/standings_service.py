@@ -0,0 +1,228 @@
+"""
+Tabele ligowe (StandingRow)
+Wiersze tabeli są aktualizowane przyrostowo przy zapisie nowego lub zmienionego
+wyniku (odejmujemy stary wynik, dodajemy nowy), więc strona tabeli to jedno
+zapytanie o gotowe, posortowane wiersze
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from ..models import Match, Season, StandingRow, Team
+
+# Kolumny sumowane z wyników meczów
+STAT_FIELDS = ['played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points']
+
+# Kolejność w tabeli: punkty, bilans bramek, bramki zdobyte
+TABLE_ORDERING = ['-points', '-goal_difference', '-goals_for', 'team__name']
+
+
+def result_rows(home_score, away_score):
+    """Wkład jednego wyniku w tabelę: (wiersz gospodarzy, wiersz gości) w układzie STAT_FIELDS"""
+    home_score = home_score or 0
+    away_score = away_score or 0
+    if home_score > away_score:
+        home, away = (1, 0, 0, 3), (0, 0, 1, 0)
+    elif home_score < away_score:
+        home, away = (0, 0, 1, 0), (1, 0, 0, 3)
+    else:
+        home, away = (0, 1, 0, 1), (0, 1, 0, 1)
+    return (
+        (1, home[0], home[1], home[2], home_score, away_score, home[3]),
+        (1, away[0], away[1], away[2], away_score, home_score, away[3]),
+    )
+
+
+def _add_result(deltas, result, sign):
+    """result = (season_id, home_team_id, away_team_id, home_score, away_score)"""
+    season_id, home_team_id, away_team_id, home_score, away_score = result
+    home_row, away_row = result_rows(home_score, away_score)
+    for team_id, row in ((home_team_id, home_row), (away_team_id, away_row)):
+        delta = deltas[(season_id, team_id)]
+        for i, value in enumerate(row):
+            delta[i] += sign * value
+
+
+@transaction.atomic
+def apply_result_changes(changes) -> int:
+    """
+    Aktualizuje tabele po zmianie wyników.
+    changes - lista (poprzedni wynik, nowy wynik), każdy jako
+    (season_id, home_team_id, away_team_id, home_score, away_score) albo None
+    (mecz wcześniej / już nie jest zakończony). Zwraca liczbę zmienionych wierszy.
+    """
+    deltas = defaultdict(lambda: [0] * len(STAT_FIELDS))
+    for previous, current in changes:
+        if previous:
+            _add_result(deltas, previous, -1)
+        if current:
+            _add_result(deltas, current, +1)
+
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return 0
+
+    season_ids = {season_id for season_id, _ in deltas}
+    team_ids = {team_id for _, team_id in deltas}
+    existing = {
+        (row.season_id, row.team_id): row
+        for row in StandingRow.objects.filter(season_id__in=season_ids, team_id__in=team_ids)
+    }
+
+    rows = []
+    for (season_id, team_id), delta in deltas.items():
+        row = existing.get((season_id, team_id)) or StandingRow(season_id=season_id, team_id=team_id)
+        for field, value in zip(STAT_FIELDS, delta):
+            setattr(row, field, getattr(row, field) + value)
+        row.goal_difference = row.goals_for - row.goals_against
+        rows.append(row)
+
+    StandingRow.objects.bulk_update([row for row in rows if row.pk], STAT_FIELDS + ['goal_difference'])
+    StandingRow.objects.bulk_create([row for row in rows if not row.pk])
+    # Drużyna bez rozegranych meczów (np. po zmianie sezonu meczu) znika z tabeli
+    StandingRow.objects.filter(season_id__in=season_ids, played__lte=0).delete()
+    update_positions(season_ids)
+    return len(rows)
+
+
+def update_positions(season_ids):
+    """Przelicza kolumnę position dla podanych sezonów"""
+    rows = list(
+        StandingRow.objects.filter(season_id__in=season_ids)
+        .order_by('season_id', *TABLE_ORDERING)
+        .only('id', 'season_id', 'position')
+    )
+    changed = []
+    position = 0
+    current_season = None
+    for row in rows:
+        if row.season_id != current_season:
+            current_season, position = row.season_id, 0
+        position += 1
+        if row.position != position:
+            row.position = position
+            changed.append(row)
+    StandingRow.objects.bulk_update(changed, ['position'])
+
+
+@transaction.atomic
+def rebuild_season(season) -> int:
+    """Przelicza tabelę sezonu od zera ze wszystkich zakończonych meczów"""
+    StandingRow.objects.filter(season=season).delete()
+    rows = compute_table(season)
+    StandingRow.objects.bulk_create(rows)
+    return len(rows)
+
+
+# ============ TABELE LICZONE W BAZIE ============
+
+VENUES = ('all', 'home', 'away')
+
+_TABLE_SQL = """
+WITH results AS (
+    SELECT m.home_team_id AS team_id, 'home' AS venue, m.start_time AS start_time,
+           COALESCE(m.home_score, 0) AS gf, COALESCE(m.away_score, 0) AS ga
+    FROM {match} m
+    WHERE m.season_id = %(season_id)s AND m.event_stage = '3' {as_of_filter}
+    UNION ALL
+    SELECT m.away_team_id, 'away', m.start_time,
+           COALESCE(m.away_score, 0), COALESCE(m.home_score, 0)
+    FROM {match} m
+    WHERE m.season_id = %(season_id)s AND m.event_stage = '3' {as_of_filter}
+),
+ranked AS (
+    SELECT r.*, ROW_NUMBER() OVER (PARTITION BY r.team_id ORDER BY r.start_time DESC) AS recent
+    FROM results r
+    {venue_filter}
+),
+totals AS (
+    SELECT team_id,
+           COUNT(*) AS played,
+           SUM(CASE WHEN gf > ga THEN 1 ELSE 0 END) AS wins,
+           SUM(CASE WHEN gf = ga THEN 1 ELSE 0 END) AS draws,
+           SUM(CASE WHEN gf < ga THEN 1 ELSE 0 END) AS losses,
+           SUM(gf) AS goals_for,
+           SUM(ga) AS goals_against,
+           SUM(CASE WHEN gf > ga THEN 3 WHEN gf = ga THEN 1 ELSE 0 END) AS points
+    FROM ranked
+    {last_filter}
+    GROUP BY team_id
+)
+SELECT t.team_id, t.played, t.wins, t.draws, t.losses, t.goals_for, t.goals_against, t.points,
+       team.name, team.short_name, team.three_char_name, team.logo, team.slug
+FROM totals t
+JOIN {team} team ON team.participant_id = t.team_id
+ORDER BY t.points DESC, t.goals_for - t.goals_against DESC, t.goals_for DESC, team.name
+"""
+
+
+def compute_table(season, as_of=None, venue: str = 'all', last_matches: int = None):
+    """
+    Tabela sezonu liczona jednym zapytaniem agregującym (bez StandingRow):
+    - as_of: tylko mecze rozpoczęte najpóźniej w tej chwili (tabela "na dzień")
+    - venue: 'all', 'home' (tylko mecze u siebie) albo 'away'
+    - last_matches: tylko ostatnie N meczów każdej drużyny (tabela formy)
+    Zwraca niezapisane obiekty StandingRow z ustawionymi drużynami i pozycjami
+    """
+    if venue not in VENUES:
+        raise ValueError(f"venue must be one of {', '.join(VENUES)}")
+
+    params = {'season_id': season.pk}
+    as_of_filter = venue_filter = last_filter = ''
+    if as_of is not None:
+        as_of_filter = 'AND m.start_time <= %(as_of)s'
+        params['as_of'] = connection.ops.adapt_datetimefield_value(as_of)
+    if venue != 'all':
+        venue_filter = 'WHERE r.venue = %(venue)s'
+        params['venue'] = venue
+    if last_matches:
+        last_filter = 'WHERE recent <= %(last_matches)s'
+        params['last_matches'] = int(last_matches)
+
+    sql = _TABLE_SQL.format(
+        match=Match._meta.db_table,
+        team=Team._meta.db_table,
+        as_of_filter=as_of_filter,
+        venue_filter=venue_filter,
+        last_filter=last_filter,
+    )
+
+    rows = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for position, record in enumerate(cursor.fetchall(), 1):
+            team_id, played, wins, draws, losses, goals_for, goals_against, points = record[:8]
+            name, short_name, three_char_name, logo, slug = record[8:]
+            row = StandingRow(
+                season=season, position=position,
+                played=played, wins=wins, draws=draws, losses=losses,
+                goals_for=goals_for, goals_against=goals_against,
+                goal_difference=goals_for - goals_against, points=points,
+            )
+            row.team = Team(
+                participant_id=team_id, name=name, short_name=short_name,
+                three_char_name=three_char_name, logo=logo, slug=slug,
+            )
+            rows.append(row)
+    return rows
+
+
+def rebuild_all(seasons=None) -> int:
+    """Przelicza tabele wszystkich (lub podanych) sezonów"""
+    seasons = seasons if seasons is not None else Season.objects.all()
+    return sum(rebuild_season(season) for season in seasons)
+
+
+def get_table(season, as_of=None, venue: str = 'all', last_matches: int = None):
+    """
+    Posortowane wiersze tabeli sezonu (jedno zapytanie).
+    Pełna tabela czytana jest z StandingRow (wypełniane przy zapisie wyników,
+    imporcie i migracji 0012). Żądanie nigdy nie zapisuje do bazy - sezon bez
+    zapisanych wierszy liczony jest w locie jednym zapytaniem (compute_table),
+    tak jak tabele "na dzień", domowe/wyjazdowe i tabele formy
+    """
+    if as_of is not None or venue != 'all' or last_matches:
+        return compute_table(season, as_of=as_of, venue=venue, last_matches=last_matches)
+
+    rows = list(StandingRow.objects.filter(season=season).select_related('team').order_by('position'))
+    return rows or compute_table(season)
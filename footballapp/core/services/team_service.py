@@ -0,0 +1,282 @@
+"""
+Podsumowanie wyników drużyny (bilans, bramki, dom/wyjazd, czyste konta)
+Liczone jednym zapytaniem agregującym i trzymane w cache do czasu zapisania
+kolejnego wyniku drużyny (wersja drużyny podbijana w result_service.handle_result_changes)
+
+Średnie statystyk meczowych drużyny (TeamStatAggregate) przeliczane są przy
+zapisie statystyk tylko dla drużyn, których mecze się zmieniły, więc strona
+drużyny i cechy modelu czytają je jednym zapytaniem
+
+Mecze drużyny czytane są przez TeamMatch (wiersz na drużynę i mecz,
+synchronizowany w save_matches i sygnałem post_save meczu)
+"""
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from ..models import Match, MatchStatistic, TeamMatch, TeamStatAggregate
+from .view_cache import bump_versions, get_versions
+
+TEAM_VERSION_KEY = 'data_version:team:{team_id}'
+SUMMARY_KEY = 'team_summary:{team_id}:{version}'
+SUMMARY_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def bump_team_versions(team_ids):
+    """Unieważnia podsumowania drużyn (po commicie bieżącej transakcji)"""
+    bump_versions(TEAM_VERSION_KEY.format(team_id=team_id) for team_id in team_ids)
+
+
+def compute_team_summary(team_id) -> dict:
+    """Bilans drużyny z zakończonych meczów - jedno zapytanie z warunkowymi Count/Sum po TeamMatch"""
+    totals = (
+        TeamMatch.objects.filter(team_id=team_id, event_stage='3')
+        .annotate(
+            scored=Coalesce('goals_for', Value(0)),
+            conceded=Coalesce('goals_against', Value(0)),
+        )
+        .aggregate(**{
+            f'{side}_{name}': aggregate
+            for side, venue in (('home', Q(is_home=True)), ('away', Q(is_home=False)))
+            for name, aggregate in (
+                ('played', Count('pk', filter=venue)),
+                ('wins', Count('pk', filter=venue & Q(scored__gt=F('conceded')))),
+                ('draws', Count('pk', filter=venue & Q(scored=F('conceded')))),
+                ('goals_for', Coalesce(Sum('scored', filter=venue), Value(0))),
+                ('goals_against', Coalesce(Sum('conceded', filter=venue), Value(0))),
+                ('clean_sheets', Count('pk', filter=venue & Q(conceded=0))),
+            )
+        })
+    )
+
+    splits = {}
+    for side in ('home', 'away'):
+        split = {
+            name: totals[f'{side}_{name}']
+            for name in ('played', 'wins', 'draws', 'goals_for', 'goals_against', 'clean_sheets')
+        }
+        split['losses'] = split['played'] - split['wins'] - split['draws']
+        splits[side] = split
+
+    def total(name):
+        return splits['home'][name] + splits['away'][name]
+
+    return {
+        'total_matches': total('played'),
+        'wins': total('wins'),
+        'draws': total('draws'),
+        'losses': total('losses'),
+        'goals_scored': total('goals_for'),
+        'goals_conceded': total('goals_against'),
+        'clean_sheets': total('clean_sheets'),
+        'home': splits['home'],
+        'away': splits['away'],
+    }
+
+
+def get_team_summary(team_id) -> dict:
+    """Podsumowanie drużyny z cache (przeliczane po nowym wyniku drużyny)"""
+    version_key = TEAM_VERSION_KEY.format(team_id=team_id)
+    version = get_versions([version_key])[version_key]
+    key = SUMMARY_KEY.format(team_id=team_id, version=version)
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute_team_summary(team_id)
+        cache.set(key, summary, timeout=SUMMARY_TIMEOUT)
+    return summary
+
+
+# ============ ŚREDNIE STATYSTYK ============
+
+# Okna ostatnich meczów, dla których trzymane są sumy (0 = wszystkie mecze)
+STAT_WINDOWS = (TeamStatAggregate.ALL_MATCHES, 5, 10)
+
+_STAT_AGGREGATES_SQL = """
+WITH sides AS (
+    SELECT m.home_team_id AS team_id, m.season_id AS season_id, m.start_time AS start_time,
+           m.event_id AS event_id, s.stat_name AS stat_name, s.home_value_numeric AS value
+    FROM {statistic} s
+    JOIN {match} m ON m.event_id = s.match_id
+    WHERE s.period = 'match' AND s.home_value_numeric IS NOT NULL AND m.home_team_id IN ({teams})
+    UNION ALL
+    SELECT m.away_team_id, m.season_id, m.start_time, m.event_id, s.stat_name, s.away_value_numeric
+    FROM {statistic} s
+    JOIN {match} m ON m.event_id = s.match_id
+    WHERE s.period = 'match' AND s.away_value_numeric IS NOT NULL AND m.away_team_id IN ({teams})
+),
+ranked AS (
+    SELECT team_id, season_id, stat_name, value,
+           ROW_NUMBER() OVER (PARTITION BY team_id, stat_name
+                              ORDER BY start_time DESC, event_id DESC) AS recent,
+           ROW_NUMBER() OVER (PARTITION BY team_id, season_id, stat_name
+                              ORDER BY start_time DESC, event_id DESC) AS season_recent
+    FROM sides
+    WHERE team_id IN ({teams})
+)
+SELECT team_id, NULL, stat_name, {all_seasons}
+FROM ranked
+GROUP BY team_id, stat_name
+UNION ALL
+SELECT team_id, season_id, stat_name, {per_season}
+FROM ranked
+GROUP BY team_id, season_id, stat_name
+"""
+
+
+def _window_columns(rank_column: str) -> str:
+    """Para kolumn SUM/COUNT dla każdego okna z STAT_WINDOWS"""
+    columns = []
+    for window in STAT_WINDOWS:
+        value = f"CASE WHEN {rank_column} <= {int(window)} THEN value END" if window else "value"
+        columns.append(f"SUM({value}), COUNT({value})")
+    return ", ".join(columns)
+
+
+@transaction.atomic
+def update_stat_aggregates(team_ids) -> int:
+    """
+    Przelicza sumy statystyk podanych drużyn (wszystkie sezony i każdy sezon
+    osobno, dla każdego okna z STAT_WINDOWS) jednym zapytaniem agregującym.
+    Okno liczone jest po ostatnich meczach drużyny, w których statystyka ma
+    wartość liczbową. Zwraca liczbę zapisanych wierszy.
+
+    Każde wywołanie liczy sumy drużyny od zera (koszt rośnie z liczbą jej
+    meczów ze statystykami), zamiast dodawać różnice. Okna 5 i 10 ostatnich
+    meczów nie dają się utrzymać różnicami: nowy mecz wypycha najstarszą
+    wartość, a mecze bywają zapisywane poza kolejnością (uzupełnianie
+    statystyk, poprawki). Przy zapisie wielu meczów naraz lepiej wołać
+    save_matches_statistics paczką - jedno przeliczenie na paczkę
+    """
+    team_ids = sorted({team_id for team_id in team_ids if team_id})
+    if not team_ids:
+        return 0
+
+    sql = _STAT_AGGREGATES_SQL.format(
+        statistic=MatchStatistic._meta.db_table,
+        match=Match._meta.db_table,
+        teams=", ".join(["%s"] * len(team_ids)),
+        all_seasons=_window_columns('recent'),
+        per_season=_window_columns('season_recent'),
+    )
+    # Lista drużyn występuje w zapytaniu trzy razy
+    params = team_ids * 3
+
+    rows = []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for record in cursor.fetchall():
+            team_id, season_id, stat_name = record[:3]
+            for i, window in enumerate(STAT_WINDOWS):
+                total, count = record[3 + 2 * i], record[4 + 2 * i]
+                rows.append(TeamStatAggregate(
+                    team_id=team_id, season_id=season_id, stat_name=stat_name,
+                    window=window, total=total or 0, count=count,
+                ))
+
+    TeamStatAggregate.objects.filter(team_id__in=team_ids).delete()
+    TeamStatAggregate.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_stat_aggregates(batch_size: int = 50) -> int:
+    """Przelicza od zera średnie statystyk wszystkich drużyn"""
+    with_stats = Match.objects.filter(statistics__isnull=False)
+    team_ids = sorted(
+        set(with_stats.values_list('home_team_id', flat=True).distinct())
+        | set(with_stats.values_list('away_team_id', flat=True).distinct())
+    )
+    TeamStatAggregate.objects.all().delete()
+    return sum(
+        update_stat_aggregates(team_ids[i:i + batch_size])
+        for i in range(0, len(team_ids), batch_size)
+    )
+
+
+def get_stat_averages(team_id, stat_names, window: int = 10, season=None) -> dict:
+    """
+    {nazwa statystyki: (średnia, liczba meczów)} z TeamStatAggregate - jedno
+    zapytanie po indeksie. Brak statystyki = (None, 0)
+    """
+    if window not in STAT_WINDOWS:
+        raise ValueError(f"window must be one of {', '.join(map(str, STAT_WINDOWS))}")
+
+    aggregates = {
+        aggregate.stat_name: aggregate
+        for aggregate in TeamStatAggregate.objects.filter(
+            team_id=team_id, season=season, window=window, stat_name__in=stat_names,
+        )
+    }
+    return {
+        name: (aggregates[name].average, aggregates[name].count) if name in aggregates else (None, 0)
+        for name in stat_names
+    }
+
+
+# ============ MECZE DRUŻYNY (TeamMatch) ============
+
+TEAM_MATCH_UPDATE_FIELDS = [
+    'opponent', 'is_home', 'start_time', 'event_stage', 'goals_for', 'goals_against', 'points',
+]
+
+
+def participation_rows(match):
+    """Dwa wiersze TeamMatch meczu: (gospodarze, goście)"""
+    rows = []
+    for team_id, opponent_id, is_home, goals_for, goals_against in (
+        (match.home_team_id, match.away_team_id, True, match.home_score, match.away_score),
+        (match.away_team_id, match.home_team_id, False, match.away_score, match.home_score),
+    ):
+        points = None
+        if match.event_stage == '3':
+            scored, conceded = goals_for or 0, goals_against or 0
+            points = 3 if scored > conceded else 1 if scored == conceded else 0
+        rows.append(TeamMatch(
+            team_id=team_id, match_id=match.event_id, opponent_id=opponent_id, is_home=is_home,
+            start_time=match.start_time, event_stage=match.event_stage,
+            goals_for=goals_for, goals_against=goals_against, points=points,
+        ))
+    return rows
+
+
+def sync_team_matches(matches, stale_match_ids=()) -> int:
+    """
+    Zapisuje wiersze TeamMatch podanych meczów jednym upsertem.
+    stale_match_ids - mecze, w których zmieniła się drużyna (ich stare wiersze są usuwane)
+    """
+    stale_match_ids = list(stale_match_ids)
+    if stale_match_ids:
+        TeamMatch.objects.filter(match_id__in=stale_match_ids).delete()
+
+    rows = [row for match in matches for row in participation_rows(match)]
+    TeamMatch.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['team', 'match'],
+        update_fields=TEAM_MATCH_UPDATE_FIELDS,
+        batch_size=500,
+    )
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_team_matches(batch_size: int = 2000) -> int:
+    """Odbudowuje TeamMatch od zera ze wszystkich meczów"""
+    TeamMatch.objects.all().delete()
+    fields = ['event_id', 'home_team_id', 'away_team_id', 'start_time', 'event_stage', 'home_score', 'away_score']
+    matches = Match.objects.only(*fields).order_by().iterator(chunk_size=batch_size)
+    rows = [row for match in matches for row in participation_rows(match)]
+    TeamMatch.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def team_matches(team_id, stage: str = None):
+    """
+    Mecze drużyny od najnowszych - skan indeksu (team, start_time) TeamMatch.
+    Warunki na TeamMatch muszą być w jednym filter() (jeden JOIN)
+    """
+    conditions = {'participations__team_id': team_id}
+    if stage:
+        conditions['participations__event_stage'] = stage
+    return Match.objects.filter(**conditions).order_by('-participations__start_time', '-participations__match_id')
@@ -0,0 +1,37 @@
+"""
+Ograniczanie tempa zapytań do zewnętrznych API
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Limiter typu token bucket, bezpieczny dla wielu wątków.
+    Uzupełnia `rate` tokenów na sekundę, maksymalnie `capacity` (rozmiar paczki).
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0):
+        """Blokuje wątek, aż będzie dostępna odpowiednia liczba tokenów"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,120 @@
+"""
+Cache odpowiedzi widoków unieważniany wersjami danych
+Każdy widok deklaruje, od jakich danych zależy ('matches', 'stats', 'teams', 'news').
+Klucz cache zawiera aktualne wersje tych danych, więc zapis nowych danych
+(save_matches, save_matches_statistics, save_squads, fetch_news) podbija wersję i stare
+wpisy przestają być używane - bez przeszukiwania i kasowania kluczy.
+Backend ustawiany jest w settings.CACHES (domyślnie pliki, opcjonalnie Redis),
+żeby komendy pobierające dane i serwer WWW widziały te same wersje.
+Wersje leżą w osobnym aliasie 'versions', a brakująca wersja (np. usunięta
+z cache) jest tworzona na nowo zamiast wracać do 0 - inaczej strona zapisana
+pod wersją 0 mogłaby znów zostać zwrócona.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import HttpResponse
+
+DATA_SCOPES = ('matches', 'stats', 'teams', 'news')
+VERSION_KEY_PREFIX = 'data_version:'
+VERSIONS_CACHE = 'versions'
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_KEY_PREFIX}{scope}"
+
+
+def get_versions(keys) -> dict:
+    """
+    {klucz: wersja} z aliasu 'versions'. Brakujący klucz dostaje nową wersję
+    (add - przy wyścigu wygrywa pierwszy zapis), więc zniknięcie wersji
+    unieważnia zależne wpisy zamiast przywracać stare
+    """
+    versions = caches[VERSIONS_CACHE]
+    stored = versions.get_many(keys)
+    for key in keys:
+        if key not in stored:
+            versions.add(key, time.time_ns(), timeout=None)
+            stored[key] = versions.get(key)
+    return stored
+
+
+def bump_versions(keys):
+    """Nowe wersje podanych kluczy (po commicie bieżącej transakcji)"""
+    keys = list(keys)
+    if keys:
+        # Znacznik czasu zamiast licznika - po wyczyszczeniu cache wersje się nie powtórzą
+        transaction.on_commit(lambda: caches[VERSIONS_CACHE].set_many(dict.fromkeys(keys, time.time_ns()), timeout=None))
+
+
+def get_data_versions(scopes) -> dict:
+    """{zakres: wersja}"""
+    stored = get_versions([_version_key(scope) for scope in scopes])
+    return {scope: stored[_version_key(scope)] for scope in scopes}
+
+
+def bump_data_version(*scopes):
+    """
+    Unieważnia wszystkie widoki zależne od podanych danych.
+    Wewnątrz transakcji wersja zmienia się dopiero po commicie - inaczej widok
+    mógłby zapisać stare dane pod nową wersją
+    """
+    for scope in scopes:
+        if scope not in DATA_SCOPES:
+            raise ValueError(f"Unknown data scope '{scope}'")
+    bump_versions(_version_key(scope) for scope in scopes)
+
+
+def _cache_key(request, scopes) -> str:
+    match = request.resolver_match
+    view_name = match.view_name if match else request.path
+    user = getattr(request, 'user', None)
+    user_key = user.pk if user is not None and user.is_authenticated else 'anon'
+    versions = get_data_versions(scopes)
+    raw = "|".join([
+        view_name,
+        request.path,
+        "&".join(f"{k}={v}" for k, v in sorted(request.GET.lists())),
+        str(user_key),
+        ",".join(f"{scope}:{versions[scope]}" for scope in scopes),
+    ])
+    return "view:" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def cached_view(*scopes, timeout=None):
+    """
+    Dekorator widoku (funkcji lub metody get przez method_decorator):
+    odpowiedzi 200 na GET są zapamiętywane per widok, parametry i użytkownik
+    """
+    for scope in scopes:
+        if scope not in DATA_SCOPES:
+            raise ValueError(f"Unknown data scope '{scope}'")
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            key = _cache_key(request, scopes)
+            cached = cache.get(key)
+            if cached is not None:
+                status, content_type, content = cached
+                return HttpResponse(content, status=status, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not getattr(response, 'streaming', False):
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                cache.set(
+                    key,
+                    (response.status_code, response['Content-Type'], response.content),
+                    timeout=timeout if timeout is not None else getattr(settings, 'VIEW_CACHE_TIMEOUT', 24 * 60 * 60),
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import League, Match
+from .services import result_service, view_cache
+from .services.league_service import bump_league_version
+from .services.team_service import sync_team_matches
+
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+def league_changed(sender, **kwargs):
+    bump_league_version()
+
+
+@receiver(pre_save, sender=Match)
+def match_saving(sender, instance, **kwargs):
+    # Stan wyniku sprzed zapisu - do wykrycia zmiany wyniku w match_saved
+    instance._previous_result = (
+        Match.objects.filter(pk=instance.pk)
+        .values_list(*result_service.RESULT_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Match)
+def match_saved(sender, instance, **kwargs):
+    # Pojedynczy zapis (admin, Match.objects.create, update_or_create w komendach) -
+    # zapisy wsadowe synchronizuje save_matches
+    sync_team_matches([instance], stale_match_ids=[instance.pk])
+    view_cache.bump_data_version('matches')
+
+    # Tabele, H2H, wersje drużyn i przewidywania - jak w save_matches
+    previous = getattr(instance, '_previous_result', None)
+    current = result_service.result_key(instance)
+    if result_service.is_result_change(previous, current):
+        result_service.handle_result_changes([(previous, current)])
+
+
+@receiver(post_delete, sender=Match)
+def match_deleted(sender, instance, **kwargs):
+    # Wiersze TeamMatch usuwa kaskada; tabele i H2H trzeba przeliczyć bez usuniętego wyniku
+    view_cache.bump_data_version('matches')
+    previous = result_service.result_key(instance)
+    if result_service.finished_result(previous):
+        result_service.handle_result_changes([(previous, None)])
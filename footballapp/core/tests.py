@@ -1,3 +1,1011 @@
-from django.test import TestCase
+import io
+import os
+import tempfile
+import time
+from importlib import import_module
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .management.commands.fetch_players import Command as FetchPlayersCommand
+from .models import (
+    Country, HeadToHead, IngestionState, League, Match, MatchPrediction, MatchStatistic, Player, Season, StandingRow,
+    StatDefinition, Team, TeamMatch, TeamSquad,
+)
+from .services import (
+    head_to_head_service, match_service, model_store, prediction_cache, standings_service, team_service, view_cache,
+)
+from .services.feature_service import TEAM_FEATURE_NAMES, TeamTimeline
+from .services.footballdata_service import FootballDataService
+from .services.http_cache import CacheMiss
+from .services.prediction_service import NOT_TRAINED_MESSAGE, MatchPredictionService
+
+# Cache w pamięci - testy nie mogą czytać ani zapisywać plików cache serwera
+TEST_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'versions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-versions'},
+}
+
+KICKOFF = datetime(2025, 8, 1, 15, 0, tzinfo=timezone.utc)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FootballTestCase(TestCase):
+    """Liga, sezon i cztery drużyny testowe oraz skrót do tworzenia meczów"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.league = League.objects.create(
+            tournament_id='test-league', tournament_template_id='test-template',
+            name='Test League', country='Testland',
+        )
+        cls.season = Season.objects.create(
+            league=cls.league, season_id=2025, name='2025/2026', tournament_stage_id='test-stage',
+        )
+        cls.teams = [
+            Team.objects.create(participant_id=f'team-{i}', name=f'Team {i}', slug=f'team-{i}')
+            for i in range(4)
+        ]
+
+    def setUp(self):
+        # Cache w pamięci żyje między testami - każdy test zaczyna od pustego
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+
+    def create_match(self, home, away, day, home_score=None, away_score=None, stage='3', event_id=None):
+        """Mecz dnia `day` od KICKOFF (zapis przez save - jak admin i update_or_create)"""
+        start_time = KICKOFF + timedelta(days=day)
+        return Match.objects.create(
+            event_id=event_id or f'{home.pk}-{away.pk}-{day}',
+            season=self.season, round=f'Round {day}',
+            home_team=home, away_team=away,
+            home_event_participant_id=home.pk, away_event_participant_id=away.pk,
+            start_time=start_time, start_utime=int(start_time.timestamp()),
+            event_stage=stage, event_stage_id=stage,
+            home_score=home_score, away_score=away_score,
+            home_full_time_score=home_score, away_full_time_score=away_score,
+        )
+
+
+
+class ServiceTestCase(FootballTestCase):
+    """Testy FootballDataService bez sieci: dane w formacie odpowiedzi API"""
+
+    def setUp(self):
+        super().setUp()
+        # Serwis raportuje postęp przez print - w testach bez wyjścia
+        patcher = mock.patch('core.services.footballdata_service.print', create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make_service(self, **kwargs):
+        with mock.patch.dict(os.environ, {'SPORTDB_API_KEY': 'test-key'}):
+            return FootballDataService(use_cache=kwargs.pop('use_cache', False), **kwargs)
+
+    def api_match(self, event_id, home, away, day, home_score=None, away_score=None, stage='FINISHED'):
+        """Mecz w formacie listy wyników API"""
+        start_time = KICKOFF + timedelta(days=day)
+        return {
+            'eventId': event_id, 'round': f'Round {day}',
+            'tournamentId': self.league.tournament_id,
+            'tournamentTemplateId': self.league.tournament_template_id,
+            'tournamentName': f'{self.league.country}: {self.league.name}',
+            'season': self.season.season_id, 'seasonName': self.season.name,
+            'tournamentStageId': self.season.tournament_stage_id,
+            'homeParticipantIds': home.pk, 'homeName': home.name, 'homeFirstName': home.name,
+            'home3CharName': 'HOM', 'homeLogo': 'home.png', 'homeParticipantNameUrl': home.slug,
+            'awayParticipantIds': away.pk, 'awayName': away.name, 'awayFirstName': away.name,
+            'away3CharName': 'AWY', 'awayLogo': 'away.png', 'awayParticipantNameUrl': away.slug,
+            'homeEventParticipantId': f'{event_id}-h', 'awayEventParticipantId': f'{event_id}-a',
+            'startDateTimeUtc': start_time.isoformat(), 'startUtime': str(int(start_time.timestamp())),
+            'eventStage': stage,
+            'homeScore': home_score, 'awayScore': away_score,
+            'homeFullTimeScore': home_score, 'awayFullTimeScore': away_score,
+        }
+
+    def api_stats(self, possession=(55, 45), shots=(5, 2)):
+        """Statystyki meczu w formacie API (mecz i 1. połowa)"""
+        stats = [
+            {'statId': '12', 'statName': 'Ball Possession', 'homeValue': f'{possession[0]}%', 'awayValue': f'{possession[1]}%'},
+            {'statId': '34', 'statName': 'Shots on target', 'homeValue': str(shots[0]), 'awayValue': str(shots[1])},
+        ]
+        return [{'period': 'Match', 'stats': stats}, {'period': '1st Half', 'stats': stats[:1]}]
+
+class TeamTimelineTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        home, a, b = self.teams[:3]
+        self.matches = [
+            self.create_match(home, a, 1, 2, 0),
+            self.create_match(b, home, 2, 1, 0),
+            self.create_match(home, b, 3, 1, 1),
+        ]
+
+    def utime(self, match):
+        return int(match.start_time.timestamp())
+
+    def test_features_as_of_use_only_earlier_matches(self):
+        timeline = TeamTimeline(last_n_matches=5).build()
+        team = self.teams[0].pk
+
+        # Na dzień pierwszego meczu drużyna nie ma historii - wartości domyślne
+        before_first = timeline.team_features(team, self.utime(self.matches[0]))
+        self.assertEqual(before_first['avg_goals_scored'], 0.0)
+        self.assertEqual(before_first['avg_possession'], 50.0)
+
+        # Na dzień drugiego meczu liczy się tylko wygrana 2:0
+        before_second = timeline.team_features(team, self.utime(self.matches[1]))
+        self.assertEqual(before_second['avg_goals_scored'], 2.0)
+        self.assertEqual(before_second['win_rate'], 1.0)
+
+        # Bez czasu - wszystkie trzy mecze
+        now = timeline.team_features(team)
+        self.assertAlmostEqual(now['avg_goals_scored'], 1.0)
+        self.assertAlmostEqual(now['avg_goals_conceded'], 2 / 3)
+        self.assertAlmostEqual(now['form'], 4 / 9)
+
+    def test_later_results_do_not_change_earlier_features(self):
+        team = self.teams[0].pk
+        as_of = self.utime(self.matches[2])
+        before = TeamTimeline().build().team_features(team, as_of)
+
+        self.create_match(self.teams[0], self.teams[3], 10, 5, 0)
+        after = TeamTimeline().build().team_features(team, as_of)
+        self.assertEqual(before, after)
+
+    def test_last_n_matches_window(self):
+        features = TeamTimeline(last_n_matches=2).build().team_features(self.teams[0].pk)
+        # Porażka 0:1 i remis 1:1
+        self.assertEqual(features['avg_goals_scored'], 0.5)
+        self.assertEqual(features['draw_rate'], 0.5)
+        self.assertEqual(features['win_rate'], 0.0)
+
+    def test_batched_rows_match_single_lookups(self):
+        timeline = TeamTimeline().build()
+        batch = timeline.matrix_for(
+            [m.home_team_id for m in self.matches], [m.away_team_id for m in self.matches],
+            [self.utime(m) for m in self.matches],
+        )
+        for row, match in zip(batch, self.matches):
+            single, _, _ = timeline.match_features(match.home_team_id, match.away_team_id, self.utime(match))
+            np.testing.assert_allclose(row, single)
+
+    def test_statistics_are_point_in_time(self):
+        for match, home_possession in ((self.matches[0], '60%'), (self.matches[2], '30%')):
+            MatchStatistic.objects.create(
+                match=match, period='match', stat_id='12', stat_name='Ball Possession',
+                home_value=home_possession, away_value='-',
+            )
+        timeline = TeamTimeline().build()
+        team = self.teams[0].pk
+
+        # Przed trzecim meczem: tylko 60% z pierwszego (drugi mecz bez statystyk nie zaniża średniej)
+        self.assertEqual(timeline.team_features(team, self.utime(self.matches[2]))['avg_possession'], 60.0)
+        self.assertEqual(timeline.team_features(team)['avg_possession'], 45.0)
+
+    def test_training_rows_exclude_their_own_result(self):
+        X, y = TeamTimeline().build().training_matrix()
+        self.assertEqual([int(label) for label in y], [1, 1, 0])
+        # Pierwszy mecz - obie drużyny bez historii (cechy domyślne, różnice zerowe)
+        self.assertEqual(X[0][0], 0.0)
+        self.assertEqual(list(X[0][-3:]), [0.0, 0.0, 0.0])
+
+
+class PredictionTrainingTests(FootballTestCase):
+    """Trening modelu na macierzy cech budowanej wsadowo"""
+
+    def play_rounds(self, first_day, rounds):
+        team_0, team_1, team_2, team_3 = self.teams
+        for day in range(first_day, first_day + rounds):
+            self.create_match(team_0, team_1, day, day % 3, 1)
+            self.create_match(team_2, team_3, day, 1, day % 2)
+
+    def train(self, min_matches):
+        service = MatchPredictionService()
+        with CaptureQueriesContext(connection) as context:
+            trained, message = service.train_model(min_matches=min_matches)
+        return trained, message, len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_training_set(self):
+        self.play_rounds(1, 3)
+        trained, _, small = self.train(min_matches=6)
+        self.assertTrue(trained)
+
+        self.play_rounds(4, 12)
+        trained, message, large = self.train(min_matches=6)
+        self.assertTrue(trained)
+        self.assertIn('30', message)
+        self.assertEqual(small, large)
+
+    def test_too_few_matches(self):
+        self.play_rounds(1, 2)
+        trained, message, _ = self.train(min_matches=50)
+        self.assertFalse(trained)
+        self.assertIn('Znaleziono 4', message)
+
+
+class FakePredictionService:
+    """Serwis przewidywań z zapamiętaną listą przeliczonych meczów (bez modelu)"""
+    is_trained = True
+    version = 'test-version'
+
+    def __init__(self):
+        self.predicted = []
+
+    def predict_matches(self, matches):
+        matches = list(matches)
+        self.predicted.extend(match.event_id for match in matches)
+        return [
+            {'match': match, 'prediction': {
+                'prediction': '1', 'probabilities': {'1': 0.5, 'X': 0.3, '2': 0.2}, 'confidence': 0.5,
+                'home_features': {}, 'away_features': {}, 'error': None,
+            }}
+            for match in matches
+        ]
+
+
+class PredictionCacheTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        team_0, team_1, team_2, team_3 = self.teams
+        self.create_match(team_0, team_1, 1, 1, 0)
+        self.upcoming = [
+            self.create_match(team_0, team_1, 10, stage='1'),
+            self.create_match(team_2, team_3, 11, stage='1'),
+            self.create_match(team_1, team_2, 12, stage='1'),
+        ]
+        self.service = FakePredictionService()
+
+    def event_ids(self, items):
+        return [item['match'].event_id for item in items]
+
+    def test_returns_nearest_matches_and_stores_them_once(self):
+        first = prediction_cache.get_upcoming_predictions(self.service, limit=2)
+        self.assertEqual(self.event_ids(first), [m.event_id for m in self.upcoming[:2]])
+        self.assertEqual(MatchPrediction.objects.filter(model_version='test-version').count(), 2)
+
+        second = prediction_cache.get_upcoming_predictions(self.service, limit=2)
+        self.assertEqual(self.event_ids(second), self.event_ids(first))
+        # Drugie wywołanie czyta zapisane wiersze
+        self.assertEqual(self.service.predicted, self.event_ids(first))
+
+    def test_invalidation_recomputes_only_affected_matches(self):
+        prediction_cache.get_upcoming_predictions(self.service, limit=3)
+        self.service.predicted.clear()
+
+        # Team 3 gra tylko w drugim zaplanowanym meczu
+        self.assertEqual(prediction_cache.invalidate_for_teams([self.teams[3].pk]), 1)
+        items = prediction_cache.get_upcoming_predictions(self.service, limit=3)
+        self.assertEqual(self.event_ids(items), [m.event_id for m in self.upcoming])
+        self.assertEqual(self.service.predicted, [self.upcoming[1].event_id])
+
+    def test_new_result_invalidates_team_predictions(self):
+        prediction_cache.get_upcoming_predictions(self.service, limit=3)
+
+        # Wynik Team 2 i Team 3 - aktualne zostaje tylko przewidywanie meczu Team 0 z Team 1
+        self.create_match(self.teams[2], self.teams[3], 5, 2, 2)
+        remaining = MatchPrediction.objects.values_list('match_id', flat=True)
+        self.assertEqual(list(remaining), [self.upcoming[0].event_id])
+
+
+class StandingsTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        team_0, team_1, team_2, team_3 = self.teams
+        self.matches = [
+            self.create_match(team_0, team_1, 1, 2, 0),
+            self.create_match(team_2, team_3, 1, 1, 1),
+            self.create_match(team_1, team_2, 2, 0, 3),
+            self.create_match(team_3, team_0, 2, 2, 1),
+            self.create_match(team_0, team_2, 3, 0, 0),
+        ]
+
+    def stored_table(self):
+        return [
+            (row.position, row.team_id, *(getattr(row, field) for field in standings_service.STAT_FIELDS))
+            for row in StandingRow.objects.filter(season=self.season).order_by('position')
+        ]
+
+    def computed_table(self, **kwargs):
+        return [
+            (row.position, row.team.pk, *(getattr(row, field) for field in standings_service.STAT_FIELDS))
+            for row in standings_service.compute_table(self.season, **kwargs)
+        ]
+
+    def test_incremental_table_matches_rebuild(self):
+        # Zmiana wyniku, nowy mecz i mecz, który przestał być zakończony
+        match = self.matches[0]
+        match.home_score, match.away_score = 0, 4
+        match.save()
+        self.create_match(self.teams[1], self.teams[3], 4, 2, 2)
+        match = self.matches[4]
+        match.event_stage = '4'
+        match.save()
+
+        incremental = self.stored_table()
+        standings_service.rebuild_season(self.season)
+        self.assertEqual(incremental, self.stored_table())
+        self.assertEqual(incremental, self.computed_table())
+
+    def test_deleted_match_is_removed_from_table_and_head_to_head(self):
+        self.matches[0].delete()
+
+        incremental = self.stored_table()
+        standings_service.rebuild_season(self.season)
+        self.assertEqual(incremental, self.stored_table())
+        # Team 0 i Team 1 nie mają już żadnego zakończonego spotkania
+        self.assertIsNone(head_to_head_service.get_head_to_head(self.teams[0].pk, self.teams[1].pk))
+
+    def test_deleting_season_cascades_cleanly(self):
+        other = Season.objects.create(league=self.league, season_id=2024, name='2024/2025', tournament_stage_id='old')
+        match = self.matches[0]
+        match.season = other
+        match.save()
+        other.delete()
+        # Kaskada usuwa mecze, a tabela pozostałego sezonu zgadza się z przeliczeniem od zera
+        incremental = self.stored_table()
+        standings_service.rebuild_season(self.season)
+        self.assertEqual(incremental, self.stored_table())
+
+    def test_get_table_never_writes(self):
+        StandingRow.objects.all().delete()
+        expected = self.computed_table()
+
+        rows = standings_service.get_table(self.season)
+        self.assertEqual([(row.position, row.team.pk, row.points) for row in rows], [row[:2] + row[-1:] for row in expected])
+        self.assertFalse(StandingRow.objects.exists())
+
+    def test_compute_table(self):
+        table = self.computed_table()
+        # Team 2: remis, wygrana, remis; Team 0: wygrana, porażka, remis
+        self.assertEqual(table[0][1:], ('team-2', 3, 1, 2, 0, 4, 1, 5))
+        self.assertEqual(table[1][1:], ('team-0', 3, 1, 1, 1, 3, 2, 4))
+        self.assertEqual([row[0] for row in table], [1, 2, 3, 4])
+
+    def test_compute_table_variants(self):
+        home = {row[1]: row for row in self.computed_table(venue='home')}
+        self.assertEqual(home['team-0'][2:], (2, 1, 1, 0, 2, 0, 4))
+
+        as_of = {row[1]: row for row in self.computed_table(as_of=KICKOFF + timedelta(days=1))}
+        self.assertEqual(as_of['team-0'][2:], (1, 1, 0, 0, 2, 0, 3))
+        self.assertEqual({row[2] for row in as_of.values()}, {1})
+
+        form = {row[1]: row for row in self.computed_table(last_matches=1)}
+        self.assertEqual(form['team-0'][2:], (1, 0, 1, 0, 0, 0, 1))
+
+        with self.assertRaises(ValueError):
+            standings_service.compute_table(self.season, venue='neutral')
+
+
+class MatchPaginationTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        team_0, team_1, team_2, team_3 = self.teams
+        # Kilka meczów o tej samej godzinie - kolejność rozstrzyga event_id
+        for day in range(4):
+            self.create_match(team_0, team_1, day, 1, 0, event_id=f'a{day}')
+            self.create_match(team_2, team_3, day, 0, 0, event_id=f'b{day}')
+        self.create_match(team_1, team_2, 9, stage='1', event_id='c9')
+
+    def walk(self, matches, limit):
+        """Wszystkie strony po kursorze: (event_id w kolejności, liczba stron)"""
+        event_ids, cursor, pages = [], None, 0
+        while True:
+            page, cursor = match_service.get_page(matches, cursor=cursor, limit=limit)
+            event_ids.extend(match.event_id for match in page)
+            pages += 1
+            if cursor is None:
+                return event_ids, pages
+
+    def test_pages_cover_ordered_list_once(self):
+        expected = list(
+            match_service.filter_matches().order_by(*match_service.ORDERING).values_list('event_id', flat=True)
+        )
+        for limit in (1, 2, 3, 4, 9):
+            with self.subTest(limit=limit):
+                event_ids, pages = self.walk(match_service.filter_matches(), limit)
+                self.assertEqual(event_ids, expected)
+                self.assertEqual(pages, -(-len(expected) // limit))
+
+    def test_filters_apply_to_every_page(self):
+        matches = match_service.filter_matches(team_id=self.teams[2].pk, stage='3')
+        event_ids, _ = self.walk(matches, 3)
+        self.assertEqual(event_ids, ['b3', 'b2', 'b1', 'b0'])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', match_service.encode_cursor(Match(start_time=KICKOFF, event_id=''))):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                match_service.decode_cursor(cursor)
+
+    def test_matches_api(self):
+        url = reverse('core:api_matches')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.force_login(get_user_model().objects.create_user('tester'))
+        first = self.client.get(url, {'limit': 5}).json()
+        self.assertEqual(first['count'], 5)
+        second = self.client.get(url, {'limit': 5, 'cursor': first['next_cursor']}).json()
+        self.assertEqual(second['count'], 4)
+        self.assertIsNone(second['next_cursor'])
+
+        for params in ({'cursor': 'not-a-cursor'}, {'limit': 'x'}, {'date_to': '2025-02-31'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+
+
+class HeadToHeadTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        team_0, team_1, team_2, _ = self.teams
+        self.meetings = [
+            self.create_match(team_0, team_1, 1, 2, 1),
+            self.create_match(team_1, team_0, 2, 3, 0),
+            self.create_match(team_0, team_1, 3, 1, 1),
+            self.create_match(team_1, team_0, 4, 0, 2),
+        ]
+        self.create_match(team_0, team_2, 5, 4, 0)
+        self.upcoming = self.create_match(team_0, team_1, 6, stage='1')
+
+    def record(self, team, other):
+        head_to_head = head_to_head_service.get_head_to_head(team.pk, other.pk)
+        return head_to_head_service.record_for(head_to_head, team.pk)
+
+    def test_record_from_each_side(self):
+        self.assertEqual(self.record(self.teams[0], self.teams[1]), {
+            'played': 4, 'wins': 2, 'draws': 1, 'losses': 1, 'goals_for': 5, 'goals_against': 5,
+        })
+        self.assertEqual(self.record(self.teams[1], self.teams[0]), {
+            'played': 4, 'wins': 1, 'draws': 1, 'losses': 2, 'goals_for': 5, 'goals_against': 5,
+        })
+
+        head_to_head = head_to_head_service.get_head_to_head(self.teams[1].pk, self.teams[0].pk)
+        self.assertEqual(head_to_head.recent_match_ids, [m.event_id for m in reversed(self.meetings)])
+
+    def test_teams_that_never_met(self):
+        self.assertIsNone(head_to_head_service.get_head_to_head(self.teams[1].pk, self.teams[3].pk))
+        self.assertEqual(self.record(self.teams[1], self.teams[3])['played'], 0)
+
+    def test_result_changes_match_rebuild(self):
+        match = self.meetings[0]
+        match.home_score, match.away_score = 0, 5
+        match.save()
+        match = self.meetings[2]
+        match.event_stage = '4'
+        match.save()
+
+        incremental = self.stored()
+        head_to_head_service.rebuild_all()
+        self.assertEqual(incremental, self.stored())
+        self.assertEqual(self.record(self.teams[0], self.teams[1])['wins'], 1)
+
+    def test_recent_meetings_are_limited(self):
+        for day in range(10, 10 + head_to_head_service.RECENT_MEETINGS + 3):
+            self.create_match(self.teams[2], self.teams[3], day, 1, 0)
+        head_to_head = head_to_head_service.get_head_to_head(self.teams[2].pk, self.teams[3].pk)
+        self.assertEqual(head_to_head.played, head_to_head_service.RECENT_MEETINGS + 3)
+        # Jedno spotkanie zapasowe (strona meczu pomija bieżący mecz)
+        self.assertEqual(len(head_to_head.recent_match_ids), head_to_head_service.RECENT_MEETINGS + 1)
+
+
+    def stored(self):
+        return {
+            (row.team_a_id, row.team_b_id): [getattr(row, field) for field in head_to_head_service.RECORD_FIELDS]
+            for row in HeadToHead.objects.all()
+        }
+
+    def test_missing_record_is_computed_without_writing(self):
+        HeadToHead.objects.all().delete()
+        self.assertEqual(self.record(self.teams[0], self.teams[1])['played'], 4)
+        self.assertFalse(HeadToHead.objects.exists())
+
+    def test_backfill_migration_matches_rebuild(self):
+        backfill = import_module('core.migrations.0013_backfill_head_to_head').backfill_head_to_head
+        head_to_head_service.rebuild_all()
+        expected = self.stored()
+
+        HeadToHead.objects.filter(team_b=self.teams[2]).delete()
+        backfill(django_apps, None)
+        self.assertEqual(self.stored(), expected)
+
+    def test_match_page_record_covers_recent_meetings(self):
+        # Starsze wygrane Team 1 - z ostatnich 10 spotkań widać tylko 6 z nich
+        for day in range(-10, -3):
+            self.create_match(self.teams[0], self.teams[1], day, 0, 1)
+        self.client.force_login(get_user_model().objects.create_user('tester'))
+
+        response = self.client.get(reverse('core:match_detail', args=[self.upcoming.event_id]))
+        self.assertEqual(len(response.context['h2h_matches']), head_to_head_service.RECENT_MEETINGS)
+        self.assertEqual(response.context['h2h_stats'], {'home_wins': 2, 'away_wins': 7, 'draws': 1})
+
+
+class ViewCacheTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(get_user_model().objects.create_user('tester'))
+        self.url = reverse('core:team_detail', args=[self.teams[0].pk])
+
+    def test_page_is_served_from_cache_until_data_version_changes(self):
+        self.assertNotContains(self.client.get(self.url), 'Cached Player')
+        # Zapis bez podbicia wersji - strona z cache
+        Player.objects.create(player_id='p-cached', first_name='Cached', last_name='Player', slug='cached-player')
+        TeamSquad.objects.create(team=self.teams[0], player_id='p-cached')
+        self.assertNotContains(self.client.get(self.url), 'Cached Player')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            view_cache.bump_data_version('teams')
+        self.assertContains(self.client.get(self.url), 'Cached Player')
+
+    def test_squad_change_shows_on_cached_team_page(self):
+        self.assertNotContains(self.client.get(self.url), 'New Signing')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saved, skipped = FetchPlayersCommand().save_players(
+                self.teams[0], [{'idPlayer': 'p-new', 'strPlayer': 'New Signing', 'strNumber': '7'}],
+                Player, TeamSquad,
+            )
+        self.assertEqual((saved, skipped), (1, 0))
+        self.assertContains(self.client.get(self.url), 'New Signing')
+
+    def test_missing_version_invalidates_cached_pages(self):
+        self.client.get(self.url)
+        Player.objects.create(player_id='p-evicted', first_name='Evicted', last_name='Version', slug='evicted')
+        TeamSquad.objects.create(team=self.teams[0], player_id='p-evicted')
+
+        # Wersja usunięta z cache (np. czyszczenie) - nowa wersja zamiast powrotu do starych stron
+        caches[view_cache.VERSIONS_CACHE].clear()
+        self.assertContains(self.client.get(self.url), 'Evicted Version')
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            view_cache.bump_data_version('players')
+
+
+class ModelStoreTests(FootballTestCase):
+    def setUp(self):
+        super().setUp()
+        model_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(model_dir.cleanup)
+        self.model_dir = Path(model_dir.name)
+        overrides = self.settings(PREDICTION_MODEL_DIR=self.model_dir, PREDICTION_MODEL_RELOAD_INTERVAL=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        # Współdzielony serwis procesu - każdy test zaczyna bez wczytanego modelu
+        patcher = mock.patch.multiple(model_store, _shared_service=None, _last_reload_check=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fitted_service(self, seed=0):
+        """Serwis z modelem dopasowanym do losowych danych (bez treningu z bazy)"""
+        rng = np.random.default_rng(seed)
+        X = rng.normal(size=(30, len(TEAM_FEATURE_NAMES) * 2 + 3))
+        service = MatchPredictionService()
+        service.model.set_params(n_estimators=5)
+        service.model.fit(service.scaler.fit_transform(X), np.arange(30) % 3)
+        service.is_trained = True
+        return service, X
+
+    def test_missing_model_is_never_trained_in_process(self):
+        with mock.patch.object(MatchPredictionService, 'train_model', side_effect=AssertionError('trained')):
+            service = model_store.get_prediction_service()
+            self.assertFalse(service.is_trained)
+            self.assertEqual(service.predict_match(*self.teams[:2])['error'], NOT_TRAINED_MESSAGE)
+
+            response = self.client.get(reverse('core:match_predictions'))
+        self.assertContains(response, 'train_prediction_model')
+        self.assertEqual(list(self.model_dir.iterdir()), [])
+
+    def test_save_and_load_round_trip(self):
+        service, X = self.fitted_service()
+        version = model_store.save_service(service, fingerprint='a' * 16)
+
+        loaded = model_store.load_service()
+        self.assertEqual((loaded.version, loaded.fingerprint), (version, 'a' * 16))
+        self.assertEqual(model_store.latest_fingerprint(), 'a' * 16)
+        np.testing.assert_array_equal(
+            loaded.model.predict_proba(loaded.scaler.transform(X)),
+            service.model.predict_proba(service.scaler.transform(X)),
+        )
+
+    def test_shared_service_switches_to_newer_version(self):
+        model_store.save_service(self.fitted_service(0)[0], fingerprint='a' * 16)
+        first = model_store.get_prediction_service()
+        self.assertIs(model_store.get_prediction_service(), first)
+
+        newer = model_store.save_service(self.fitted_service(1)[0], fingerprint='b' * 16)
+        self.assertEqual(model_store.get_prediction_service().version, newer)
+
+    def test_prune_keeps_current_version(self):
+        for fingerprint in ('a', 'b', 'c'):
+            model_store.save_service(self.fitted_service()[0], fingerprint=fingerprint * 16)
+        current = model_store.latest_version()
+
+        self.assertEqual(len(model_store.prune_artifacts(keep=1)), 2)
+        self.assertEqual(model_store.load_service().version, current)
+
+
+
+class IncrementalIngestionTests(ServiceTestCase):
+    ARGS = ('testland', 'test-template', '2025-2026')
+
+    def setUp(self):
+        super().setUp()
+        # 25 zakończonych meczów: strona 1 - 20 najnowszych, strona 2 - 5 najstarszych
+        self.results = [
+            self.api_match(f'e{day:02d}', self.teams[day % 2], self.teams[2 + day % 2], day, 1, 0)
+            for day in range(25)
+        ]
+        self.fail_pages = set()
+        self.service = self.make_service()
+        self.service.fetch_matches = mock.Mock(side_effect=self.page)
+        self.service.fetch_match_stats = mock.Mock(return_value=self.api_stats())
+
+    def page(self, country_id, league_template_id, season, page):
+        if page in self.fail_pages:
+            raise ConnectionError('network down')
+        newest_first = sorted(self.results, key=lambda m: -int(m['startUtime']))
+        return newest_first[(page - 1) * 20:page * 20]
+
+    def run_incremental(self):
+        self.service.fetch_matches.reset_mock()
+        self.service.fetch_match_stats.reset_mock()
+        saved = self.service.fetch_and_save_season_incremental(*self.ARGS)
+        return saved, [call.args[3] for call in self.service.fetch_matches.call_args_list]
+
+    def state(self):
+        return IngestionState.objects.get(country_id='testland', league_template_id='test-template', season='2025-2026')
+
+    def test_first_run_walks_season_and_records_watermarks(self):
+        saved, pages = self.run_incremental()
+        self.assertEqual((len(saved), pages), (25, [1, 2]))
+        self.assertEqual(self.service.fetch_match_stats.call_count, 25)
+
+        state = self.state()
+        self.assertEqual(state.last_page, 2)
+        self.assertEqual(len(state.stats_event_ids), 25)
+        self.assertEqual(state.last_start_utime, int(self.results[-1]['startUtime']))
+
+    def test_unchanged_season_stops_on_first_page(self):
+        self.run_incremental()
+        saved, pages = self.run_incremental()
+        self.assertEqual((saved, pages), ([], [1]))
+        self.service.fetch_match_stats.assert_not_called()
+
+    def test_only_new_matches_are_written(self):
+        self.run_incremental()
+        self.results.append(self.api_match('e25', self.teams[0], self.teams[1], 25, 3, 3))
+        saved, pages = self.run_incremental()
+        self.assertEqual([match.event_id for match in saved], ['e25'])
+        # Strona 1 miała nowy mecz, więc sprawdzana jest też następna
+        self.assertEqual(pages, [1, 2])
+        self.assertEqual(self.service.fetch_match_stats.call_count, 1)
+
+    def test_interrupted_first_run_is_completed(self):
+        self.fail_pages = {2}
+        self.run_incremental()
+        self.assertEqual(self.state().last_page, 0)
+
+        # Strona 1 nie ma nic nowego, ale sezon nie był jeszcze przejrzany do końca
+        self.fail_pages = set()
+        saved, pages = self.run_incremental()
+        self.assertEqual(pages, [1, 2])
+        self.assertEqual(len(saved), 5)
+        self.assertEqual(self.state().last_page, 2)
+
+
+class SnapshotTests(FootballTestCase):
+    """Eksport i import bazy (export_football_data / import_football_data)"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('core.services.snapshot_service.print', create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = str(Path(tmp_dir.name) / 'snapshot.ndjson.gz')
+
+    def run_command(self, name, *args, **options):
+        call_command(name, *args, stdout=io.StringIO(), **options)
+
+    def contents(self):
+        """Zawartość bazy bez kluczy autonumerowanych (sezony dostają nowe id)"""
+        return {
+            'season': sorted(Season.objects.values_list('league__tournament_id', 'season_id', 'name')),
+            'team': sorted(Team.objects.values_list('participant_id', 'name', 'slug')),
+            'player': sorted(Player.objects.values_list('player_id', 'last_name', 'country_id')),
+            'match': sorted(Match.objects.values_list(
+                'event_id', 'season__season_id', 'home_team_id', 'away_team_id',
+                'home_score', 'away_score', 'start_time', 'event_stage',
+            )),
+            'match_statistic': sorted(MatchStatistic.objects.values_list(
+                'match_id', 'period', 'stat_name', 'home_value', 'home_value_numeric', 'away_value_numeric',
+            )),
+            'team_squad': sorted(TeamSquad.objects.values_list('team_id', 'player_id', 'tournament_id', 'jersey_number')),
+        }
+
+    def test_round_trip_restores_database(self):
+        team_0, team_1, team_2, _ = self.teams
+        matches = [
+            self.create_match(team_0, team_1, 1, 2, 1),
+            self.create_match(team_1, team_2, 2, 0, 0),
+            self.create_match(team_2, team_0, 9, stage='1'),
+        ]
+        for match in matches[:2]:
+            MatchStatistic.objects.create(
+                match=match, period='match', stat_id='12', stat_name='Ball Possession',
+                home_value='55%', away_value='45%',
+            )
+        country = Country.objects.create(country_id=77, name='Testland')
+        Player.objects.create(player_id='anna', slug='anna', last_name='Anna', position='Forwards', country=country)
+        TeamSquad.objects.create(team=team_0, player_id='anna', tournament_id='league', jersey_number='9')
+        expected = self.contents()
+        self.run_command('export_football_data', output=self.path)
+
+        League.objects.all().delete()
+        Team.objects.all().delete()
+        Player.objects.all().delete()
+        self.assertFalse(Match.objects.exists())
+
+        # Małe paczki - import musi łączyć klucze naturalne między paczkami
+        self.run_command('import_football_data', self.path, batch_size=2)
+        self.assertEqual(self.contents(), expected)
+        self.assertEqual(TeamMatch.objects.count(), 6)
+        self.assertEqual(head_to_head_service.get_head_to_head(team_0.pk, team_1.pk).played, 1)
+
+    def test_import_overwrites_existing_rows(self):
+        match = self.create_match(self.teams[0], self.teams[1], 1, 2, 1)
+        self.run_command('export_football_data', output=self.path, models=['match'])
+
+        Match.objects.filter(pk=match.pk).update(home_score=0, away_score=3)
+        self.run_command('import_football_data', self.path)
+        self.assertEqual(Match.objects.values_list('home_score', 'away_score').get(), (2, 1))
+        self.assertEqual(StandingRow.objects.get(team=self.teams[0]).points, 3)
+
+    def test_import_refreshes_team_summaries_and_predictions(self):
+        team_0, team_1 = self.teams[:2]
+        finished = self.create_match(team_0, team_1, 1, 2, 0)
+        upcoming = self.create_match(team_0, team_1, 10, stage='1')
+        self.run_command('export_football_data', output=self.path)
+
+        finished.delete()
+        self.assertEqual(team_service.get_team_summary(team_0.pk)['total_matches'], 0)
+        MatchPrediction.objects.create(
+            match=upcoming, model_version='test-version', prediction='2',
+            home_win_probability=0.2, draw_probability=0.3, away_win_probability=0.5, confidence=0.5,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.run_command('import_football_data', self.path)
+
+        # Podsumowanie z cache (liczone przed importem) nie może przetrwać importu
+        summary = team_service.get_team_summary(team_0.pk)
+        self.assertEqual((summary['total_matches'], summary['wins']), (1, 1))
+        self.assertFalse(MatchPrediction.objects.exists())
+
+
+class SaveMatchesTests(ServiceTestCase):
+    """Zbiorczy zapis strony wyników (save_matches)"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = self.make_service()
+
+    def page(self, count, offset=0, **kwargs):
+        team_0, team_1, team_2, team_3 = self.teams
+        pairs = [(team_0, team_1), (team_2, team_3), (team_1, team_2), (team_3, team_0)]
+        return [
+            self.api_match(f'p{day}', *pairs[day % len(pairs)], day, 1, 0, **kwargs)
+            for day in range(offset, offset + count)
+        ]
+
+    def test_missing_league_season_and_teams_are_created(self):
+        data = self.api_match('new-1', Team(participant_id='new-home', name='New Home', slug='new-home'),
+                              self.teams[0], 1, 2, 2)
+        data.update(tournamentId='other-league', tournamentTemplateId='other-template',
+                    tournamentName='Otherland: Other League', tournamentStageId='other-stage')
+
+        match, = self.service.save_matches([data])
+        match = Match.objects.select_related('season__league', 'home_team').get(pk=match.pk)
+        self.assertEqual(match.season.league.tournament_template_id, 'other-template')
+        self.assertEqual(match.season.tournament_stage_id, 'other-stage')
+        self.assertEqual(match.home_team.name, 'New Home')
+        self.assertEqual(TeamMatch.objects.filter(match=match).count(), 2)
+
+    def test_second_save_updates_matches_in_place(self):
+        self.service.save_matches(self.page(4, stage='SCHEDULED'))
+        self.assertFalse(StandingRow.objects.exists())
+
+        # Ten sam mecz dwa razy na stronie - liczy się ostatnie wystąpienie
+        page = self.page(4) + [self.api_match('p0', self.teams[0], self.teams[1], 0, 0, 3)]
+        self.assertEqual(len(self.service.save_matches(page)), 4)
+
+        self.assertEqual(Match.objects.count(), 4)
+        self.assertEqual(TeamMatch.objects.count(), 8)
+        self.assertEqual((Match.objects.get(pk='p0').away_score, Match.objects.get(pk='p0').event_stage), (3, '3'))
+        # Nowe wyniki trafiają do tabeli i H2H jak przy zapisie pojedynczym
+        stored = list(StandingRow.objects.order_by('position').values_list('team_id', 'points'))
+        standings_service.rebuild_season(self.season)
+        self.assertEqual(stored, list(StandingRow.objects.order_by('position').values_list('team_id', 'points')))
+        self.assertEqual(HeadToHead.objects.count(), 4)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        def queries(page):
+            with CaptureQueriesContext(connection) as context:
+                self.service.save_matches(page)
+            return len(context.captured_queries)
+
+        self.assertEqual(queries(self.page(2)), queries(self.page(20, offset=2)))
+
+
+class HttpCacheTests(ServiceTestCase):
+    """Dyskowa pamięć podręczna odpowiedzi API z odświeżaniem warunkowym"""
+
+    def setUp(self):
+        super().setUp()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        settings_override = override_settings(HTTP_CACHE_PATH=Path(tmp_dir.name) / 'http_cache.sqlite3')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.service = self.make_service(use_cache=True)
+        self.service.http = mock.Mock()
+        self.results = [self.api_match('e1', self.teams[0], self.teams[1], 1, 1, 0)]
+
+    def response(self, status=200, data=None, etag=None):
+        response = mock.Mock(status_code=status, headers={'ETag': etag} if etag else {})
+        response.json.return_value = data
+        return response
+
+    def later(self, seconds):
+        """Zegar pamięci podręcznej przesunięty o `seconds` do przodu"""
+        clock = mock.patch('core.services.http_cache.time')
+        clock.start().time.return_value = time.time() + seconds
+        self.addCleanup(clock.stop)
+
+    def test_fresh_response_is_served_without_request(self):
+        self.service.http.get.return_value = self.response(data={'results': self.results}, etag='"v1"')
+        self.assertEqual(self.service.fetch_matches('testland', 'test-template', '2025-2026'), self.results)
+        self.assertEqual(self.service.fetch_matches('testland', 'test-template', '2025-2026'), self.results)
+        self.assertEqual(self.service.http.get.call_count, 1)
+
+    def test_expired_response_is_revalidated_with_etag(self):
+        self.service.http.get.return_value = self.response(data={'results': self.results}, etag='"v1"')
+        self.service.fetch_matches('testland', 'test-template', '2025-2026')
+
+        self.later(self.service.RESULTS_CACHE_TTL + 1)
+        self.service.http.get.return_value = self.response(status=304)
+        self.assertEqual(self.service.fetch_matches('testland', 'test-template', '2025-2026'), self.results)
+        self.assertEqual(self.service.http.get.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+
+        # 304 odnawia TTL - kolejne wywołanie bez zapytania
+        self.service.fetch_matches('testland', 'test-template', '2025-2026')
+        self.assertEqual(self.service.http.get.call_count, 2)
+
+    def test_only_empty_statistics_expire(self):
+        stats = self.api_stats()
+        self.service.http.get.side_effect = [self.response(data=[]), self.response(data=stats)]
+        self.assertEqual(self.service.fetch_match_stats('e1'), [])
+
+        self.later(self.service.EMPTY_STATS_CACHE_TTL + 1)
+        self.assertEqual(self.service.fetch_match_stats('e1'), stats)
+        self.later(365 * 24 * 60 * 60)
+        self.assertEqual(self.service.fetch_match_stats('e1'), stats)
+        self.assertEqual(self.service.http.get.call_count, 2)
+
+    def test_offline_mode_reads_only_the_cache(self):
+        self.service.http.get.return_value = self.response(data={'results': self.results})
+        self.service.fetch_matches('testland', 'test-template', '2025-2026')
+
+        with mock.patch.dict(os.environ, {'SPORTDB_API_KEY': ''}):
+            offline = FootballDataService(offline=True)
+        offline.http = mock.Mock()
+        self.later(self.service.RESULTS_CACHE_TTL + 1)
+        self.assertEqual(offline.fetch_matches('testland', 'test-template', '2025-2026'), self.results)
+        with self.assertRaises(CacheMiss):
+            offline.fetch_matches('testland', 'test-template', '2025-2026', page=2)
+        offline.http.get.assert_not_called()
+
+
+class SquadWriteTests(ServiceTestCase):
+    """Zbiorczy zapis kadr (save_squads)"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = self.make_service()
+
+    def api_squad(self, tournament_id, players):
+        """Skład drużyny w turnieju w formacie API: players = [(id, numer)]"""
+        return {
+            'tournamentId': tournament_id, 'tournamentType': 'league',
+            'players': [
+                {'id': player_id, 'slug': player_id, 'firstName': 'Jan', 'lastName': player_id.title(),
+                 'position': 'Forwards', 'countryId': '77', 'countryName': 'Testland', 'jerseyNumber': number}
+                for player_id, number in players
+            ],
+        }
+
+    def memberships(self):
+        return set(TeamSquad.objects.values_list('team_id', 'player_id', 'tournament_id', 'jersey_number'))
+
+    def test_departed_players_are_pruned_per_tournament(self):
+        team_0, team_1 = self.teams[:2]
+        self.service.save_squads({
+            team_0: [self.api_squad('league', [('anna', '9'), ('bolek', '10')]),
+                     self.api_squad('cup', [('anna', '9')])],
+            team_1: [self.api_squad('league', [('cezary', '1')])],
+        })
+        self.assertEqual(Country.objects.get().name, 'Testland')
+
+        # Bolek odchodzi z ligi, Anna zmienia numer; puchar i Team 1 nie są w tych danych
+        self.assertEqual(self.service.save_team_squad(team_0, [self.api_squad('league', [('anna', '7')])]), 1)
+        self.assertEqual(self.memberships(), {
+            (team_0.pk, 'anna', 'league', '7'),
+            (team_0.pk, 'anna', 'cup', '9'),
+            (team_1.pk, 'cezary', 'league', '1'),
+        })
+        # Zawodnik zostaje w bazie - usuwane jest tylko członkostwo w składzie
+        self.assertTrue(Player.objects.filter(pk='bolek').exists())
+
+    def test_query_count_does_not_grow_with_squad_size(self):
+        def queries(team, players):
+            with CaptureQueriesContext(connection) as context:
+                self.service.save_team_squad(team, [self.api_squad('league', players)])
+            return len(context.captured_queries)
+
+        small = [('p1', '1')]
+        large = [(f'p{number}', str(number)) for number in range(2, 40)]
+        self.assertEqual(queries(self.teams[0], small), queries(self.teams[1], large))
+
+
+class MatchStatisticsWriteTests(ServiceTestCase):
+    """Zbiorczy zapis statystyk (save_matches_statistics)"""
+
+    def setUp(self):
+        super().setUp()
+        self.service = self.make_service()
+        self.matches = [
+            self.create_match(self.teams[0], self.teams[1], 1, 1, 0),
+            self.create_match(self.teams[1], self.teams[0], 2, 0, 0),
+        ]
+
+    def test_second_save_updates_rows_in_place(self):
+        first = {match.event_id: self.api_stats() for match in self.matches}
+        self.assertEqual(self.service.save_matches_statistics(first), 6)
+        self.service.save_match_statistics(self.matches[0].event_id, self.api_stats(possession=(60, 40)))
+
+        self.assertEqual(MatchStatistic.objects.count(), 6)
+        possession = MatchStatistic.objects.get(
+            match=self.matches[0], period='match', stat_name='Ball Possession',
+        )
+        self.assertEqual((possession.home_value, possession.home_value_numeric), ('60%', 60.0))
+        self.assertEqual(set(StatDefinition.objects.values_list('stat_id', flat=True)), {'12', '34'})
+        # Średnie drużyny liczone po zapisie: 60% i 45%
+        averages = team_service.get_stat_averages(self.teams[0].pk, ['Ball Possession'], window=0)
+        self.assertEqual(averages['Ball Possession'], (52.5, 2))
+
+    def test_definitions_are_created_after_rolled_back_save(self):
+        with transaction.atomic():
+            self.service.save_match_statistics(self.matches[0].event_id, self.api_stats())
+            transaction.set_rollback(True)
+        self.assertFalse(StatDefinition.objects.exists())
+
+        self.service.save_match_statistics(self.matches[0].event_id, self.api_stats())
+        self.assertEqual(StatDefinition.objects.count(), 2)
+
+    def test_unknown_match_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.service.save_match_statistics('missing', self.api_stats())
+        self.assertFalse(MatchStatistic.objects.exists())
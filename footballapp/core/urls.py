@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (HomePageView, MatchlistView, TeamListView, TeamDetailView,
                     MatchDetailView, LeagueTableView, SeasonsByLeagueView,
                     LeagueTablePartialView, MatchPredictionView,
-                    PredictSpecificMatchView, PredictCustomMatchView,news_list)
+                    PredictSpecificMatchView, PredictCustomMatchView,
+                    PredictionsApiView, MatchesApiView, news_list)
 
 app_name = 'core'
 
@@ -12,6 +13,7 @@ urlpatterns = [
 
     # Mecze
     path('matches/', MatchlistView.as_view(), name='matchlist'),
+    path('api/matches/', MatchesApiView.as_view(), name='api_matches'),
     
 
     # Drużyny
@@ -26,5 +28,6 @@ urlpatterns = [
     path('predictions/', MatchPredictionView.as_view(), name='match_predictions'),
     path('predictions/match/<str:match_id>/', PredictSpecificMatchView.as_view(), name='predict_match'),
     path('predictions/custom/', PredictCustomMatchView.as_view(), name='predict_custom'),
+    path('api/predictions/', PredictionsApiView.as_view(), name='api_predictions'),
     path('news/', news_list, name='news_list'),
 ]
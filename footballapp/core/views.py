@@ -1,12 +1,18 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
+from django.utils.decorators import method_decorator
 from django.db.models import Q
 from .models import NewsArticle
 from .models import Team, Match, Player, MatchStatistic, Season, League
-from collections import OrderedDict
 from django.http import Http404, JsonResponse
 from django.template.loader import render_to_string
-from  .services.prediction_service import MatchPredictionService
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from datetime import datetime, time
+from .services.model_store import get_prediction_service
+from .services.prediction_service import NOT_TRAINED_MESSAGE
+from .services import head_to_head_service, league_service, match_service, prediction_cache, standings_service, team_service
+from .services.view_cache import cached_view
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -29,6 +35,7 @@ class HomePageView(View):
         return render(request, 'core/home.html')
 
 
+@method_decorator(cached_view('matches', 'teams'), name='get')
 class MatchlistView(LoginRequiredMixin,View):
     def get(self, request):
         # Filtry GET: league_id (tournament_template_id / tournament_id / pk) i season_id (integer)
@@ -36,100 +43,61 @@ class MatchlistView(LoginRequiredMixin,View):
         season_id = request.GET.get('season_id')
         team_id = request.GET.get('team_id')
 
-        league = None
-        if league_id:
-            league = League.objects.filter(tournament_id=league_id).first()
-            if not league:
-                league = League.objects.filter(tournament_template_id=league_id).first()
-            if not league:
-                try:
-                    league = League.objects.get(pk=int(league_id))
-                except (ValueError, League.DoesNotExist):
-                    league = None
-
-        # lista lig (deduplikacja podobna jak w LeagueTableView)
-        leagues_qs = League.objects.all().order_by('name')
-        import re
-        leagues_map = {}
-        for l in leagues_qs:
-            if l.tournament_template_id:
-                key = f"tpl:{l.tournament_template_id}"
-            elif l.tournament_id:
-                key = f"tid:{l.tournament_id}"
-            else:
-                raw_name = (l.name or '').strip().lower()
-                raw_name = re.sub(r"\([^)]*\)", "", raw_name)
-                raw_name = re.sub(r"\b\d{4}(/\d{2,4}|-\d{2,4})?\b", "", raw_name)
-                norm_name = ' '.join(raw_name.split()).strip()
-                country = (l.country or '').strip().lower()
-                key = f"name:{norm_name}|{country}"
-            existing = leagues_map.get(key)
-            if existing is None:
-                leagues_map[key] = l
-            else:
-                if (not getattr(existing, 'logo', None)) and getattr(l, 'logo', None):
-                    leagues_map[key] = l
-        leagues = sorted(leagues_map.values(), key=lambda x: (x.name or '').lower())
+        league = league_service.resolve_league(league_id)
+
+        # lista lig (zdeduplikowana, z cache)
+        leagues = league_service.get_unique_leagues()
 
         # seasons aggregated for selected league (or all if not selected)
         seasons = _get_seasons_for_league(league)
 
-        # Build matches queryset and apply filters
-        matches_qs = Match.objects.all().select_related('home_team', 'away_team', 'season').order_by('-start_time')
-        if league:
-            # include matches for any League record sharing the same template_id/tournament_id
-            if getattr(league, 'tournament_template_id', None):
-                matches_qs = matches_qs.filter(season__league__tournament_template_id=league.tournament_template_id)
-            elif getattr(league, 'tournament_id', None):
-                matches_qs = matches_qs.filter(season__league__tournament_id=league.tournament_id)
-            else:
-                matches_qs = matches_qs.filter(season__league=league)
-
-        selected_season = None
-        if season_id:
-            try:
-                sid = int(season_id)
-            except (ValueError, TypeError):
-                sid = None
-            if sid is not None:
-                # filter by season_id across aggregated leagues
-                if league and getattr(league, 'tournament_template_id', None):
-                    matches_qs = matches_qs.filter(season__season_id=sid, season__league__tournament_template_id=league.tournament_template_id)
-                elif league and getattr(league, 'tournament_id', None):
-                    matches_qs = matches_qs.filter(season__season_id=sid, season__league__tournament_id=league.tournament_id)
-                elif league:
-                    matches_qs = matches_qs.filter(season__season_id=sid, season__league=league)
-                else:
-                    matches_qs = matches_qs.filter(season__season_id=sid)
-                # set selected_season object if exists in seasons list
-                for s in seasons:
-                    if s.season_id == sid:
-                        selected_season = s
-                        break
+        try:
+            sid = int(season_id) if season_id else None
+        except (ValueError, TypeError):
+            sid = None
+        # set selected_season object if exists in seasons list
+        selected_season = next((s for s in seasons if s.season_id == sid), None) if sid is not None else None
 
         # selected team
         selected_team = None
         if team_id:
             # Team primary key is participant_id
-            selected_team = Team.objects.filter(participant_id=team_id).first() or Team.objects.filter(pk=team_id).first()
-            if selected_team:
-                matches_qs = matches_qs.filter(Q(home_team=selected_team) | Q(away_team=selected_team))
+            selected_team = Team.objects.filter(participant_id=team_id).first()
+
+        matches_qs = match_service.filter_matches(
+            league=league,
+            season_id=sid,
+            team_id=selected_team.participant_id if selected_team else None,
+        )
+        # Jedna strona meczów (kursor = ostatni mecz poprzedniej strony)
+        try:
+            matches, next_cursor = match_service.get_page(matches_qs, cursor=request.GET.get('cursor'))
+        except ValueError:
+            raise Http404("Invalid page cursor")
 
         # prepare selected_lid for template
-        selected_lid = None
-        if league:
-            selected_lid = league.tournament_template_id or league.tournament_id or str(league.pk)
+        selected_lid = league_service.selected_league_id(league)
 
         # teams list for filter: restrict to seasons if available
         if seasons:
-            season_pks = [s.pk for s in seasons]
-            teams_qs = Team.objects.filter(Q(home_matches__season__pk__in=season_pks) | Q(away_matches__season__pk__in=season_pks)).distinct().order_by('name')
+            teams_qs = match_service.teams_for_seasons([s.pk for s in seasons])
         else:
             teams_qs = Team.objects.all().order_by('name')
 
-        matches = matches_qs
+        # Linki stron zachowują filtry; kursor działa tylko "do przodu", więc wstecz jest tylko pierwsza strona
+        params = request.GET.copy()
+        params.pop('cursor', None)
+        first_query = params.urlencode()
+        next_query = None
+        if next_cursor:
+            params['cursor'] = next_cursor
+            next_query = params.urlencode()
+
         return render(request, 'core/matchlist.html', {
             'matches': matches,
+            'next_query': next_query,
+            'first_query': first_query,
+            'is_first_page': not request.GET.get('cursor'),
             'leagues': leagues,
             'seasons': seasons,
             'teams': teams_qs,
@@ -139,39 +107,70 @@ class MatchlistView(LoginRequiredMixin,View):
         })
 
 
+@method_decorator(cached_view('matches', 'teams'), name='get')
+class MatchesApiView(LoginRequiredMixin, View):
+    """
+    JSON API listy meczów stronicowanej kursorem.
+    Filtry GET: league_id, season_id (jak na liście meczów), team_id, stage,
+    date_from / date_to (RRRR-MM-DD), limit; cursor - wartość next_cursor
+    z poprzedniej odpowiedzi.
+    """
+
+    def get(self, request):
+        league = None
+        if request.GET.get('league_id'):
+            league = league_service.resolve_league(request.GET['league_id'])
+            if not league:
+                return JsonResponse({'error': 'League not found'}, status=404)
+
+        try:
+            season_id = int(request.GET['season_id']) if request.GET.get('season_id') else None
+            limit = int(request.GET.get('limit', match_service.PAGE_SIZE))
+            # parse_date: None dla złego formatu, ValueError dla nieistniejącej daty
+            date_from = parse_date(request.GET.get('date_from', '') or '')
+            date_to = parse_date(request.GET.get('date_to', '') or '')
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'Invalid season_id, limit or date'}, status=400)
+
+        matches = match_service.filter_matches(
+            league=league,
+            season_id=season_id,
+            team_id=request.GET.get('team_id'),
+            stage=request.GET.get('stage'),
+            date_from=date_from,
+            date_to=date_to,
+        )
+        try:
+            page, next_cursor = match_service.get_page(matches, cursor=request.GET.get('cursor'), limit=limit)
+        except ValueError:
+            return JsonResponse({'error': 'Invalid cursor'}, status=400)
+
+        return JsonResponse({
+            'count': len(page),
+            'next_cursor': next_cursor,
+            'matches': [match_service.match_as_dict(match) for match in page],
+        })
+
+
 class TeamListView(LoginRequiredMixin, View):
     def get(self, request):
         teams = Team.objects.all().order_by('name')
         return render(request, 'core/team_list.html', {'teams': teams})
 
 
+@method_decorator(cached_view('matches', 'stats', 'teams'), name='get')
 class TeamDetailView(LoginRequiredMixin, View):
     def get(self, request, team_id):
         team = get_object_or_404(Team, participant_id=team_id)
 
-        # Wszystkie mecze drużyny
-        matches = Match.objects.filter(
-            Q(home_team=team) | Q(away_team=team)
-        ).select_related('home_team', 'away_team').order_by('-start_time')
+        # Wszystkie mecze drużyny (indeks TeamMatch)
+        matches = team_service.team_matches(team.participant_id).select_related('home_team', 'away_team')
 
         # Ostatnie 5 meczów
         recent_matches = matches[:5]
 
-        # Statystyki
-        finished_matches = matches.filter(event_stage='3')
-        total_matches = finished_matches.count()
-
-        wins = sum(1 for m in finished_matches if
-                   (m.home_team == team and (m.home_score or 0) > (m.away_score or 0)) or
-                   (m.away_team == team and (m.away_score or 0) > (m.home_score or 0)))
-
-        draws = sum(1 for m in finished_matches if (m.home_score or 0) == (m.away_score or 0))
-        losses = total_matches - wins - draws
-
-        goals_scored = sum(
-            (m.home_score or 0) if m.home_team == team else (m.away_score or 0) for m in finished_matches)
-        goals_conceded = sum(
-            (m.away_score or 0) if m.home_team == team else (m.home_score or 0) for m in finished_matches)
+        # Statystyki (jedno zapytanie agregujące, z cache do następnego wyniku drużyny)
+        summary = team_service.get_team_summary(team.participant_id)
 
         # Zawodnicy drużyny
         players = (
@@ -194,31 +193,10 @@ class TeamDetailView(LoginRequiredMixin, View):
             'Red Cards',
         ]
 
-        # pobierz ostatnie mecze (np. 10) i prefetch statistics, home/away
-        matches_qs = (
-            Match.objects
-            .filter(Q(home_team=team) | Q(away_team=team))
-            .order_by('-start_time')
-            .prefetch_related('statistics', 'home_team', 'away_team')
-        )
-        recent_ten_matches = list(matches_qs[:10])  # konwertujemy do listy, żeby móc użyć |length w szablonie
-
-        # zliczanie i obliczenie średnich
-        totals = OrderedDict((name, {'sum': 0.0, 'count': 0}) for name in IMPORTANT_STATS)
-
-        for match in recent_matches:
-            is_home = (match.home_team_id == team.participant_id)
-            for stat in match.statistics.all():
-                if stat.stat_name in totals:
-                    val = stat.home_value_numeric if is_home else stat.away_value_numeric
-                    if val is not None:
-                        totals[stat.stat_name]['sum'] += val
-                        totals[stat.stat_name]['count'] += 1
-
-        avg_stats = []
-        for name, data in totals.items():
-            avg = (data['sum'] / data['count']) if data['count'] else None
-            avg_stats.append((name, avg))
+        # Średnie z ostatnich 10 meczów - gotowe sumy z TeamStatAggregate (jedno zapytanie)
+        averages = team_service.get_stat_averages(team.participant_id, IMPORTANT_STATS, window=10)
+        avg_stats = [(name, averages[name][0]) for name in IMPORTANT_STATS]
+        avg_matches = max((count for _, count in averages.values()), default=0)
 
         context = {
             'team': team,
@@ -226,107 +204,60 @@ class TeamDetailView(LoginRequiredMixin, View):
             'all_matches': matches,
             'players': players,
             'avg_stats': avg_stats,
-            'recent_ten_matches': recent_ten_matches,
-            'stats': {
-                'total_matches': total_matches,
-                'wins': wins,
-                'draws': draws,
-                'losses': losses,
-                'goals_scored': goals_scored,
-                'goals_conceded': goals_conceded,
-            }
+            'avg_matches': avg_matches,
+            'stats': summary,
         }
         return render(request, 'core/team_detail.html', context)
 
 
+@method_decorator(cached_view('matches', 'stats'), name='get')
 class MatchDetailView(LoginRequiredMixin, View):
     def get(self, request, match_id):
-        match = get_object_or_404(Match, event_id=match_id)
-
-        # Head to Head - zakończone mecze
-        h2h_matches = Match.objects.filter(
-            Q(home_team=match.home_team, away_team=match.away_team) |
-            Q(home_team=match.away_team, away_team=match.home_team),
-            event_stage='3'
-        ).exclude(event_id=match_id).order_by('-start_time')[:10]
+        match = get_object_or_404(Match.objects.select_related('home_team', 'away_team'), event_id=match_id)
 
-        # Statystyki H2H
-        home_wins = sum(1 for m in h2h_matches if
-                        (m.home_team == match.home_team and (m.home_score or 0) > (m.away_score or 0)) or
-                        (m.away_team == match.home_team and (m.away_score or 0) > (m.home_score or 0)))
+        # Head to Head - bilans pary z HeadToHead (jedno zapytanie) i ostatnie spotkania
+        h2h = head_to_head_service.get_head_to_head(match.home_team_id, match.away_team_id)
+        h2h_ids = [event_id for event_id in (h2h.recent_match_ids if h2h else []) if event_id != match.event_id]
+        h2h_ids = h2h_ids[:head_to_head_service.RECENT_MEETINGS]
+        h2h_matches = []
+        if h2h_ids:
+            h2h_matches = sorted(
+                Match.objects.filter(event_id__in=h2h_ids).select_related('home_team', 'away_team'),
+                key=lambda m: h2h_ids.index(m.event_id),
+            )
 
-        away_wins = sum(1 for m in h2h_matches if
-                        (m.home_team == match.away_team and (m.home_score or 0) > (m.away_score or 0)) or
-                        (m.away_team == match.away_team and (m.away_score or 0) > (m.home_score or 0)))
+        # Statystyki H2H z perspektywy gospodarzy - z pokazanych ostatnich spotkań (bez bieżącego meczu)
+        record = head_to_head_service.recent_record(h2h_matches, match.home_team_id)
 
-        h2h_draws = sum(1 for m in h2h_matches if (m.home_score or 0) == (m.away_score or 0))
-
-        # Statystyki meczu
-        match_stats = MatchStatistic.objects.filter(match=match).order_by('period', 'stat_id')
+        # Statystyki meczu (jedno zapytanie, pogrupowane po okresie)
+        match_stats = match_service.statistics_by_period(match)
 
         context = {
             'match': match,
             'match_stats': match_stats,
             'h2h_matches': h2h_matches,
             'h2h_stats': {
-                'home_wins': home_wins,
-                'away_wins': away_wins,
-                'draws': h2h_draws,
+                'home_wins': record['wins'],
+                'away_wins': record['losses'],
+                'draws': record['draws'],
             }
         }
         return render(request, 'core/match_detail.html', context)
 
 
+@method_decorator(cached_view('matches', 'teams'), name='get')
 class LeagueTableView(View):
     def get(self, request, league_id=None):
         # Rozpoznaj ligę: najpierw tournament_id, potem tournament_template_id, potem pk
-        league = None
-        if league_id:
-            league = League.objects.filter(tournament_id=league_id).first()
-            if not league:
-                league = League.objects.filter(tournament_template_id=league_id).first()
-            if not league:
-                try:
-                    league = League.objects.get(pk=int(league_id))
-                except (ValueError, League.DoesNotExist):
-                    league = None
-            if not league:
-                raise Http404("League not found")
-
-        # Lista wszystkich lig (do dropdownu)
-        # Zwracamy tylko unikalne ligi (deduplikacja po tournament_template_id lub tournament_id)
-        leagues_qs = League.objects.all().order_by('name')
-        import re
-        leagues_map = {}
-        for l in leagues_qs:
-            # prefer stable identifiers: tournament_template_id, then tournament_id; fallback to normalized name+country
-            if l.tournament_template_id:
-                key = f"tpl:{l.tournament_template_id}"
-            elif l.tournament_id:
-                key = f"tid:{l.tournament_id}"
-            else:
-                # normalize name: strip year ranges like '2024/25', '(2024/25)', '2024-25', single years
-                raw_name = (l.name or '').strip().lower()
-                raw_name = re.sub(r"\([^)]*\)", "", raw_name)
-                raw_name = re.sub(r"\b\d{4}(/\d{2,4}|-\d{2,4})?\b", "", raw_name)
-                norm_name = ' '.join(raw_name.split()).strip()
-                country = (l.country or '').strip().lower()
-                key = f"name:{norm_name}|{country}"
-            # choose representative league for this key; prefer one with logo
-            existing = leagues_map.get(key)
-            if existing is None:
-                leagues_map[key] = l
-            else:
-                # if existing has no logo but this one has, replace
-                if (not getattr(existing, 'logo', None)) and getattr(l, 'logo', None):
-                    leagues_map[key] = l
-        # final list sorted by name
-        leagues = sorted(leagues_map.values(), key=lambda x: (x.name or '').lower())
+        league = league_service.resolve_league(league_id)
+        if league_id and not league:
+            raise Http404("League not found")
+
+        # Lista wszystkich lig (do dropdownu) - zdeduplikowana, z cache
+        leagues = league_service.get_unique_leagues()
 
         # stable id for selected league (used by template to mark selected option)
-        selected_lid = None
-        if league:
-            selected_lid = league.tournament_template_id or league.tournament_id or str(league.pk)
+        selected_lid = league_service.selected_league_id(league)
 
         seasons = _get_seasons_for_league(league)
 
@@ -355,63 +286,8 @@ class LeagueTableView(View):
         if not selected_season:
             return render(request, 'core/league_table.html', {'table': [], 'seasons': seasons, 'selected_season': None, 'league': league, 'leagues': leagues})
 
-        # Pobierz zakończone mecze dla sezonu
-        finished_matches = Match.objects.filter(event_stage='3', season=selected_season).select_related('home_team', 'away_team')
-
-        # Obliczanie tabeli
-        teams_stats = {}
-        for match in finished_matches:
-            home_score = match.home_score or 0
-            away_score = match.away_score or 0
-
-            for team in (match.home_team, match.away_team):
-                if team.participant_id not in teams_stats:
-                    teams_stats[team.participant_id] = {
-                        'team': team,
-                        'played': 0,
-                        'wins': 0,
-                        'draws': 0,
-                        'losses': 0,
-                        'goals_for': 0,
-                        'goals_against': 0,
-                        'goal_difference': 0,
-                        'points': 0
-                    }
-
-            home_stats = teams_stats[match.home_team.participant_id]
-            away_stats = teams_stats[match.away_team.participant_id]
-
-            home_stats['played'] += 1
-            home_stats['goals_for'] += home_score
-            home_stats['goals_against'] += away_score
-
-            away_stats['played'] += 1
-            away_stats['goals_for'] += away_score
-            away_stats['goals_against'] += home_score
-
-            if home_score > away_score:
-                home_stats['wins'] += 1
-                home_stats['points'] += 3
-                away_stats['losses'] += 1
-            elif home_score < away_score:
-                away_stats['wins'] += 1
-                away_stats['points'] += 3
-                home_stats['losses'] += 1
-            else:
-                home_stats['draws'] += 1
-                away_stats['draws'] += 1
-                home_stats['points'] += 1
-                away_stats['points'] += 1
-
-        table = []
-        for stats in teams_stats.values():
-            stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
-            table.append(stats)
-
-        table.sort(key=lambda x: (-x['points'], -x['goal_difference'], -x['goals_for']))
-
-        for idx, team_stats in enumerate(table, 1):
-            team_stats['position'] = idx
+        # Gotowe, posortowane wiersze tabeli (StandingRow)
+        table = standings_service.get_table(selected_season, **_table_options(request))
 
         return render(request, 'core/league_table.html', {
             'table': table,
@@ -425,6 +301,7 @@ class LeagueTableView(View):
 
 # --- TUTAJ BYŁ BŁĄD: TERAZ JEST POPRAWNIE (BEZ WCIĘCIA) ---
 
+@cached_view('news')
 def news_list(request):
     # Pobieramy 20 najnowszych newsów
     articles = NewsArticle.objects.all()[:20]
@@ -443,82 +320,47 @@ def signup(request):
     return render(request, 'core/signup.html', {'form': form})
 
 
-def _build_table_for_season(selected_season):
-    finished_matches = Match.objects.filter(event_stage='3', season=selected_season).select_related('home_team', 'away_team')
-    teams_stats = {}
-    for match in finished_matches:
-        home_score = match.home_score or 0
-        away_score = match.away_score or 0
-        for team in (match.home_team, match.away_team):
-            if team.participant_id not in teams_stats:
-                teams_stats[team.participant_id] = {
-                    'team': team,
-                    'played': 0,
-                    'wins': 0,
-                    'draws': 0,
-                    'losses': 0,
-                    'goals_for': 0,
-                    'goals_against': 0,
-                    'goal_difference': 0,
-                    'points': 0
-                }
-        home_stats = teams_stats[match.home_team.participant_id]
-        away_stats = teams_stats[match.away_team.participant_id]
-        home_stats['played'] += 1
-        home_stats['goals_for'] += home_score
-        home_stats['goals_against'] += away_score
-        away_stats['played'] += 1
-        away_stats['goals_for'] += away_score
-        away_stats['goals_against'] += home_score
-        if home_score > away_score:
-            home_stats['wins'] += 1
-            home_stats['points'] += 3
-            away_stats['losses'] += 1
-        elif home_score < away_score:
-            away_stats['wins'] += 1
-            away_stats['points'] += 3
-            home_stats['losses'] += 1
-        else:
-            home_stats['draws'] += 1
-            away_stats['draws'] += 1
-            home_stats['points'] += 1
-            away_stats['points'] += 1
-    table = []
-    for stats in teams_stats.values():
-        stats['goal_difference'] = stats['goals_for'] - stats['goals_against']
-        table.append(stats)
-    table.sort(key=lambda x: (-x['points'], -x['goal_difference'], -x['goals_for']))
-    for idx, team_stats in enumerate(table, 1):
-        team_stats['position'] = idx
-    return table
-
-
+def _table_options(request):
+    """
+    Opcjonalne parametry tabeli z GET: as_of=RRRR-MM-DD (tabela na koniec dnia),
+    venue=home|away, last=N (ostatnie N meczów każdej drużyny)
+    """
+    options = {}
+    as_of = parse_date(request.GET.get('as_of') or '')
+    if as_of:
+        options['as_of'] = timezone.make_aware(datetime.combine(as_of, time.max))
+    venue = request.GET.get('venue')
+    if venue in standings_service.VENUES:
+        options['venue'] = venue
+    try:
+        last = int(request.GET.get('last', ''))
+    except ValueError:
+        last = None
+    if last and last > 0:
+        options['last_matches'] = last
+    return options
+
+
+@method_decorator(cached_view('matches'), name='get')
 class SeasonsByLeagueView(View):
     def get(self, request, league_id):
         # Resolve league (allows tournament_id, tournament_template_id or pk)
-        league = League.objects.filter(tournament_id=league_id).first() or League.objects.filter(tournament_template_id=league_id).first()
+        league = league_service.resolve_league(league_id)
         if not league:
-            try:
-                league = League.objects.get(pk=int(league_id))
-            except (ValueError, League.DoesNotExist):
-                return JsonResponse({'error': 'League not found'}, status=404)
+            return JsonResponse({'error': 'League not found'}, status=404)
         # Aggregate seasons across all League records that share the same template_id or tournament_id
         seasons = _get_seasons_for_league(league)
         seasons = list(map(lambda s: {'pk': s.pk, 'season_id': s.season_id, 'name': s.name}, seasons))
         return JsonResponse({'seasons': seasons})
 
 
+@method_decorator(cached_view('matches', 'teams'), name='get')
 class LeagueTablePartialView(View):
     def get(self, request, league_id):
         # reuse logic to resolve league + season
-        league = League.objects.filter(tournament_id=league_id).first()
-        if not league:
-            league = League.objects.filter(tournament_template_id=league_id).first()
+        league = league_service.resolve_league(league_id)
         if not league:
-            try:
-                league = League.objects.get(pk=int(league_id))
-            except (ValueError, League.DoesNotExist):
-                return JsonResponse({'error': 'League not found'}, status=404)
+            return JsonResponse({'error': 'League not found'}, status=404)
         seasons = _get_seasons_for_league(league)
         season_id = request.GET.get('season_id')
         selected_season = None
@@ -539,7 +381,7 @@ class LeagueTablePartialView(View):
         if not selected_season:
             html = render_to_string('core/_league_table_partial.html', {'table': [], 'selected_season': None, 'seasons': seasons, 'league': league})
             return JsonResponse({'html': html})
-        table = _build_table_for_season(selected_season)
+        table = standings_service.get_table(selected_season, **_table_options(request))
         html = render_to_string('core/_league_table_partial.html', {'table': table, 'selected_season': selected_season, 'seasons': seasons, 'league': league})
         return JsonResponse({'html': html})
 
@@ -552,12 +394,7 @@ def _get_seasons_for_league(league):
     if not league:
         qs = Season.objects.all().order_by('-season_id')
     else:
-        if getattr(league, 'tournament_template_id', None):
-            qs = Season.objects.filter(league__tournament_template_id=league.tournament_template_id).order_by('-season_id')
-        elif getattr(league, 'tournament_id', None):
-            qs = Season.objects.filter(league__tournament_id=league.tournament_id).order_by('-season_id')
-        else:
-            qs = Season.objects.filter(league=league).order_by('-season_id')
+        qs = match_service.league_seasons(league).order_by('-season_id')
     seen = set()
     seasons = []
     for s in qs:
@@ -574,19 +411,16 @@ class MatchPredictionView(View):
 
     def get(self, request):
         """Wyświetla stronę z przewidywaniami nadchodzących meczów"""
-        service = MatchPredictionService()
-
-        # Trenuj model jeśli nie jest wytrenowany
+        # Model wczytany z dysku raz na proces (trenuje go tylko train_prediction_model)
+        service = get_prediction_service()
         if not service.is_trained:
-            success, message = service.train_model()
-            if not success:
-                return render(request, 'core/match_prediction.html', {
-                    'error': message,
-                    'predictions': []
-                })
+            return render(request, 'core/match_prediction.html', {
+                'error': NOT_TRAINED_MESSAGE,
+                'predictions': []
+            })
 
-        # Pobierz przewidywania dla nadchodzących meczów
-        predictions = service.get_upcoming_matches_predictions(limit=20)
+        # Przewidywania nadchodzących meczów z tabeli MatchPrediction
+        predictions = prediction_cache.get_upcoming_predictions(service, limit=20)
 
         return render(request, 'core/match_prediction.html', {
             'predictions': predictions,
@@ -601,7 +435,7 @@ class PredictSpecificMatchView(View):
         """Przewiduje wynik konkretnego meczu"""
         match = get_object_or_404(Match, event_id=match_id)
 
-        service = MatchPredictionService()
+        service = get_prediction_service()
         prediction = service.predict_match(match.home_team, match.away_team)
 
         return render(request, 'core/match_prediction_detail.html', {
@@ -629,7 +463,7 @@ class PredictCustomMatchView(View):
                 home_team = Team.objects.get(participant_id=home_team_id)
                 away_team = Team.objects.get(participant_id=away_team_id)
 
-                service = MatchPredictionService()
+                service = get_prediction_service()
                 prediction = service.predict_match(home_team, away_team)
             except Team.DoesNotExist:
                 prediction = {'error': 'Nie znaleziono wybranej drużyny'}
@@ -640,3 +474,72 @@ class PredictCustomMatchView(View):
             'away_team': away_team,
             'prediction': prediction
         })
+
+
+class PredictionsApiView(LoginRequiredMixin, View):
+    """
+    JSON API z przewidywaniami dla wielu meczów naraz (jedno predict_proba).
+    Filtry GET: match_id (lista po przecinku), season (pk sezonu), round,
+    date_from / date_to (RRRR-MM-DD), stage (domyślnie '1' - zaplanowane), limit.
+    """
+    MAX_LIMIT = 1000
+
+    def get(self, request):
+        matches = Match.objects.all()
+
+        match_ids = [m for m in request.GET.get('match_id', '').split(',') if m]
+        if match_ids:
+            matches = matches.filter(event_id__in=match_ids)
+        else:
+            matches = matches.filter(event_stage=request.GET.get('stage', '1'))
+
+        try:
+            season = int(request.GET['season']) if request.GET.get('season') else None
+            limit = max(1, min(int(request.GET.get('limit', 100)), self.MAX_LIMIT))
+            # parse_date: None dla złego formatu, ValueError dla nieistniejącej daty
+            date_from = parse_date(request.GET.get('date_from', '') or '')
+            date_to = parse_date(request.GET.get('date_to', '') or '')
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'Invalid season, limit or date'}, status=400)
+
+        if season is not None:
+            matches = matches.filter(season_id=season)
+        if request.GET.get('round'):
+            matches = matches.filter(round=request.GET['round'])
+
+        if date_from:
+            matches = matches.filter(start_time__date__gte=date_from)
+        if date_to:
+            matches = matches.filter(start_time__date__lte=date_to)
+
+        service = get_prediction_service()
+        if not service.is_trained:
+            return JsonResponse({'error': NOT_TRAINED_MESSAGE}, status=503)
+        results = service.predict_matches(matches.order_by('start_time', 'event_id')[:limit])
+        if results and results[0]['prediction'].get('error'):
+            return JsonResponse({'error': results[0]['prediction']['error']}, status=503)
+
+        include_features = request.GET.get('features') == '1'
+        predictions = []
+        for item in results:
+            match, prediction = item['match'], item['prediction']
+            row = {
+                'event_id': match.event_id,
+                'start_time': match.start_time.isoformat(),
+                'round': match.round,
+                'home_team': {'id': match.home_team_id, 'name': match.home_team.name},
+                'away_team': {'id': match.away_team_id, 'name': match.away_team.name},
+                'prediction': prediction['prediction'],
+                'probabilities': prediction['probabilities'],
+                'confidence': prediction['confidence'],
+            }
+            if include_features:
+                row['home_features'] = prediction['home_features']
+                row['away_features'] = prediction['away_features']
+            predictions.append(row)
+
+        return JsonResponse({
+            'model_version': service.version,
+            'count': len(predictions),
+            'predictions': predictions,
+        })
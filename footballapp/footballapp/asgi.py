@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'footballapp.settings')
 
 application = get_asgi_application()
+
+# Wczytaj najnowszy wytrenowany model raz, przy starcie workera
+from core.services.model_store import warm_up  # noqa: E402
+
+warm_up()
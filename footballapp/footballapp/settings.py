@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -133,3 +134,64 @@ LOGIN_REDIRECT_URL = '/'
 
 # Gdzie przekierować po wylogowaniu? (Na stronę główną)
 LOGOUT_REDIRECT_URL = '/'
+
+# Katalog z wytrenowanymi modelami przewidywania wyników (manage.py train_prediction_model)
+PREDICTION_MODEL_DIR = BASE_DIR / 'trained_models'
+
+# Co ile sekund worker sprawdza, czy scheduler zapisał nowszą wersję modelu
+PREDICTION_MODEL_RELOAD_INTERVAL = 60
+
+# Pamięć podręczna odpowiedzi API (SQLite) używana przez FootballDataService
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_PATH = BASE_DIR / 'http_cache.sqlite3'
+
+# Limity zapytań per host dla wspólnego klienta HTTP (core/services/http_client.py)
+# rate = zapytań na sekundę, concurrency = równoległych zapytań
+HTTP_HOST_LIMITS = {
+    'www.thesportsdb.com': {'rate': 2.0, 'concurrency': 2},
+    'api.sportdb.dev': {'rate': 10.0, 'concurrency': 8},
+}
+
+# Kanały RSS z newsami (manage.py fetch_news)
+NEWS_FEEDS = [
+    {'name': 'BBC Sport', 'url': 'https://feeds.bbci.co.uk/sport/football/rss.xml'},
+    {'name': 'The Guardian', 'url': 'https://www.theguardian.com/football/rss'},
+    {'name': 'Sky Sports', 'url': 'https://www.skysports.com/rss/12040'},
+]
+
+# Cache (widoki i wersje danych - core/services/view_cache.py)
+# Domyślnie pliki na dysku, żeby komendy pobierające dane i serwer widziały ten sam cache.
+# Redis: ustaw zmienną środowiskową REDIS_URL (np. redis://localhost:6379/1)
+# Wersje danych (klucze data_version:*) trzymane są w osobnym aliasie 'versions' -
+# usuwanie nadmiarowych wpisów z cache stron nie może skasować wersji, od których te strony zależą
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'versions',
+            'TIMEOUT': None,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache-versions',
+            'TIMEOUT': None,
+            # Jeden klucz na zakres danych, ligi i każdą drużynę - limit z dużym zapasem
+            'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+        },
+    }
+
+# Jak długo trzymać odpowiedzi widoków (unieważniane i tak po nowych danych)
+VIEW_CACHE_TIMEOUT = 24 * 60 * 60
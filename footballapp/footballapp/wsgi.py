@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'footballapp.settings')
 
 application = get_wsgi_application()
+
+# Wczytaj najnowszy wytrenowany model raz, przy starcie workera
+from core.services.model_store import warm_up  # noqa: E402
+
+warm_up()